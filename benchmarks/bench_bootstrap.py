@@ -0,0 +1,66 @@
+"""
+Benchmark: block-bootstrap confidence intervals for many tickers.
+
+Builds star-performance tables for synthetic 5-year close series, then
+bootstraps every level with enough samples on the calling thread and on
+the process pool. It checks that both give identical intervals (the
+generators are seeded per ticker and level) and prints the timings.
+
+    python benchmarks/bench_bootstrap.py [--tickers 100] [--resamples 10000] [--processes N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_analysis.backtest import star_performance_table
+from stock_analysis.bootstrap import BOOTSTRAP_CONFIG, bootstrap_tickers
+
+
+def synthetic_close(bars, seed):
+    """
+    Geometric random walk with occasional deep drawdowns
+    """
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0004, 0.022, bars)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bars', type=int, default=1260, help="Bars per series (default: 5y)")
+    parser.add_argument('--tickers', type=int, default=100, help="Number of synthetic series")
+    parser.add_argument('--resamples', type=int, default=10000)
+    parser.add_argument('--processes', type=int, default=max(BOOTSTRAP_CONFIG['PROCESSES'], 2),
+                        help="Pool size for the parallel run (default: %(default)s)")
+    args = parser.parse_args()
+
+    tables = {f'SYN{i}': star_performance_table(synthetic_close(args.bars, i)) for i in range(args.tickers)}
+    levels = sum(stats is not None for table in tables.values() for stats in table.values())
+
+    started = time.perf_counter()
+    serial = bootstrap_tickers(tables, resamples=args.resamples, processes=0)
+    serial_seconds = time.perf_counter() - started
+
+    # The first call also spawns the pool's workers
+    bootstrap_tickers(dict(list(tables.items())[:args.processes]), resamples=10, processes=args.processes)
+    started = time.perf_counter()
+    parallel = bootstrap_tickers(tables, resamples=args.resamples, processes=args.processes)
+    parallel_seconds = time.perf_counter() - started
+
+    print(f"{args.tickers} tickers, {levels} star levels with >= 10 samples, {args.resamples:,} resamples each")
+    print(f"  {'calling thread':26}: {serial_seconds:7.2f} s")
+    print(f"  {f'process pool ({args.processes} processes)':26}: {parallel_seconds:7.2f} s")
+
+    if serial != parallel:
+        print("MISMATCH between serial and pooled intervals")
+        return 1
+    print("  intervals identical")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
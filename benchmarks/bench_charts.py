@@ -0,0 +1,68 @@
+"""
+Benchmark: chart rendering and the chart image cache.
+
+Renders the compact chart for a synthetic watchlist twice: the first
+pass draws every chart, the second is served from the cache. Also checks
+that no figure outlives its render and that downsampling keeps the
+series' extremes.
+
+    python benchmarks/bench_charts.py [--tickers 40] [--bars 126]
+"""
+import argparse
+import os
+import sys
+import gc
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_analysis.charts import ChartCache, downsample
+
+
+def synthetic_history(bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, bars)))
+    index = pd.bdate_range(end='2026-10-16', periods=bars, name='Date')
+    return pd.DataFrame({'Close': close}, index=index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=40)
+    parser.add_argument('--bars', type=int, default=126)
+    args = parser.parse_args()
+
+    histories = {f"T{i:03d}": synthetic_history(args.bars, i) for i in range(args.tickers)}
+    cache = ChartCache()
+
+    for label in ("cold", "cached"):
+        started = time.perf_counter()
+        for ticker, hist in histories.items():
+            cache.chart(ticker, hist)
+        seconds = time.perf_counter() - started
+        print(f"{label:>6}: {args.tickers} charts in {seconds * 1000:8.1f} ms "
+              f"({seconds / args.tickers * 1000:.2f} ms/chart)")
+    stats = cache.stats()
+    print(f"cache: {stats['entries']} images, {stats['bytes'] / 1024:.0f} KB, "
+          f"{stats['hits']} hits, {stats['misses']} misses")
+
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+    gc.collect()
+    live_figures = sum(isinstance(o, Figure) for o in gc.get_objects())
+    print(f"open pyplot figures: {len(plt.get_fignums())}, live Figure objects: {live_figures}")
+    assert len(plt.get_fignums()) == 0 and live_figures == 0
+
+    long_hist = synthetic_history(5000, 99)
+    started = time.perf_counter()
+    x, y = downsample(long_hist.index.values, long_hist['Close'].values)
+    print(f"downsample: 5000 -> {len(y)} points in {(time.perf_counter() - started) * 1000:.2f} ms")
+    assert y.min() == long_hist['Close'].min() and y.max() == long_hist['Close'].max()
+    assert x[0] == long_hist.index.values[0] and x[-1] == long_hist.index.values[-1]
+
+
+if __name__ == '__main__':
+    main()
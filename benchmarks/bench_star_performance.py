@@ -0,0 +1,124 @@
+"""
+Benchmark: vectorized star-level backtest vs the original loop.
+
+Runs both on synthetic 5-year close series, checks that every star level
+gets identical statistics, and prints the speedup.
+
+    python benchmarks/bench_star_performance.py [--bars 1260] [--series 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_analysis.backtest import SIGNAL_LEVELS, star_performance_table, summarize_returns
+
+
+def synthetic_close(bars, seed):
+    """
+    Geometric random walk with occasional deep drawdowns
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0004, 0.022, bars)
+    return pd.DataFrame(
+        {'Close': 100 * np.exp(np.cumsum(returns))},
+        index=pd.bdate_range('2020-01-01', periods=bars)
+    )
+
+
+def legacy_star_performance(hist, star_level, holding_period=90):
+    """
+    The pre-vectorization calculate_star_performance loop, kept verbatim
+    as the reference implementation
+    """
+    if len(hist) < 252:
+        return None
+
+    results = []
+    for i in range(0, len(hist) - 120, 20):
+        window = hist.iloc[:i+1] if i > 0 else hist.iloc[:1]
+
+        if len(window) < 50:
+            continue
+
+        current_price = window['Close'].iloc[-1]
+        high_52w = window['Close'].rolling(min(252, len(window)), min_periods=1).max().iloc[-1]
+        drawdown_pct = (high_52w - current_price) / high_52w * 100 if high_52w > 0 else 0
+
+        if drawdown_pct >= 30:
+            signal_level = 5
+        elif drawdown_pct >= 25:
+            signal_level = 4
+        elif drawdown_pct >= 20:
+            signal_level = 3
+        elif drawdown_pct >= 15:
+            signal_level = 2
+        elif drawdown_pct >= 10:
+            signal_level = 1
+        elif drawdown_pct >= 5:
+            signal_level = 0
+        else:
+            signal_level = -1
+
+        if abs(signal_level - star_level) < 0.5:
+            future_prices = hist['Close'].iloc[i+1:i+1+holding_period]
+            if len(future_prices) > 20:
+                future_return = (future_prices.iloc[-1] / current_price - 1) * 100
+                results.append(future_return)
+
+    return summarize_returns(results)
+
+
+def same_stats(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    return all(
+        np.array_equal(a[key], b[key]) if key == 'results' else a[key] == b[key]
+        for key in a
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bars', type=int, default=1260, help="Bars per series (default: 5y)")
+    parser.add_argument('--series', type=int, default=20, help="Number of synthetic series")
+    args = parser.parse_args()
+
+    histories = [synthetic_close(args.bars, seed) for seed in range(args.series)]
+
+    started = time.perf_counter()
+    legacy = [{level: legacy_star_performance(h, level) for level in SIGNAL_LEVELS} for h in histories]
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = [star_performance_table(h['Close'].values) for h in histories]
+    vectorized_seconds = time.perf_counter() - started
+
+    mismatches = [
+        (i, level)
+        for i, (old, new) in enumerate(zip(legacy, vectorized))
+        for level in SIGNAL_LEVELS
+        if not same_stats(old[level], new[level])
+    ]
+
+    levels_with_stats = sum(v is not None for table in vectorized for v in table.values())
+    print(f"{args.series} series x {args.bars} bars, {len(SIGNAL_LEVELS)} star levels "
+          f"({levels_with_stats} level tables with >= 10 samples)")
+    print(f"  legacy loop, one call per level : {legacy_seconds * 1000:9.1f} ms")
+    print(f"  vectorized, one call per series : {vectorized_seconds * 1000:9.1f} ms")
+    print(f"  speedup                         : {legacy_seconds / vectorized_seconds:9.1f}x")
+
+    if mismatches:
+        print(f"MISMATCH in {len(mismatches)} (series, level) pairs: {mismatches[:10]}")
+        return 1
+    print("  results identical for every level")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Benchmark: cold start and rerun cost of the Streamlit app.
+
+1. Runs `python -X importtime` on the modules app.py imports before the
+   first page renders and summarizes the slowest imports. Fails if one
+   of the deferred heavy modules (matplotlib, scipy, yfinance) is among
+   them.
+2. Renders the welcome page with Streamlit's AppTest and times the first
+   run and a rerun, using throwaway price and metadata databases.
+
+    python benchmarks/bench_startup.py [--top 15] [--reruns 5] [--report benchmarks/startup_report.txt]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# What app.py imports before anything is shown
+FIRST_RENDER_MODULES = ['streamlit', 'ui.state', 'ui.sidebar']
+
+# Only imported by the code paths that need them
+DEFERRED_MODULES = ['matplotlib', 'scipy', 'yfinance']
+
+
+def import_times(modules):
+    """
+    {module: (self_us, cumulative_us, depth)} from -X importtime for a
+    fresh interpreter importing `modules`
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        times[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return times
+
+
+def render_times(reruns):
+    """
+    (first run, [rerun, ...]) in seconds for the welcome page
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120)
+    started = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    rerun_times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - started)
+    return first, rerun_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--report', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    lines = []
+    first_render = import_times(FIRST_RENDER_MODULES)
+    total_ms = sum(s for s, _, _ in first_render.values()) / 1000
+    lines.append(f"First-render imports: {len(first_render)} modules, {total_ms:.0f} ms")
+    lines.append(f"  {'cumulative ms':>13}  {'self ms':>8}  module")
+    top_level = sorted(
+        ((name, t) for name, t in first_render.items() if t[2] <= 1),
+        key=lambda item: -item[1][1]
+    )
+    for name, (self_us, cumulative_us, _) in top_level[:args.top]:
+        lines.append(f"  {cumulative_us / 1000:13.1f}  {self_us / 1000:8.1f}  {name}")
+
+    loaded = [m for m in DEFERRED_MODULES if m in first_render]
+    lines.append("")
+    lines.append("Deferred modules (cost when a page first needs them):")
+    for module in DEFERRED_MODULES:
+        if module == 'matplotlib':
+            module = 'matplotlib.pyplot'
+        elif module == 'scipy':
+            module = 'scipy.stats'
+        try:
+            standalone = import_times([module])
+        except RuntimeError:
+            lines.append(f"  {module}: not installed")
+            continue
+        lines.append(f"  {module}: {standalone[module][1] / 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ['STOCK_APP_PRICE_DB'] = os.path.join(workdir, 'price_store.db')
+        os.environ['STOCK_APP_METADATA_DB'] = os.path.join(workdir, 'symbol_metadata.db')
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            first, reruns = render_times(args.reruns)
+        finally:
+            os.chdir(cwd)
+
+    lines.append("")
+    lines.append(f"Welcome page, first run (in-process, imports included): {first * 1000:.0f} ms")
+    if reruns:
+        lines.append(f"Welcome page, rerun: best {min(reruns) * 1000:.0f} ms, "
+                     f"mean {sum(reruns) / len(reruns) * 1000:.0f} ms over {len(reruns)}")
+
+    report = "\n".join(lines)
+    print(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(report + "\n")
+
+    if loaded:
+        print(f"\nFAIL: imported before first render: {', '.join(loaded)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
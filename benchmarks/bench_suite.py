@@ -0,0 +1,294 @@
+"""
+Offline benchmark suite for the analysis hot paths.
+
+Every case runs on deterministic synthetic OHLCV series (see fixtures.py)
+with an offline fake in place of yfinance, so results are repeatable and
+comparable between commits:
+
+    analyze_price_distribution, RollingDistribution (one bar pushed and
+    the distribution read, as in an intraday refresh),
+    calculate_relative_strength_score,
+    calculate_star_performance, get_buy_signal_improved,
+    get_buy_signal_original, generate_quant_report, and the full
+    screen() main loop with a cold and a warm local store.
+
+Each case reports operations per second and the peak memory allocated
+by one call. Results can be saved as JSON and compared with an earlier
+run:
+
+    python benchmarks/bench_suite.py --output bench.json
+    python benchmarks/bench_suite.py --compare bench.json [--tolerance 0.2]
+    python benchmarks/bench_suite.py --bars 1260 --tickers 200 --latency 0.05
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import install_fake_yfinance, synthetic_ohlcv
+
+# Installed before anything imports yfinance
+fake_yf = None
+
+
+# ========== Measurement ==========
+def measure(func, min_time=0.5, rounds=5):
+    """
+    Time func over `rounds` rounds of at least min_time / rounds seconds
+    each and keep the fastest round, which is the least disturbed by
+    other load on the machine. Returns the calls and seconds of that
+    round and the peak bytes allocated by one extra, traced call.
+    """
+    func()  # warm-up
+    best = None
+    for _ in range(rounds):
+        calls = 0
+        started = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time / rounds:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - started
+        if best is None or calls / elapsed > best[0] / best[1]:
+            best = (calls, elapsed)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best[0], best[1], peak
+
+
+def result(name, calls, seconds, peak_bytes, ops_per_call=1, unit='calls'):
+    ops = calls * ops_per_call
+    return {
+        'name': name,
+        'unit': unit,
+        'ops': ops,
+        'seconds': round(seconds, 6),
+        'ops_per_sec': round(ops / seconds, 3) if seconds > 0 else None,
+        'mean_ms': round(seconds / ops * 1000, 4) if ops else None,
+        'peak_kb': round(peak_bytes / 1024, 1),
+    }
+
+
+# ========== Cases ==========
+def function_cases(args):
+    """
+    The per-ticker analysis functions on one synthetic stock and benchmark
+    """
+    from stock_analysis.analytics import (
+        analyze_price_distribution,
+        calculate_relative_strength_score,
+        get_buy_signal_improved,
+        get_buy_signal_original,
+        generate_quant_report,
+    )
+    from stock_analysis.benchmark_fit import BENCHMARK_SYMBOLS, fit_closes
+    from stock_analysis.orderstats import RollingDistribution
+    from stock_analysis.screener import calculate_star_performance
+    from stock_analysis.sweep import sweep_closes
+
+    hist_5y = synthetic_ohlcv('BENCH', args.bars)
+    hist_1y = hist_5y.iloc[-252:]
+    market_1y = synthetic_ohlcv('^GSPC', args.bars).iloc[-252:]
+    drawdowns = np.linspace(0, 40, 41)
+    quality = {'qualified': True, 'issues': [], 'is_core': False}
+    price_dist = analyze_price_distribution(hist_1y)
+    star_performance = calculate_star_performance('BENCH', 3, hist=hist_5y)
+    rolling = RollingDistribution.from_prices(hist_1y['Close'].values, window=len(hist_1y))
+    closes = hist_5y['Close'].values
+    fit_stocks = pd.DataFrame({f'S{i}': synthetic_ohlcv(f'S{i}', 252)['Close'] for i in range(50)})
+    fit_indices = pd.DataFrame({s: synthetic_ohlcv(s, 252)['Close'] for s in BENCHMARK_SYMBOLS})
+    sweep_stocks = pd.DataFrame({f'S{i}': synthetic_ohlcv(f'S{i}', args.bars)['Close'] for i in range(20)})
+
+    def rolling_update():
+        rolling.push(closes[rolling_update.bar % len(closes)])
+        rolling_update.bar += 1
+        return rolling.distribution()
+    rolling_update.bar = 0
+
+    cases = [
+        ('analyze_price_distribution', lambda: analyze_price_distribution(hist_1y), 1),
+        ('RollingDistribution (one bar)', rolling_update, 1),
+        ('calculate_relative_strength_score',
+         lambda: calculate_relative_strength_score(hist_1y, market_1y), 1),
+        ('fit_closes (50 x 14 indices)', lambda: fit_closes(fit_stocks, fit_indices), 1),
+        ('calculate_star_performance',
+         lambda: calculate_star_performance('BENCH', 3, hist=hist_5y), 1),
+        ('sweep_closes (20 x 72 cells)',
+         lambda: sweep_closes(sweep_stocks, [5, 10, 15, 20, 25, 30], [30, 60, 90, 120], [10, 20, 40],
+                              processes=0), 1),
+        ('get_buy_signal_improved',
+         lambda: [get_buy_signal_improved(d, 12.0, quality, 0.5, "Slightly stronger than market")
+                  for d in drawdowns], len(drawdowns)),
+        ('get_buy_signal_original',
+         lambda: [get_buy_signal_original(d / 100) for d in drawdowns], len(drawdowns)),
+        ('generate_quant_report',
+         lambda: generate_quant_report('BENCH', hist_1y['Close'].iloc[-1], 22.0, price_dist,
+                                       "Slightly stronger than market", 3, star_performance,
+                                       quality), 1),
+    ]
+
+    results = []
+    for name, func, ops_per_call in cases:
+        calls, seconds, peak = measure(func, args.min_time)
+        results.append(result(name, calls, seconds, peak, ops_per_call))
+    return results
+
+
+def screen_cases(args):
+    """
+    The full main loop: screen() over args.tickers symbols against ^GSPC
+    in quant mode, first with empty stores (every history and .info comes
+    from the fake) and then again with the stores populated
+    """
+    from stock_analysis.metadata import MetadataStore
+    from stock_analysis.pipeline import TickerPipeline
+    from stock_analysis.price_store import PriceStore
+    from stock_analysis.screener import screen
+
+    tickers = [f"S{i:04d}" for i in range(args.tickers)]
+    pipeline = TickerPipeline(io_workers=args.workers)
+    results = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = PriceStore(os.path.join(workdir, 'price_store.db'))
+        metadata_store = MetadataStore(os.path.join(workdir, 'symbol_metadata.db'))
+
+        def run():
+            analyses, _ = screen(tickers, benchmark_symbol='^GSPC', store=store,
+                                 metadata_store=metadata_store, pipeline=pipeline)
+            return analyses
+
+        for name in ('screen (cold store)', 'screen (warm store)'):
+            before = dict(fake_yf.calls)
+            tracemalloc.start()
+            started = time.perf_counter()
+            try:
+                analyses = run()
+                seconds = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            if name.endswith('(warm store)'):
+                # Untraced timing; tracemalloc slows the loop down
+                started = time.perf_counter()
+                analyses = run()
+                seconds = time.perf_counter() - started
+
+            entry = result(name, len(tickers), seconds, peak, unit='tickers')
+            entry['ok'] = sum(a['record']['status'] == 'ok' for a in analyses)
+            entry['yahoo_requests'] = {k: fake_yf.calls[k] - before[k] for k in before}
+            results.append(entry)
+
+    return results
+
+
+# ========== Reporting ==========
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None, tolerance=0.2):
+    """
+    Print a results table, with the change against a baseline run when
+    given. Returns the names of cases slower than the baseline by more
+    than tolerance.
+    """
+    previous = {r['name']: r for r in (baseline or {}).get('results', [])}
+    regressions = []
+    print(f"{'case':<36} {'ops/sec':>12} {'mean ms':>10} {'peak KB':>10} {'vs base':>9}")
+    for r in results:
+        line = f"{r['name']:<36} {r['ops_per_sec']:>12,.1f} {r['mean_ms']:>10.4f} {r['peak_kb']:>10,.0f}"
+        base = previous.get(r['name'])
+        if base and base.get('ops_per_sec'):
+            change = r['ops_per_sec'] / base['ops_per_sec'] - 1
+            line += f" {change:>+8.0%}"
+            if change < -tolerance:
+                regressions.append(r['name'])
+                line += "  REGRESSION"
+        print(line)
+        if 'yahoo_requests' in r:
+            print(f"{'':<36} {r['ok']}/{r['ops']} ok, Yahoo requests: {r['yahoo_requests']}")
+    return regressions
+
+
+def main():
+    global fake_yf
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, default=1260, help="Bars per synthetic series (default: 1260, 5 years)")
+    parser.add_argument('--tickers', type=int, default=50, help="Tickers in the screen() cases (default: 50)")
+    parser.add_argument('--workers', type=int, default=8, help="Pipeline worker threads (default: 8)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated seconds per Yahoo request")
+    parser.add_argument('--min-time', type=float, default=0.5, help="Seconds spent on each function case")
+    parser.add_argument('--only', choices=['functions', 'screen'], help="Run one group of cases")
+    parser.add_argument('-o', '--output', help="Write results as JSON")
+    parser.add_argument('--compare', help="Earlier JSON results to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Slowdown vs --compare that counts as a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    fake_yf = install_fake_yfinance(bars=max(args.bars, 1300), latency=args.latency)
+    # The fake is local; don't let the Yahoo rate limit pace the cold screen
+    os.environ.setdefault('STOCK_APP_YAHOO_RATE', '1000000')
+    os.environ.setdefault('STOCK_APP_YAHOO_BURST', '1000000')
+
+    results = []
+    if args.only in (None, 'functions'):
+        results += function_cases(args)
+    if args.only in (None, 'screen'):
+        results += screen_cases(args)
+
+    report = {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'config': vars(args),
+        'results': results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        print(f"Comparing with {args.compare} (commit {baseline.get('commit')})")
+
+    regressions = print_results(results, baseline, args.tolerance)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: vectorized universe screen over a dates x symbols close matrix.
+
+Times screen_matrix on a synthetic universe (default 3000 symbols x
+1260 bars) and checks a sample of columns against the per-ticker
+functions used by the app.
+
+    python benchmarks/bench_universe_screen.py [--symbols 3000] [--bars 1260]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_analysis.analytics import analyze_price_distribution, get_buy_signal_original
+from stock_analysis.universe import screen_matrix
+
+
+def synthetic_universe(bars, symbols, seed=0):
+    """
+    Random-walk closes with some late listings and trading gaps
+    """
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (bars, symbols)), axis=0))
+    listed_at = rng.integers(0, bars // 2, symbols) * (rng.random(symbols) < 0.1)
+    closes[np.arange(bars)[:, None] < listed_at] = np.nan
+    closes[rng.random((bars, symbols)) < 0.001] = np.nan
+    return closes
+
+
+def check_against_app(closes, table, columns):
+    """
+    Compare sampled columns with analyze_price_distribution and the
+    app's 52-week drawdown / original signal
+    """
+    by_ticker = table.set_index('ticker')
+    for j in columns:
+        close = pd.Series(closes[:, j]).ffill().dropna()
+        hist = pd.DataFrame({'Close': close.values})
+        dist = analyze_price_distribution(hist)
+        current = close.iloc[-1]
+        high_52w = close.rolling(252, min_periods=1).max().iloc[-1]
+        drawdown = (high_52w - current) / high_52w * 100
+        row = by_ticker.loc[f"S{j}"]
+        if not (np.isclose(row['z_score'], dist['z_score'])
+                and np.isclose(row['percentile'], dist['percentile'])
+                and np.isclose(row['drawdown_pct'], drawdown)
+                and row['level'] == get_buy_signal_original(drawdown / 100)['level']):
+            return j
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--symbols', type=int, default=3000)
+    parser.add_argument('--bars', type=int, default=1260)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    closes = synthetic_universe(args.bars, args.symbols)
+    symbols = [f"S{j}" for j in range(args.symbols)]
+
+    cpu_times = []
+    for _ in range(args.repeat):
+        started = time.process_time()
+        table = screen_matrix(closes, symbols)
+        cpu_times.append(time.process_time() - started)
+
+    print(f"{args.symbols} symbols x {args.bars} bars")
+    print(f"  screen_matrix CPU time: best {min(cpu_times):.3f}s of {args.repeat}")
+
+    mismatch = check_against_app(closes, table, range(0, args.symbols, max(1, args.symbols // 25)))
+    if mismatch is not None:
+        print(f"MISMATCH against per-ticker analysis for column {mismatch}")
+        return 1
+    print("  sampled columns match the per-ticker analysis")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Deterministic offline fixtures for the benchmarks.
+
+synthetic_ohlcv() builds a reproducible OHLCV frame per symbol, and
+install_fake_yfinance() puts a stand-in `yfinance` module in sys.modules
+that serves those frames through the calls the app makes
+(Ticker.history, Ticker.info, download), so benchmarks never touch the
+network and always see the same prices.
+"""
+import functools
+import sys
+import threading
+import time
+import types
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Longest history the fake serves, in business days (~10 years)
+MAX_BARS = 2520
+
+_PERIOD_DAYS = {
+    '5d': 5, '1mo': 31, '3mo': 92, '6mo': 183, '1y': 366,
+    '2y': 731, '5y': 1827, '10y': 3653, 'max': 36500,
+}
+
+
+def symbol_seed(symbol):
+    return zlib.crc32(symbol.encode())
+
+
+@functools.lru_cache(maxsize=4096)
+def synthetic_ohlcv(symbol, bars=MAX_BARS, end=None):
+    """
+    Daily OHLCV for a symbol: a geometric random walk with regime changes,
+    so drawdowns of every star level occur. Same symbol, same prices.
+    The last bar is on `end` (default: the last business day). The frame
+    is cached and shared; copy it before modifying.
+    """
+    rng = np.random.default_rng(symbol_seed(symbol))
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+    index = pd.bdate_range(end=end, periods=bars, name='Date')
+
+    volatility = rng.choice([0.012, 0.02, 0.035], size=bars // 60 + 1).repeat(60)[:bars]
+    drift = rng.normal(0.0003, 0.0015, bars // 120 + 1).repeat(120)[:bars]
+    close = rng.uniform(20, 400) * np.exp(np.cumsum(rng.normal(drift, volatility)))
+    spread = np.abs(rng.normal(0, 0.01, bars))
+
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, bars)),
+        'High': close * (1 + spread),
+        'Low': close * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 50_000_000, bars).astype(float),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
+
+
+def fake_info(symbol):
+    rng = np.random.default_rng(symbol_seed(symbol) + 1)
+    return {
+        'sector': str(rng.choice(['Technology', 'Healthcare', 'Financial Services', 'Energy'])),
+        'exchange': 'NMS',
+        'marketCap': float(rng.uniform(5e9, 2e12)),
+        'averageVolume': float(rng.uniform(2e6, 8e7)),
+        'regularMarketPrice': float(synthetic_ohlcv(symbol)['Close'].iloc[-1]),
+    }
+
+
+def install_fake_yfinance(bars=MAX_BARS, latency=0.0, failing=()):
+    """
+    Replace `yfinance` in sys.modules with an offline fake and return it.
+
+    bars: length of each symbol's full history.
+    latency: seconds slept per request, to model the network.
+    failing: symbols for which every request returns no data.
+    The module's `calls` dict counts history, download and info requests.
+    """
+    fake = types.ModuleType('yfinance')
+    fake.calls = {'history': 0, 'download': 0, 'info': 0}
+    fake.failing = set(failing)
+    lock = threading.Lock()
+
+    def count(kind):
+        with lock:
+            fake.calls[kind] += 1
+        if latency:
+            time.sleep(latency)
+
+    def history_slice(symbol, period=None, start=None):
+        hist = synthetic_ohlcv(symbol, bars)
+        if start is not None:
+            return hist[hist.index >= pd.Timestamp(start)]
+        days = _PERIOD_DAYS[period or '1mo']
+        return hist[hist.index > hist.index[-1] - pd.Timedelta(days=days)]
+
+    class Ticker:
+        def __init__(self, ticker, session=None):
+            self.ticker = ticker
+
+        def history(self, period='1mo', start=None, **kwargs):
+            count('history')
+            if self.ticker in fake.failing:
+                return pd.DataFrame()
+            hist = history_slice(self.ticker, period, start).copy()
+            hist.index = hist.index.tz_localize('America/New_York')
+            return hist
+
+        @property
+        def info(self):
+            count('info')
+            if self.ticker in fake.failing:
+                return {}
+            return fake_info(self.ticker)
+
+    def download(tickers, period=None, start=None, group_by='column', **kwargs):
+        count('download')
+        if isinstance(tickers, str):
+            tickers = tickers.replace(',', ' ').split()
+        frames = {
+            t: history_slice(t, period, start) for t in tickers if t not in fake.failing
+        }
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1, names=['Ticker', 'Price'])
+
+    fake.Ticker = Ticker
+    fake.download = download
+    sys.modules['yfinance'] = fake
+    return fake
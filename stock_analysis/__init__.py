@@ -0,0 +1,40 @@
+"""
+Data and analytics for the 52-week drawdown app.
+
+Nothing in this package imports Streamlit, so the analysis runs the same
+from app.py, from scripts and from the command line screener
+(python -m stock_analysis screen --help).
+
+The names below are loaded on first access, so importing one submodule
+(e.g. stock_analysis.config) does not pull in the rest of the package.
+"""
+import importlib
+
+_EXPORTS = {
+    'get_recommended_index': 'stock_analysis.analytics',
+    'get_index_name': 'stock_analysis.analytics',
+    'summarize_market': 'stock_analysis.analytics',
+    'check_stock_quality': 'stock_analysis.analytics',
+    'analyze_price_distribution': 'stock_analysis.analytics',
+    'calculate_relative_strength_score': 'stock_analysis.analytics',
+    'get_buy_signal_improved': 'stock_analysis.analytics',
+    'get_buy_signal_original': 'stock_analysis.analytics',
+    'generate_quant_report': 'stock_analysis.analytics',
+    'calculate_star_performance': 'stock_analysis.screener',
+    'analyze_ticker': 'stock_analysis.screener',
+    'screen': 'stock_analysis.screener',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,5 @@
+import sys
+
+from stock_analysis.cli import main
+
+sys.exit(main())
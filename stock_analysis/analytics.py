@@ -0,0 +1,381 @@
+"""
+Signal and statistics functions behind the drawdown analysis
+"""
+import numpy as np
+import pandas as pd
+
+from stock_analysis.config import (
+    CORE_STOCKS, FILTER_CONFIG, STOCK_SECTOR_MAP, SECTOR_TO_INDEX, INDEX_NAMES
+)
+from stock_analysis.metadata import get_metadata_store
+
+# ========== Get Recommended Index ==========
+def get_recommended_index(ticker, metadata_store=None):
+    """
+    Recommend appropriate benchmark index based on stock ticker
+    """
+    # Check exact match first
+    if ticker in STOCK_SECTOR_MAP:
+        return STOCK_SECTOR_MAP[ticker]
+    
+    # Try to determine by sector, from the local metadata store
+    try:
+        metadata_store = metadata_store or get_metadata_store()
+        sector = metadata_store.get_metadata(ticker)['sector'] or ''
+        
+        if sector in SECTOR_TO_INDEX:
+            return SECTOR_TO_INDEX[sector]
+    except:
+        pass
+    
+    # Default to S&P 500
+    return '^GSPC'
+
+# ========== Get Index Name ==========
+def get_index_name(symbol):
+    """
+    Return readable name for index symbol
+    """
+    return INDEX_NAMES.get(symbol, symbol)
+
+# ========== Market Summary ==========
+def summarize_market(index_symbol, hist):
+    """
+    52-week summary of an index from its 1y history, None without data
+    """
+    if hist is None or hist.empty:
+        return None
+    
+    current_price = hist['Close'].iloc[-1]
+    high_52w = hist['High'].max()
+    drawdown = (high_52w - current_price) / high_52w * 100
+    
+    return {
+        'symbol': index_symbol,
+        'name': get_index_name(index_symbol),
+        'current_price': current_price,
+        'high_52w': high_52w,
+        'drawdown': drawdown,
+        'hist': hist
+    }
+
+# ========== Stock Quality Check ==========
+def check_stock_quality(ticker, last_price=None, metadata_store=None):
+    """
+    Check if stock meets basic quality requirements
+    """
+    try:
+        metadata_store = metadata_store or get_metadata_store()
+        info = metadata_store.get_metadata(ticker)
+        
+        price = last_price if last_price is not None else (info['last_price'] or 0)
+        market_cap = info['market_cap'] or 0
+        avg_volume = info['average_volume'] or 0
+        exchange = info['exchange'] or ''
+        
+        volume_value = avg_volume * price if price > 0 else 0
+        issues = []
+        
+        if price < FILTER_CONFIG['MIN_PRICE']:
+            issues.append(f"Price below ${FILTER_CONFIG['MIN_PRICE']} (current: ${price:.2f})")
+        
+        if market_cap < FILTER_CONFIG['MIN_MARKET_CAP']:
+            issues.append(f"Market cap below ${FILTER_CONFIG['MIN_MARKET_CAP']/1e9:.0f}B")
+        
+        if volume_value < FILTER_CONFIG['MIN_VOLUME_VALUE']:
+            issues.append(f"Daily volume below ${FILTER_CONFIG['MIN_VOLUME_VALUE']:,.0f}")
+        
+        is_qualified = len(issues) == 0
+        
+        return {
+            'qualified': is_qualified,
+            'issues': issues,
+            'price': price,
+            'market_cap': market_cap,
+            'volume_value': volume_value,
+            'exchange': exchange,
+            'is_core': ticker in CORE_STOCKS
+        }
+        
+    except Exception as e:
+        return {
+            'qualified': False,
+            'issues': [f"Data fetch failed: {str(e)[:50]}"],
+            'price': 0,
+            'market_cap': 0,
+            'volume_value': 0,
+            'exchange': '',
+            'is_core': False
+        }
+
+# ========== Price Distribution Analysis ==========
+def percentile_of_score(values, scores):
+    """
+    Percentile of each score within its column of values (or within a 1-D
+    array), as scipy.stats.percentileofscore(kind='rank'). NaN entries
+    are ignored.
+    """
+    values = np.asarray(values, dtype=float)
+    counts = np.sum(~np.isnan(values), axis=0)
+    below = np.sum(values < scores, axis=0)
+    at_or_below = np.sum(values <= scores, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentile = (below + at_or_below + (at_or_below > below)) * (50.0 / counts)
+    return np.where(counts > 0, percentile, np.nan)
+
+def analyze_price_distribution(hist):
+    """
+    Analyze current price position in historical distribution
+    Returns Z-score, percentile, extreme levels
+    """
+    prices = hist['Close'].values
+    current_price = prices[-1]
+    
+    mean_price = np.mean(prices)
+    std_price = np.std(prices)
+    
+    z_score = (current_price - mean_price) / std_price if std_price > 0 else 0
+    percentile = float(percentile_of_score(prices, current_price))
+    
+    is_extreme_cheap = z_score < -2
+    is_extreme_expensive = z_score > 2
+    
+    support_levels = {
+        '-2σ': mean_price - 2 * std_price,
+        '-1σ': mean_price - 1 * std_price,
+        'mean': mean_price,
+        '+1σ': mean_price + 1 * std_price,
+        '+2σ': mean_price + 2 * std_price
+    }
+    
+    return {
+        'z_score': z_score,
+        'percentile': percentile,
+        'is_extreme_cheap': is_extreme_cheap,
+        'is_extreme_expensive': is_extreme_expensive,
+        'mean_price': mean_price,
+        'std_price': std_price,
+        'support_levels': support_levels
+    }
+
+# ========== Relative Strength Significance Test ==========
+def calculate_relative_strength_score(stock_hist, market_hist, lookback_days=252):
+    """
+    Calculate relative strength and test statistical significance
+    """
+    combined = pd.DataFrame({
+        'stock': stock_hist['Close'],
+        'market': market_hist['Close']
+    }).dropna()
+    
+    if len(combined) < 30:
+        return 0, "Insufficient data"
+    
+    stock_returns = combined['stock'].pct_change().dropna()
+    market_returns = combined['market'].pct_change().dropna()
+    
+    excess_returns = stock_returns - market_returns
+    
+    mean_excess = np.mean(excess_returns) * 252
+    std_excess = np.std(excess_returns) * np.sqrt(252)
+    
+    recent_excess = excess_returns[-60:].mean() * 252 if len(excess_returns) >= 60 else mean_excess
+    
+    z_score = recent_excess / std_excess if std_excess > 0 else 0
+    
+    return classify_relative_strength(z_score)
+
+def classify_relative_strength(z_score):
+    """
+    (strength_score, significance) for a z-score of recent excess returns
+    """
+    if abs(z_score) < 0.5:
+        significance = "Not significant"
+        strength_score = 0
+    elif z_score > 1:
+        significance = "Significantly stronger than market"
+        strength_score = 1.0
+    elif z_score > 0.5:
+        significance = "Slightly stronger than market"
+        strength_score = 0.5
+    elif z_score < -1:
+        significance = "Significantly weaker than market"
+        strength_score = -1.0
+    elif z_score < -0.5:
+        significance = "Slightly weaker than market"
+        strength_score = -0.5
+    else:
+        significance = "In line with market"
+        strength_score = 0
+    
+    return strength_score, significance
+
+# ========== Improved Signal System ==========
+def get_buy_signal_improved(stock_drawdown, spx_drawdown=None, stock_quality=None, 
+                            strength_score=0, strength_desc=""):
+    """
+    Improved signal system incorporating statistical information
+    """
+    if stock_drawdown >= 30:
+        base_level = 5
+    elif stock_drawdown >= 25:
+        base_level = 4
+    elif stock_drawdown >= 20:
+        base_level = 3
+    elif stock_drawdown >= 15:
+        base_level = 2
+    elif stock_drawdown >= 10:
+        base_level = 1
+    elif stock_drawdown >= 5:
+        base_level = 0
+    else:
+        base_level = -1
+    
+    final_level = base_level + strength_score
+    
+    if stock_quality and not stock_quality['qualified'] and not stock_quality['is_core']:
+        final_level -= 1
+    
+    final_level = max(-1, min(5, final_level))
+    
+    if final_level >= 4.5:
+        stars = "⭐⭐⭐⭐⭐"
+    elif final_level >= 3.5:
+        stars = "⭐⭐⭐⭐"
+    elif final_level >= 2.5:
+        stars = "⭐⭐⭐"
+    elif final_level >= 1.5:
+        stars = "⭐⭐"
+    elif final_level >= 0.5:
+        stars = "⭐"
+    elif final_level >= -0.5:
+        stars = "⚪"
+    else:
+        stars = "⚫"
+    
+    if final_level >= 4:
+        action = "STRONG BUY"
+    elif final_level >= 3:
+        action = "BUY"
+    elif final_level >= 2:
+        action = "CONSIDER BUYING"
+    elif final_level >= 1:
+        action = "WATCH"
+    elif final_level >= 0:
+        action = "CAUTIOUS WATCH"
+    else:
+        action = "HOLD"
+    
+    details = []
+    if spx_drawdown is not None:
+        details.append(f"Market drawdown: {spx_drawdown:.1f}%")
+    if strength_desc:
+        details.append(strength_desc)
+    
+    return {
+        'stars': stars,
+        'action': action,
+        'level': final_level,
+        'details': details
+    }
+
+# ========== Original Signal System ==========
+def get_buy_signal_original(drawdown_decimal):
+    """Original signal system"""
+    if drawdown_decimal >= 0.30:
+        return {"stars": "⭐⭐⭐⭐⭐", "action": "STRONG BUY", "level": 5}
+    elif drawdown_decimal >= 0.25:
+        return {"stars": "⭐⭐⭐⭐", "action": "AGGRESSIVE BUY", "level": 4}
+    elif drawdown_decimal >= 0.20:
+        return {"stars": "⭐⭐⭐", "action": "BUY", "level": 3}
+    elif drawdown_decimal >= 0.15:
+        return {"stars": "⭐⭐", "action": "CONSIDER BUYING", "level": 2}
+    elif drawdown_decimal >= 0.10:
+        return {"stars": "⭐", "action": "WATCH & BUY", "level": 1}
+    elif drawdown_decimal >= 0.05:
+        return {"stars": "", "action": "CAUTIOUS WATCH", "level": 0}
+    else:
+        return {"stars": "", "action": "HOLD", "level": -1}
+
+# ========== Generate Quantitative Report ==========
+def generate_quant_report(ticker, current_price, drawdown_pct, 
+                          price_dist, strength_sig, star_level, 
+                          star_performance, quality_info):
+    """
+    Generate natural language quantitative decision report
+    """
+    report = []
+    
+    z_score = price_dist['z_score']
+    percentile = price_dist['percentile']
+    support_2sigma = price_dist['support_levels']['-2σ']
+    support_1sigma = price_dist['support_levels']['-1σ']
+    
+    if z_score < -2:
+        position_desc = "extremely cheap (below -2σ)"
+    elif z_score < -1:
+        position_desc = "reasonably cheap (between -2σ and -1σ)"
+    elif z_score < 0:
+        position_desc = "slightly cheap (between -1σ and mean)"
+    elif z_score < 1:
+        position_desc = "slightly expensive (between mean and +1σ)"
+    elif z_score < 2:
+        position_desc = "reasonably expensive (between +1σ and +2σ)"
+    else:
+        position_desc = "extremely expensive (above +2σ)"
+    
+    report.append(f"{ticker} is currently at ${current_price:.2f}, which is {position_desc}.")
+    report.append(f"Statistically, it's {abs(z_score):.2f} standard deviations from the mean, ")
+    report.append(f"cheaper than {percentile:.1f}% of historical prices.")
+    
+    if star_performance:
+        var_95 = star_performance['var_95']
+        intervals = star_performance.get('intervals')
+        confidence = f"{intervals['confidence']*100:.0f}% CI" if intervals else ""
+        report.append(f"\nRisk Assessment (95% Confidence VaR):")
+        report.append(f"If I buy now, there's a 95% probability that the price won't fall below ")
+        report.append(f"${current_price * (1 + var_95/100):.2f} in the near term (based on historical patterns).")
+        if intervals:
+            var_low, var_high = intervals['var_95']
+            report.append(f"Given only {star_performance['sample_size']} historical samples, that floor could be anywhere from ")
+            report.append(f"${current_price * (1 + var_low/100):.2f} to ${current_price * (1 + var_high/100):.2f} ({confidence}).")
+        
+        win_rate = star_performance['win_rate']
+        avg_win = star_performance['avg_win']
+        avg_loss = star_performance['avg_loss']
+        pl_ratio = star_performance['profit_loss_ratio']
+        
+        report.append(f"\nProbability Analysis:")
+        report.append(f"Historically, stocks at this star level ({star_level:.1f}⭐) have a ")
+        report.append(f"{win_rate*100:.1f}% probability of rebounding in the next 3 months.")
+        if intervals:
+            win_low, win_high = intervals['win_rate']
+            report.append(f"({confidence}: {win_low*100:.1f}% to {win_high*100:.1f}%, block bootstrap of {intervals['resamples']:,} resamples.)")
+        
+        if win_rate < 0.4:
+            report.append(f"The market is giving only a {win_rate*100:.1f}% chance of rebound, ")
+            report.append(f"suggesting we might need more time to bottom.")
+        elif win_rate > 0.6:
+            report.append(f"The {win_rate*100:.1f}% win rate suggests this is a statistically favorable entry point.")
+        
+        report.append(f"\nRisk-Reward Ratio:")
+        report.append(f"Average win: +{avg_win:.1f}% | Average loss: {avg_loss:.1f}% | ")
+        report.append(f"Profit/Loss ratio: {pl_ratio:.2f}:1")
+        if intervals:
+            pl_low, pl_high = intervals['profit_loss_ratio']
+            report.append(f"({confidence}: {pl_low:.2f} to {pl_high:.2f})")
+    
+    report.append(f"\nTrading Decision:")
+    if star_level >= 3:
+        if z_score < -1.5:
+            report.append(f"I can start with a small position here, and if it really drops to ")
+            report.append(f"${support_2sigma:.2f} (the -2σ level), I'll consider adding more. ")
+            report.append(f"This way, I follow my 52-week low logic while using VaR to manage risk, ")
+            report.append(f"and incorporate market probabilities.")
+        else:
+            report.append(f"Current price isn't at historical extremes. I'll wait for a better entry point ")
+            report.append(f"closer to ${support_1sigma:.2f} or ${support_2sigma:.2f}.")
+    else:
+        report.append(f"Not a statistically compelling entry point yet. Continue watching.")
+    
+    return " ".join(report)
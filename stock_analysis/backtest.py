@@ -0,0 +1,176 @@
+"""
+Vectorized star-level backtest.
+
+Computes the trailing 52-week high, drawdown, signal level and forward
+returns for a whole close series in single NumPy passes, and returns the
+statistics for every star level at once.
+"""
+import numpy as np
+
+# (minimum drawdown %, signal level), checked in order
+SIGNAL_THRESHOLDS = [
+    (30, 5),
+    (25, 4),
+    (20, 3),
+    (15, 2),
+    (10, 1),
+    (5, 0),
+]
+SIGNAL_LEVELS = [-1, 0, 1, 2, 3, 4, 5]
+
+TRADING_DAYS = 252
+
+# Sampling of the backtest: a signal is checked every SAMPLE_STEP bars,
+# needs MIN_WINDOW bars of history and must leave FORWARD_BUFFER bars
+# after it
+SAMPLE_STEP = 20
+MIN_WINDOW = 50
+FORWARD_BUFFER = 120
+MIN_FORWARD_BARS = 20
+MIN_SAMPLES = 10
+
+
+# ========== Rolling Window Helpers ==========
+def trailing_max(values, window=TRADING_DAYS):
+    """
+    Max over the trailing `window` rows, current row included, along axis 0.
+    Matches pandas rolling(window, min_periods=1).max(): NaN is ignored and
+    the first rows use whatever history they have.
+
+    Uses the van Herk / Gil-Werman block scheme, so the cost is linear in
+    the number of rows whatever the window. Works on 1D series and on
+    2D (dates x symbols) matrices.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.shape[0] == 0:
+        return values.copy()
+
+    matrix = values.reshape(values.shape[0], -1)
+    n, m = matrix.shape
+    w = max(1, min(window, n))
+
+    pad_front = w - 1
+    pad_back = (-(pad_front + n)) % w
+    padded = np.concatenate([
+        np.full((pad_front, m), -np.inf),
+        np.where(np.isnan(matrix), -np.inf, matrix),
+        np.full((pad_back, m), -np.inf),
+    ])
+
+    blocks = padded.reshape(-1, w, m)
+    prefix = np.maximum.accumulate(blocks, axis=1).reshape(-1, m)
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, m)
+
+    ends = np.arange(pad_front, pad_front + n)
+    result = np.maximum(suffix[ends - w + 1], prefix[ends])
+    result[np.isneginf(result)] = np.nan
+
+    return result.reshape(values.shape)
+
+
+def drawdown_from_high(close, high):
+    """
+    Drawdown % below the trailing high, 0 where the high is not positive
+    """
+    close = np.asarray(close, dtype=float)
+    high = np.asarray(high, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = (high - close) / high * 100
+    return np.where(high > 0, drawdown, 0.0)
+
+
+def drawdown_levels(drawdown_pct, thresholds=SIGNAL_THRESHOLDS):
+    """
+    Signal level for every drawdown value, same thresholds as
+    get_buy_signal_original (-1 below the lowest threshold)
+    """
+    drawdown_pct = np.asarray(drawdown_pct, dtype=float)
+    levels = np.full(drawdown_pct.shape, -1, dtype=np.int8)
+    # Walk from the lowest threshold up so higher levels overwrite lower ones
+    for threshold, level in reversed(thresholds):
+        levels[drawdown_pct >= threshold] = level
+    return levels
+
+
+# ========== Star Level Statistics ==========
+def summarize_returns(results):
+    """
+    Win rate, average win/loss, VaR and P/L ratio for a set of forward
+    returns in %. None when there are fewer than MIN_SAMPLES samples.
+    """
+    results = np.asarray(results, dtype=float)
+    if len(results) < MIN_SAMPLES:
+        return None
+
+    win_rate = np.sum(results > 0) / len(results)
+    avg_win = np.mean(results[results > 0]) if np.sum(results > 0) > 0 else 0
+    avg_loss = np.mean(results[results < 0]) if np.sum(results < 0) > 0 else 0
+
+    var_95 = np.percentile(results, 5)
+
+    if abs(avg_loss) > 0:
+        profit_loss_ratio = abs(avg_win / avg_loss) if avg_loss != 0 else 0
+    else:
+        profit_loss_ratio = 0
+
+    return {
+        'win_rate': win_rate,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'var_95': var_95,
+        'profit_loss_ratio': profit_loss_ratio,
+        'sample_size': len(results),
+        'results': results
+    }
+
+
+def signal_samples(close, holding_period=90, step=SAMPLE_STEP):
+    """
+    Backtest sample points for a close series.
+
+    Returns (levels, returns): the signal level at each sample date and the
+    forward return in % over up to `holding_period` bars. Samples without
+    enough forward bars are dropped.
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+
+    sample_idx = np.arange(0, max(n - FORWARD_BUFFER, 0), step)
+    sample_idx = sample_idx[sample_idx + 1 >= MIN_WINDOW]
+
+    forward_len = np.minimum(holding_period, n - 1 - sample_idx)
+    keep = forward_len > MIN_FORWARD_BARS
+    sample_idx = sample_idx[keep]
+    forward_len = forward_len[keep]
+
+    high = trailing_max(close, TRADING_DAYS)
+    levels = drawdown_levels(drawdown_from_high(close[sample_idx], high[sample_idx]))
+    returns = (close[sample_idx + forward_len] / close[sample_idx] - 1) * 100
+
+    return levels, returns
+
+
+def star_performance_table(close, holding_period=90):
+    """
+    Historical performance of every star level for one close series.
+    Returns {level: stats or None} for each level in SIGNAL_LEVELS.
+    """
+    close = np.asarray(close, dtype=float)
+    if len(close) < TRADING_DAYS:
+        return {level: None for level in SIGNAL_LEVELS}
+
+    levels, returns = signal_samples(close, holding_period)
+    return {level: summarize_returns(returns[levels == level]) for level in SIGNAL_LEVELS}
+
+
+def lookup_star_performance(table, star_level):
+    """
+    Stats for a (possibly fractional) star level. Only whole levels have a
+    history, so in-between levels such as 2.5 get None.
+    """
+    if table is None:
+        return None
+    level = int(round(star_level))
+    if abs(level - star_level) < 0.5:
+        return table.get(level)
+    return None
@@ -0,0 +1,181 @@
+"""
+Regression of many stocks against every benchmark index at once.
+
+Daily returns of the stocks form one (dates x stocks) matrix and those of
+all SECTOR_INDICES one (dates x indices) matrix. A handful of matrix
+products give, for every (stock, index) pair, the sums needed for beta,
+correlation, R² and the excess-return z-score of
+calculate_relative_strength_score, over the dates both have bars.
+
+The index with the highest R² is the one that explains a stock's moves
+best, and is recommended as its benchmark when the fit is good enough.
+
+    fits = fit_benchmarks(['NVDA', 'JPM'], registry)
+    recommend_benchmark('NVDA', fits)      # 'SOXX'
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from stock_analysis.analytics import classify_relative_strength, get_index_name, get_recommended_index
+from stock_analysis.backtest import TRADING_DAYS
+from stock_analysis.config import SECTOR_INDICES
+
+BENCHMARK_SYMBOLS = list(dict.fromkeys(SECTOR_INDICES.values()))
+
+# Excess returns of the last this many days are compared with the
+# year's volatility, as in calculate_relative_strength_score
+RECENT_DAYS = 60
+
+# Pairs with fewer common returns are not fitted
+MIN_OBSERVATIONS = 30
+
+# Below this R² no index explains the stock well, and the sector map
+# decides instead
+MIN_R_SQUARED = 0.1
+
+
+# ========== Matrix Helpers ==========
+def return_matrix(closes):
+    """
+    Daily returns of a (dates x symbols) close matrix; NaN where either
+    close is missing
+    """
+    closes = np.asarray(closes, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return closes[1:] / closes[:-1] - 1
+
+
+def regress_matrix(stock_returns, index_returns, recent_days=RECENT_DAYS):
+    """
+    Beta, correlation, R², excess-return z-score and observation count of
+    every stock column against every index column, each as a
+    (stocks x indices) array. Both inputs are (dates x columns) on the
+    same dates; NaN returns leave that date out of the pairs involved.
+    """
+    stock_mask = ~np.isnan(stock_returns)
+    index_mask = ~np.isnan(index_returns)
+    x = np.where(stock_mask, stock_returns, 0.0)
+    y = np.where(index_mask, index_returns, 0.0)
+    ms = stock_mask.astype(float)
+    mi = index_mask.astype(float)
+
+    def pair_sums(rows):
+        # Sums over the dates where both the stock and the index have a return
+        return {
+            'n': ms[rows].T @ mi[rows],
+            'x': x[rows].T @ mi[rows],
+            'y': ms[rows].T @ y[rows],
+            'xx': (x[rows] ** 2).T @ mi[rows],
+            'yy': ms[rows].T @ (y[rows] ** 2),
+            'xy': x[rows].T @ y[rows],
+        }
+
+    full = pair_sums(slice(None))
+
+    # The recent window of a pair is its last recent_days jointly valid
+    # dates, not the last rows of the date axis: gaps or a different
+    # holiday calendar would otherwise leave it short
+    joint = ms[:, :, None] * mi[:, None, :]
+    joint_from_end = np.cumsum(joint[::-1], axis=0)[::-1]
+    window = joint * (joint_from_end <= recent_days)
+    recent = {
+        'n': window.sum(axis=0),
+        'x': np.einsum('ts,tsi->si', x, window),
+        'y': np.einsum('ti,tsi->si', y, window),
+    }
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        n = full['n']
+        mean_x = full['x'] / n
+        mean_y = full['y'] / n
+        cov = full['xy'] / n - mean_x * mean_y
+        var_x = np.maximum(full['xx'] / n - mean_x ** 2, 0.0)
+        var_y = np.maximum(full['yy'] / n - mean_y ** 2, 0.0)
+        beta = np.where(var_y > 0, cov / var_y, np.nan)
+        correlation = np.where((var_x > 0) & (var_y > 0), cov / np.sqrt(var_x * var_y), np.nan)
+
+        # Excess returns x - y: annualized mean of the recent window over
+        # the annualized (population) standard deviation of the whole year
+        mean_excess = mean_x - mean_y
+        var_excess = np.maximum(
+            (full['xx'] - 2 * full['xy'] + full['yy']) / n - mean_excess ** 2, 0.0
+        )
+        std_excess = np.sqrt(var_excess) * np.sqrt(TRADING_DAYS)
+        recent_excess = np.where(
+            n >= recent_days, (recent['x'] - recent['y']) / recent['n'], mean_excess
+        ) * TRADING_DAYS
+        excess_z = np.where(std_excess > 0, recent_excess / std_excess, 0.0)
+
+    enough = n >= MIN_OBSERVATIONS
+    return {
+        'beta': np.where(enough, beta, np.nan),
+        'correlation': np.where(enough, correlation, np.nan),
+        'r_squared': np.where(enough, correlation ** 2, np.nan),
+        'excess_z': np.where(enough, excess_z, np.nan),
+        'observations': n.astype(int),
+    }
+
+
+# ========== Benchmark Fit ==========
+def fit_closes(stock_closes, index_closes, recent_days=RECENT_DAYS):
+    """
+    Fit table for two close frames (columns are symbols) over the union
+    of their dates: one row per (ticker, benchmark) with beta,
+    correlation, R², excess-return z-score and its strength label
+    """
+    frame = pd.concat([stock_closes, index_closes], axis=1).sort_index()
+    returns = return_matrix(frame.to_numpy(dtype=float))
+    stocks = list(stock_closes.columns)
+    indices = list(index_closes.columns)
+    fit = regress_matrix(returns[:, :len(stocks)], returns[:, len(stocks):], recent_days)
+
+    rows = []
+    for i, ticker in enumerate(stocks):
+        for j, benchmark in enumerate(indices):
+            z_score = fit['excess_z'][i, j]
+            strength_score, significance = (
+                classify_relative_strength(z_score) if not np.isnan(z_score) else (None, "Insufficient data")
+            )
+            rows.append({
+                'ticker': ticker,
+                'benchmark': benchmark,
+                'name': get_index_name(benchmark),
+                'beta': fit['beta'][i, j],
+                'correlation': fit['correlation'][i, j],
+                'r_squared': fit['r_squared'][i, j],
+                'excess_z': z_score,
+                'strength_score': strength_score,
+                'significance': significance,
+                'observations': fit['observations'][i, j],
+            })
+    return pd.DataFrame(rows)
+
+
+def fit_benchmarks(tickers, registry, benchmarks=None, period="1y"):
+    """
+    Fit every ticker against every benchmark (default: all
+    SECTOR_INDICES) on `period` of history from a HistoryRegistry. All
+    symbols are loaded with one registry prefetch.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    benchmarks = list(benchmarks or BENCHMARK_SYMBOLS)
+    registry.prefetch(tickers + benchmarks)
+
+    def closes(symbols):
+        return pd.DataFrame({s: registry.get(s, period)['Close'] for s in symbols}, columns=symbols)
+
+    return fit_closes(closes(tickers), closes(benchmarks))
+
+
+def recommend_benchmark(ticker, fits):
+    """
+    Benchmark with the highest R² for ticker in a fit table, or the
+    sector-map recommendation when no index reaches MIN_R_SQUARED
+    """
+    candidates = fits[(fits['ticker'] == ticker) & (fits['r_squared'] >= MIN_R_SQUARED)]
+    if candidates.empty:
+        return get_recommended_index(ticker)
+    return candidates.loc[candidates['r_squared'].idxmax(), 'benchmark']
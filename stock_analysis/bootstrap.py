@@ -0,0 +1,155 @@
+"""
+Bootstrap confidence intervals for the star-level backtest statistics.
+
+A star level's win rate, P/L ratio and VaR come from a few dozen forward
+returns sampled every SAMPLE_STEP bars. Their holding periods overlap, so
+neighbouring samples are correlated, and resampling them one by one would
+understate the uncertainty. A moving-block bootstrap instead draws runs
+of `block_length` consecutive samples (wrapping around at the end) and
+recomputes every statistic for all resamples in one NumPy pass over a
+(resamples x samples) matrix.
+
+Random numbers come from a generator seeded with the configured seed, the
+ticker and the level. Intervals are therefore reproducible, and they do
+not depend on which process computed them.
+
+    intervals = level_intervals('NVDA', 3, stats['results'])
+    intervals['win_rate']      # (low, high)
+"""
+import math
+import os
+import zlib
+
+import numpy as np
+
+from stock_analysis.backtest import MIN_SAMPLES, SAMPLE_STEP
+from stock_analysis.pipeline import get_process_pool
+
+BOOTSTRAP_CONFIG = {
+    'RESAMPLES': int(os.environ.get('STOCK_APP_BOOTSTRAP_RESAMPLES', 10000)),
+    'CONFIDENCE': 0.95,
+    'SEED': int(os.environ.get('STOCK_APP_BOOTSTRAP_SEED', 0)),
+    # Processes for bootstrap_tickers(); 0 or 1 runs on the calling thread
+    'PROCESSES': int(os.environ.get('STOCK_APP_BOOTSTRAP_PROCESSES', os.cpu_count() or 1)),
+}
+
+INTERVAL_STATS = ['win_rate', 'profit_loss_ratio', 'var_95']
+
+
+def block_length_for(holding_period, step=SAMPLE_STEP):
+    """
+    Samples whose forward windows overlap: a block spans one holding period
+    """
+    return max(1, math.ceil(holding_period / step))
+
+
+def rng_for(ticker, level, seed=None):
+    """
+    Generator seeded by (seed, ticker, level), the same in every process
+    """
+    seed = BOOTSTRAP_CONFIG['SEED'] if seed is None else seed
+    return np.random.default_rng([seed, zlib.crc32(str(ticker).encode()), int(level) + 1])
+
+
+# ========== Resampling ==========
+def block_bootstrap_indices(n, resamples, block_length, rng):
+    """
+    (resamples x n) sample indices drawn as circular blocks of
+    block_length consecutive samples
+    """
+    block_length = max(1, min(block_length, n))
+    blocks = -(-n // block_length)
+    starts = rng.integers(0, n, size=(resamples, blocks))
+    indices = (starts[:, :, None] + np.arange(block_length)) % n
+    return indices.reshape(resamples, blocks * block_length)[:, :n]
+
+
+def resample_statistics(samples):
+    """
+    summarize_returns() statistics for every row of a (resamples x n)
+    matrix of forward returns in %, as arrays
+    """
+    wins = samples > 0
+    losses = samples < 0
+    win_count = wins.sum(axis=1)
+    loss_count = losses.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_win = np.where(win_count > 0, np.where(wins, samples, 0.0).sum(axis=1) / win_count, 0.0)
+        avg_loss = np.where(loss_count > 0, np.where(losses, samples, 0.0).sum(axis=1) / loss_count, 0.0)
+        profit_loss_ratio = np.where(avg_loss != 0, np.abs(avg_win / avg_loss), 0.0)
+
+    return {
+        'win_rate': win_count / samples.shape[1],
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'var_95': np.percentile(samples, 5, axis=1),
+        'profit_loss_ratio': profit_loss_ratio,
+    }
+
+
+def bootstrap_intervals(results, rng, resamples=None, block_length=None, confidence=None):
+    """
+    Percentile confidence intervals of win rate, P/L ratio and VaR for one
+    set of forward returns in time order. Returns {stat: (low, high)} plus
+    the settings used, or None with fewer than MIN_SAMPLES returns.
+    """
+    results = np.asarray(results, dtype=float)
+    if len(results) < MIN_SAMPLES:
+        return None
+    resamples = resamples or BOOTSTRAP_CONFIG['RESAMPLES']
+    block_length = block_length or block_length_for(90)
+    confidence = confidence or BOOTSTRAP_CONFIG['CONFIDENCE']
+
+    indices = block_bootstrap_indices(len(results), resamples, block_length, rng)
+    stats = resample_statistics(results[indices])
+    tail = (1 - confidence) / 2 * 100
+
+    intervals = {}
+    for name in INTERVAL_STATS:
+        low, high = np.percentile(stats[name], [tail, 100 - tail])
+        intervals[name] = (float(low), float(high))
+    intervals.update({'confidence': confidence, 'resamples': resamples, 'block_length': block_length})
+    return intervals
+
+
+# ========== Star Levels ==========
+def level_intervals(ticker, level, results, holding_period=90, resamples=None, seed=None):
+    """
+    Intervals for one star level's forward returns, seeded by ticker and
+    level
+    """
+    return bootstrap_intervals(
+        results, rng_for(ticker, level, seed), resamples, block_length_for(holding_period)
+    )
+
+
+def table_intervals(ticker, table, holding_period=90, resamples=None, seed=None):
+    """
+    {level: intervals or None} for every level of a star_performance_table
+    """
+    return {
+        level: level_intervals(ticker, level, stats['results'], holding_period, resamples, seed)
+        if stats else None
+        for level, stats in table.items()
+    }
+
+
+def _table_intervals_task(args):
+    return table_intervals(*args)
+
+
+def bootstrap_tickers(tables, holding_period=90, resamples=None, seed=None, processes=None):
+    """
+    table_intervals() for many tickers, {ticker: star_performance_table},
+    spread over the shared process pool. Returns {ticker: {level: intervals}}.
+    """
+    processes = BOOTSTRAP_CONFIG['PROCESSES'] if processes is None else processes
+    tickers = list(tables)
+    tasks = [(ticker, tables[ticker], holding_period, resamples, seed) for ticker in tickers]
+    if processes > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (processes * 4))
+        results = get_process_pool(processes).map(_table_intervals_task, tasks, chunksize=chunksize)
+    else:
+        results = map(_table_intervals_task, tasks)
+    return dict(zip(tickers, results))
@@ -0,0 +1,273 @@
+"""
+Process-wide, memory-bounded caches for computed results.
+
+Every cache is an LRU bounded by entry count, and all registered caches
+share one byte budget (TOTAL_BYTES) for the estimated size of their
+values, so a server with many sessions stays within a fixed memory
+ceiling however many caches it has. When the budget is exceeded, the
+least recently used entry of any cache is evicted. A cache can also have
+its own byte limit, and entries can expire after a time-to-live.
+Callers build keys from what the result actually depends on (symbol,
+last bar date, parameters), not from every argument they happen to have.
+
+    cache = get_cache('star_performance')
+    table = cache.get_or_compute((ticker, last_date, 90), compute)
+
+Hits and misses are counted in the run metrics as
+cache_requests{cache=..., result=...}; cache_stats() reports entries,
+bytes and evictions of every cache, and budget_stats() the shared budget.
+"""
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stock_analysis.metrics import active_metrics
+from stock_analysis.singleflight import SingleFlight
+
+CACHE_CONFIG = {
+    # Bytes shared by every registered cache, process-wide
+    'TOTAL_BYTES': int(os.environ.get('STOCK_APP_CACHE_MB', 512)) * 1024 * 1024,
+    # Default bounds for caches created by get_cache(); None for no
+    # per-cache byte limit beyond the shared budget
+    'MAX_ENTRIES': int(os.environ.get('STOCK_APP_CACHE_ENTRIES', 4096)),
+    'MAX_BYTES': None,
+}
+
+# Global recency: every store and hit takes the next number, so the
+# oldest entry of all caches is the one with the smallest
+_recency = itertools.count()
+
+
+def sizeof(value):
+    """
+    Estimated memory held by a cached value, in bytes. Frames and arrays
+    count their buffers; containers count their items.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and optionally by total
+    bytes, with an optional time-to-live. The least recently used entries
+    are evicted first; one entry larger than max_bytes is still kept on
+    its own. Once registered, it also counts against the shared budget.
+    """
+
+    def __init__(self, name, max_entries=None, max_bytes=None, ttl=None, sizer=sizeof):
+        self.name = name
+        self.max_entries = max_entries or CACHE_CONFIG['MAX_ENTRIES']
+        self.max_bytes = max_bytes or CACHE_CONFIG['MAX_BYTES']
+        self.ttl = ttl
+        self._sizer = sizer
+        self._registered = False
+        # key -> (value, size, stored_at, recency)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._flights = SingleFlight(name)
+        self.counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+        }
+
+    def _drop(self, key):
+        size = self._entries.pop(key)[1]
+        self._bytes -= size
+
+    def _oldest(self):
+        """
+        (recency, key) of the least recently used entry, or None
+        """
+        with self._lock:
+            if not self._entries:
+                return None
+            key = next(iter(self._entries))
+            return self._entries[key][3], key
+
+    def _evict_oldest(self, recency):
+        """
+        Evict the least recently used entry if it is still the one with
+        this recency; returns whether it was
+        """
+        with self._lock:
+            if not self._entries:
+                return False
+            key = next(iter(self._entries))
+            if self._entries[key][3] != recency:
+                return False
+            self._drop(key)
+            self.counters['evictions'] += 1
+            return True
+
+    def lookup(self, key):
+        """
+        (True, value) on a hit, (False, None) on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[2] > self.ttl:
+                self._drop(key)
+                self.counters['expirations'] += 1
+                entry = None
+            if entry is None:
+                self.counters['misses'] += 1
+                return False, None
+            self._entries[key] = entry[:3] + (next(_recency),)
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return True, entry[0]
+
+    def get(self, key):
+        return self.lookup(key)[1]
+
+    def put(self, key, value):
+        size = self._sizer(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.time(), next(_recency))
+            self._bytes += size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._drop(next(iter(self._entries)))
+                self.counters['evictions'] += 1
+        if self._registered:
+            enforce_budget()
+
+    def get_or_compute(self, key, func, *args, **kwargs):
+        """
+        Cached value for key, or func(*args, **kwargs) stored under key.
+        Concurrent misses for one key share a single computation; results
+        of None and exceptions are not cached.
+        """
+        found, value = self.lookup(key)
+        active_metrics().increment('cache_requests', cache=self.name, result='hit' if found else 'miss')
+        if found:
+            return value
+
+        def compute():
+            value = func(*args, **kwargs)
+            if value is not None:
+                self.put(key, value)
+            return value
+
+        return self._flights.do(key, compute)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Counters plus current size and bounds, for display
+        """
+        with self._lock:
+            return dict(
+                self.counters,
+                cache=self.name,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+            )
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+# Serializes budget enforcement; taken before any cache's own lock, and
+# only one cache lock is held at a time
+_budget_lock = threading.Lock()
+
+
+def register_cache(cache):
+    """
+    Put a cache under the shared budget and make it visible in
+    cache_stats(); returns it
+    """
+    with _caches_lock:
+        _caches[cache.name] = cache
+        cache._registered = True
+    enforce_budget()
+    return cache
+
+
+def get_cache(name, max_entries=None, max_bytes=None, ttl=None):
+    """
+    Process-wide cache by name, created with these bounds on first use
+    """
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = LRUCache(name, max_entries, max_bytes, ttl)
+            cache._registered = True
+        return cache
+
+
+def enforce_budget(total_bytes=None):
+    """
+    Evict the least recently used entries across all registered caches
+    until they fit in total_bytes (default TOTAL_BYTES). The most recent
+    entry is kept even if it alone is larger. Returns the evictions made.
+    """
+    total_bytes = CACHE_CONFIG['TOTAL_BYTES'] if total_bytes is None else total_bytes
+    with _caches_lock:
+        caches = list(_caches.values())
+    evicted = 0
+    with _budget_lock:
+        while sum(cache._bytes for cache in caches) > total_bytes:
+            if sum(len(cache._entries) for cache in caches) <= 1:
+                break
+            candidates = []
+            for cache in caches:
+                oldest = cache._oldest()
+                if oldest is not None:
+                    candidates.append((oldest[0], cache))
+            recency, cache = min(candidates, key=lambda candidate: candidate[0])
+            # A hit may have refreshed the entry meanwhile; then look again
+            if cache._evict_oldest(recency):
+                evicted += 1
+    return evicted
+
+
+def budget_stats():
+    """
+    Bytes held by all registered caches and the shared budget
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {
+        'bytes': sum(cache._bytes for cache in caches),
+        'total_bytes': CACHE_CONFIG['TOTAL_BYTES'],
+    }
+
+
+def cache_stats():
+    """
+    stats() of every registered cache, by name
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in sorted(caches, key=lambda c: c.name)]
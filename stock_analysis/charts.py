@@ -0,0 +1,164 @@
+"""
+Price chart rendering with an in-memory image cache.
+
+Each chart is drawn once per (ticker, date range, last bar, layout) into
+PNG or SVG bytes and kept in a size-bounded LRU cache, so reruns and
+other sessions showing the same chart reuse the image. Figures are built
+with matplotlib's object API instead of pyplot, so nothing is registered
+in pyplot's global figure list, and each figure is cleared as soon as its
+image is written. Long series are downsampled before plotting.
+"""
+import io
+import os
+import threading
+
+import numpy as np
+
+from stock_analysis.cache import LRUCache, register_cache
+from stock_analysis.metrics import active_metrics
+
+CHART_CONFIG = {
+    # Points plotted per line; longer series are downsampled
+    'MAX_POINTS': 600,
+    # Cached images, by count and by total size
+    'CACHE_ENTRIES': int(os.environ.get('STOCK_APP_CHART_CACHE_ENTRIES', 256)),
+    'CACHE_BYTES': int(os.environ.get('STOCK_APP_CHART_CACHE_MB', 64)) * 1024 * 1024,
+    'FIGSIZE': (10, 4),
+    'DPI': 100,
+}
+
+
+# ========== Downsampling ==========
+def downsample(x, y, max_points=None):
+    """
+    Reduce a series to about max_points points for plotting. The series
+    is cut into equal buckets and each bucket keeps its lowest and highest
+    point in time order, so peaks and troughs survive. The first and last
+    points are always kept. Returns (x, y) unchanged when short enough.
+    """
+    max_points = max_points or CHART_CONFIG['MAX_POINTS']
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points or max_points < 4:
+        return x, y
+
+    buckets = (max_points - 2) // 2
+    edges = np.linspace(1, n - 1, buckets + 1).astype(int)
+    keep = [0]
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop <= start:
+            continue
+        segment = y[start:stop]
+        keep.extend(sorted({start + int(np.nanargmin(segment)), start + int(np.nanargmax(segment))}))
+    keep.append(n - 1)
+
+    keep = np.asarray(keep)
+    return np.asarray(x)[keep], y[keep]
+
+
+# ========== Rendering ==========
+def render_price_chart(ticker, hist, layout='compact', fmt='png', max_points=None):
+    """
+    Draw the 6-month price chart with statistical bands and return the
+    image bytes. 'detailed' adds price labels and the 52-week high line,
+    as shown for a single stock; 'compact' is the grid version.
+    """
+    from matplotlib.figure import Figure
+
+    close = hist["Close"]
+    mean_price = np.mean(close)
+    std_price = np.std(close)
+    dates, prices = downsample(hist.index.values, close.values, max_points)
+
+    fig = Figure(figsize=CHART_CONFIG['FIGSIZE'], dpi=CHART_CONFIG['DPI'])
+    try:
+        ax = fig.subplots()
+        ax.plot(dates, prices, linewidth=2, color='blue')
+
+        if layout == 'detailed':
+            ax.axhline(y=mean_price, color='orange', linestyle='-', alpha=0.5, label=f'Mean: ${mean_price:.2f}')
+            ax.axhline(y=mean_price - std_price, color='gray', linestyle='--', alpha=0.5, label=f'-1σ: ${mean_price - std_price:.2f}')
+            ax.axhline(y=mean_price - 2*std_price, color='red', linestyle='--', alpha=0.5, label=f'-2σ: ${mean_price - 2*std_price:.2f}')
+
+            if len(hist) > 20:
+                high_52w = close.rolling(min(252, len(hist)), min_periods=1).max().iloc[-1]
+                ax.axhline(y=high_52w, color='red', linestyle='--', alpha=0.5, label=f'52W High: ${high_52w:.2f}')
+
+            ax.set_title(f"{ticker} - 6 Month Trend with Statistical Bands")
+            ax.set_xlabel("Date")
+            ax.set_ylabel("Price ($)")
+        else:
+            ax.axhline(y=mean_price, color='orange', linestyle='-', alpha=0.5, label='Mean')
+            ax.axhline(y=mean_price - std_price, color='gray', linestyle='--', alpha=0.5, label='-1σ')
+            ax.axhline(y=mean_price - 2*std_price, color='red', linestyle='--', alpha=0.5, label='-2σ')
+            ax.set_title(f"{ticker}")
+
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc='upper left')
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def chart_key(ticker, hist, layout='compact', fmt='png'):
+    """
+    Cache key: the ticker, the date range and the last bar, so a new bar
+    or a re-adjusted history gives a new chart
+    """
+    if hist.empty:
+        return (ticker, None, None, 0, None, layout, fmt)
+    return (
+        ticker,
+        hist.index[0].strftime('%Y-%m-%d'),
+        hist.index[-1].strftime('%Y-%m-%d'),
+        len(hist),
+        round(float(hist["Close"].iloc[-1]), 6),
+        layout,
+        fmt,
+    )
+
+
+# ========== Image Cache ==========
+class ChartCache(LRUCache):
+    """
+    LRU cache of rendered chart images, bounded by entry count and total
+    bytes
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        super().__init__(
+            'chart',
+            max_entries=max_entries or CHART_CONFIG['CACHE_ENTRIES'],
+            max_bytes=max_bytes or CHART_CONFIG['CACHE_BYTES'],
+            sizer=len
+        )
+
+    def chart(self, ticker, hist, layout='compact', fmt='png'):
+        """
+        Image bytes for a ticker's chart, rendered only on a cache miss
+        """
+        def render():
+            with active_metrics().span('chart_render'):
+                return render_price_chart(ticker, hist, layout, fmt)
+
+        return self.get_or_compute(chart_key(ticker, hist, layout, fmt), render)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_chart_cache():
+    """
+    Process-wide chart cache, shared by every session
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = register_cache(ChartCache())
+        return _default_cache
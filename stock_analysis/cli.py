@@ -0,0 +1,315 @@
+"""
+Command line screener, no browser or Streamlit session needed.
+
+    python -m stock_analysis screen AAPL MSFT NVDA
+    python -m stock_analysis screen --user alice -o alice.csv
+    python -m stock_analysis screen --universe russell3000.txt -o nightly.parquet --workers 16
+    python -m stock_analysis rank --universe russell3000.txt -o ranked.csv --top 100
+    python -m stock_analysis sweep --universe sp500.txt --thresholds 10,20,30 -o sweep.csv
+
+Exit codes: 0 every ticker analyzed, 1 some tickers had no data or
+failed, 2 bad arguments or unreadable input, 3 no ticker could be
+analyzed.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+from stock_analysis.config import SECTOR_INDICES
+from stock_analysis.metrics import write_prometheus
+from stock_analysis.pipeline import TickerPipeline, PIPELINE_CONFIG
+from stock_analysis.screener import screen
+from stock_analysis.sweep import SWEEP_CONFIG, heatmap, sweep_universe
+from stock_analysis.universe import NO_DATA_LEVEL, SORT_COLUMNS, STALE_LEVEL, screen_universe
+from stock_analysis.watchlist_store import get_watchlist_store
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+OUTPUT_FORMATS = ['csv', 'parquet', 'json']
+
+
+# ========== Input Files ==========
+def read_watchlist(path):
+    """
+    Symbols from a watchlist JSON file (a list of tickers)
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a JSON list of tickers")
+    return [str(s).strip().upper() for s in data if str(s).strip()]
+
+
+def read_universe(path):
+    """
+    Symbols from a universe file: a CSV with a Symbol/Ticker column, or
+    plain text with one symbol per line (# starts a comment)
+    """
+    if path.lower().endswith('.csv'):
+        frame = pd.read_csv(path)
+        column = next((c for c in frame.columns if c.strip().lower() in ('symbol', 'ticker')), None)
+        if column is None:
+            raise ValueError(f"{path}: no Symbol or Ticker column")
+        values = frame[column].dropna().astype(str)
+    else:
+        with open(path, 'r') as f:
+            values = [line.split('#', 1)[0] for line in f]
+    return [v.strip().upper() for v in values if v.strip()]
+
+
+# ========== Output ==========
+def write_results(records, path, fmt=None):
+    """
+    Write result records as CSV, Parquet or JSON. The format comes from
+    fmt or else from the file extension; '-' writes CSV to stdout.
+    """
+    frame = pd.DataFrame(records)
+    if path == '-':
+        frame.to_csv(sys.stdout, index=False)
+        return
+
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower() or 'csv'
+    if fmt == 'csv':
+        frame.to_csv(path, index=False, encoding='utf-8-sig')
+    elif fmt == 'parquet':
+        frame.to_parquet(path, index=False)
+    elif fmt == 'json':
+        frame.to_json(path, orient='records', indent=2, force_ascii=False)
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
+
+
+# ========== Commands ==========
+def collect_symbols(args):
+    """
+    Symbols from the command line plus any saved watchlist, watchlist
+    and universe file.
+    Prints the problem and returns None when the input is unusable.
+    """
+    tickers = [s.upper() for s in args.symbols]
+    if args.user:
+        tickers += get_watchlist_store().get(args.user)
+    try:
+        if args.watchlist:
+            tickers += read_watchlist(args.watchlist)
+        if args.universe:
+            tickers += read_universe(args.universe)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return None
+
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        print("error: no symbols given (use SYMBOL..., --user, --watchlist or --universe)", file=sys.stderr)
+        return None
+    return tickers
+
+
+def setup_metrics_log(path):
+    """
+    Send the per-run JSON metrics line to a file, or stderr for '-'
+    """
+    handler = logging.StreamHandler(sys.stderr) if path == '-' else logging.FileHandler(path)
+    metrics_logger = logging.getLogger('stock_analysis.metrics')
+    metrics_logger.addHandler(handler)
+    metrics_logger.setLevel(logging.INFO)
+    metrics_logger.propagate = False
+
+
+def run_screen(args):
+    tickers = collect_symbols(args)
+    if tickers is None:
+        return EXIT_USAGE
+    if args.metrics_log:
+        setup_metrics_log(args.metrics_log)
+
+    pipeline = TickerPipeline(io_workers=args.workers, backtest_processes=args.processes)
+    started = time.perf_counter()
+
+    def show_progress(done, total, ticker):
+        if not args.quiet and (done == total or done % 50 == 0):
+            print(f"  {done}/{total} analyzed", file=sys.stderr)
+
+    if not args.quiet:
+        print(f"Screening {len(tickers)} symbols against {args.benchmark}...", file=sys.stderr)
+
+    analyses, registry = screen(
+        tickers,
+        benchmark_symbol=args.benchmark,
+        use_improved=args.mode == 'quant',
+        pipeline=pipeline,
+        refresh_metadata=not args.no_metadata_refresh,
+        progress=show_progress
+    )
+    records = [a['record'] for a in analyses]
+
+    try:
+        write_results(records, args.output, args.format)
+        if args.prometheus:
+            write_prometheus(args.prometheus)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"error: cannot write output: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    ok = sum(r['status'] == 'ok' for r in records)
+    if not args.quiet:
+        print(f"Done in {time.perf_counter() - started:.1f}s: {ok}/{len(records)} analyzed, "
+              f"results in {args.output}", file=sys.stderr)
+        stale = [r['ticker'] for r in records if r['data_status'] == 'stale']
+        if stale:
+            print(f"warning: Yahoo did not answer, stored data used for {', '.join(stale)}", file=sys.stderr)
+
+    if ok == len(records):
+        return EXIT_OK
+    return EXIT_PARTIAL if ok else EXIT_FAILED
+
+
+def run_rank(args):
+    tickers = collect_symbols(args)
+    if tickers is None:
+        return EXIT_USAGE
+
+    started = time.perf_counter()
+    if not args.quiet:
+        print(f"Ranking {len(tickers)} symbols over {args.period}...", file=sys.stderr)
+
+    table, timings = screen_universe(tickers, period=args.period, sort_by=args.sort)
+    missing = int((table['level'] == NO_DATA_LEVEL).sum())
+    stale = int((table['level'] == STALE_LEVEL).sum())
+    if args.top:
+        table = table.head(args.top)
+
+    try:
+        write_results(table.to_dict('records'), args.output, args.format)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"error: cannot write {args.output}: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if not args.quiet:
+        fetch_seconds = sum(t['seconds'] for t in timings)
+        print(f"Done in {time.perf_counter() - started:.1f}s ({fetch_seconds:.1f}s loading data), "
+              f"{missing} symbols without data, {stale} stale, results in {args.output}", file=sys.stderr)
+
+    if missing == 0:
+        return EXIT_OK
+    return EXIT_PARTIAL if missing < len(tickers) else EXIT_FAILED
+
+
+def run_sweep(args):
+    tickers = collect_symbols(args)
+    if tickers is None:
+        return EXIT_USAGE
+
+    started = time.perf_counter()
+    if not args.quiet:
+        print(f"Sweeping {len(args.thresholds)} thresholds x {len(args.holding_periods)} holding periods x "
+              f"{len(args.steps)} steps over {len(tickers)} symbols...", file=sys.stderr)
+
+    table, timings = sweep_universe(
+        tickers, args.thresholds, args.holding_periods, args.steps,
+        period=args.period, processes=args.processes
+    )
+    if args.pivot:
+        table = heatmap(table, args.pivot, step=args.steps[0])
+        table.columns = [f"hold_{period}" for period in table.columns]
+        table = table.reset_index()
+
+    try:
+        write_results(table.to_dict('records'), args.output, args.format)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"error: cannot write {args.output}: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if not args.quiet:
+        fetch_seconds = sum(t['seconds'] for t in timings)
+        print(f"Done in {time.perf_counter() - started:.1f}s ({fetch_seconds:.1f}s loading data), "
+              f"results in {args.output}", file=sys.stderr)
+    return EXIT_OK
+
+
+def int_list(value):
+    try:
+        return [int(v) for v in value.split(',') if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {value!r}")
+
+
+def add_input_arguments(parser):
+    parser.add_argument('symbols', nargs='*', help="Symbols to screen")
+    parser.add_argument('--user', help="Saved watchlist of this app user")
+    parser.add_argument('--watchlist', help="Watchlist JSON file (list of tickers)")
+    parser.add_argument('--universe', help="Universe file: one symbol per line, or CSV with a Symbol column")
+    parser.add_argument('-o', '--output', default='-', help="Output file, '-' for CSV on stdout (default)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, help="Output format (default: from extension)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="No progress output")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m stock_analysis',
+        description="Headless 52-week drawdown screener"
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    screen_parser = commands.add_parser('screen', help="Analyze a list of symbols and write the results")
+    add_input_arguments(screen_parser)
+    screen_parser.add_argument('--benchmark', default='^GSPC',
+                               help=f"Benchmark index symbol (default: ^GSPC; e.g. "
+                                    f"{', '.join(list(SECTOR_INDICES.values())[:4])})")
+    screen_parser.add_argument('--mode', choices=['quant', 'original'], default='quant',
+                               help="Signal system (default: quant)")
+    screen_parser.add_argument('--workers', type=int, default=PIPELINE_CONFIG['IO_WORKERS'],
+                               help="Worker threads (default: %(default)s)")
+    screen_parser.add_argument('--processes', type=int, default=PIPELINE_CONFIG['BACKTEST_PROCESSES'],
+                               help="Backtest processes, 0 to backtest on the worker threads (default: %(default)s)")
+    screen_parser.add_argument('--no-metadata-refresh', action='store_true',
+                               help="Use stored symbol metadata only, no .info calls")
+    screen_parser.add_argument('--metrics-log', metavar='FILE',
+                               help="Append a JSON line with per-stage timings and request counts ('-' for stderr)")
+    screen_parser.add_argument('--prometheus', metavar='FILE',
+                               help="Write run metrics in Prometheus text format")
+    screen_parser.set_defaults(func=run_screen)
+
+    rank_parser = commands.add_parser(
+        'rank', help="Rank a large universe by 52-week drawdown with the vectorized matrix screener"
+    )
+    add_input_arguments(rank_parser)
+    rank_parser.add_argument('--period', default='1y', choices=['1y', '2y', '5y'],
+                             help="History for z-score and percentile (default: 1y)")
+    rank_parser.add_argument('--sort', default='drawdown', choices=sorted(SORT_COLUMNS),
+                             help="Ranking column (default: drawdown)")
+    rank_parser.add_argument('--top', type=int, help="Only write the first N rows")
+    rank_parser.set_defaults(func=run_rank)
+
+    sweep_parser = commands.add_parser(
+        'sweep', help="Win rate and expectancy of the drawdown signal over a grid of parameters"
+    )
+    add_input_arguments(sweep_parser)
+    sweep_parser.add_argument('--thresholds', type=int_list, default=SWEEP_CONFIG['THRESHOLDS'],
+                              help="Drawdown thresholds in %% (default: %(default)s)")
+    sweep_parser.add_argument('--holding-periods', type=int_list, default=SWEEP_CONFIG['HOLDING_PERIODS'],
+                              help="Holding periods in bars (default: %(default)s)")
+    sweep_parser.add_argument('--steps', type=int_list, default=SWEEP_CONFIG['STEPS'],
+                              help="Sampling steps in bars (default: %(default)s)")
+    sweep_parser.add_argument('--period', default='5y', choices=['2y', '5y', '10y'],
+                              help="History to backtest (default: 5y)")
+    sweep_parser.add_argument('--processes', type=int, default=SWEEP_CONFIG['PROCESSES'],
+                              help="Sweep processes, 0 for the calling thread (default: %(default)s)")
+    sweep_parser.add_argument('--pivot', choices=['win_rate', 'expectancy', 'signals'],
+                              help="Write a thresholds x holding periods table of this value for the first step")
+    sweep_parser.set_defaults(func=run_sweep)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
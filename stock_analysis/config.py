@@ -0,0 +1,128 @@
+"""
+Shared constants: quality filters, benchmark indices and sector mapping
+"""
+
+# ========== Constants ==========
+# Core stocks whitelist
+CORE_STOCKS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'TSLA', 'NVDA', 'TSM']
+
+# Exchange clock for market dates, closes and intraday quotes
+EXCHANGE_TIMEZONE = 'America/New_York'
+
+# Filter thresholds
+FILTER_CONFIG = {
+    'MIN_PRICE': 5.0,
+    'MIN_MARKET_CAP': 5_000_000_000,
+    'MIN_VOLUME_VALUE': 1_000_000,
+    'ALLOWED_EXCHANGES': ['NYQ', 'NAS', 'NMS', 'NYSE', 'NASDAQ'],
+}
+
+# ========== Sector Index Mapping ==========
+SECTOR_INDICES = {
+    'S&P 500 (Broad Market)': '^GSPC',
+    'NASDAQ 100 (Tech Heavy)': '^NDX',
+    'Dow Jones (Blue Chip)': '^DJI',
+    'Russell 2000 (Small Cap)': '^RUT',
+    
+    # Sector ETFs
+    'Technology Sector XLK': 'XLK',
+    'Semiconductor Sector SOXX': 'SOXX',
+    'Financial Sector XLF': 'XLF',
+    'Healthcare Sector XLV': 'XLV',
+    'Consumer Staples XLP': 'XLP',
+    'Energy Sector XLE': 'XLE',
+    'Communication Services XLC': 'XLC',
+    'Industrial Sector XLI': 'XLI',
+    'Materials Sector XLB': 'XLB',
+    'Real Estate Sector XLRE': 'XLRE',
+}
+
+# Stock to sector mapping rules
+STOCK_SECTOR_MAP = {
+    # Tech Giants -> NASDAQ 100
+    'AAPL': '^NDX',
+    'MSFT': '^NDX',
+    'GOOGL': '^NDX',
+    'GOOG': '^NDX',
+    'AMZN': '^NDX',
+    'META': '^NDX',
+    'TSLA': '^NDX',
+    'NFLX': '^NDX',
+    'ADBE': '^NDX',
+    'CRM': '^NDX',
+    
+    # Financials -> XLF
+    'JPM': 'XLF',
+    'BAC': 'XLF',
+    'WFC': 'XLF',
+    'C': 'XLF',
+    'GS': 'XLF',
+    'MS': 'XLF',
+    'V': 'XLF',
+    'MA': 'XLF',
+    'AXP': 'XLF',
+    
+    # Energy -> XLE
+    'XOM': 'XLE',
+    'CVX': 'XLE',
+    'COP': 'XLE',
+    'SLB': 'XLE',
+    'EOG': 'XLE',
+    
+    # Healthcare -> XLV
+    'JNJ': 'XLV',
+    'PFE': 'XLV',
+    'MRK': 'XLV',
+    'ABBV': 'XLV',
+    'UNH': 'XLV',
+    'LLY': 'XLV',
+    
+    # Consumer Staples -> XLP
+    'PG': 'XLP',
+    'KO': 'XLP',
+    'PEP': 'XLP',
+    'WMT': 'XLP',
+    'COST': 'XLP',
+    
+    # Semiconductors -> SOXX
+    'TSM': 'SOXX',
+    'NVDA': 'SOXX',
+    'AMD': 'SOXX',
+    'INTC': 'SOXX',
+    'QCOM': 'SOXX',
+    'TXN': 'SOXX',
+    'AVGO': 'SOXX',
+}
+
+# Sector (as reported by Yahoo) -> benchmark for stocks not in STOCK_SECTOR_MAP
+SECTOR_TO_INDEX = {
+    'Technology': '^NDX',
+    'Financial Services': 'XLF',
+    'Healthcare': 'XLV',
+    'Energy': 'XLE',
+    'Consumer Defensive': 'XLP',
+    'Consumer Cyclical': 'XLY',
+    'Communication Services': 'XLC',
+    'Industrials': 'XLI',
+    'Basic Materials': 'XLB',
+    'Real Estate': 'XLRE',
+    'Utilities': 'XLU',
+}
+
+# Readable names for index symbols
+INDEX_NAMES = {
+    '^GSPC': 'S&P 500',
+    '^NDX': 'NASDAQ 100',
+    '^DJI': 'Dow Jones',
+    '^RUT': 'Russell 2000',
+    'XLK': 'Technology Sector',
+    'SOXX': 'Semiconductor Sector',
+    'XLF': 'Financial Sector',
+    'XLV': 'Healthcare Sector',
+    'XLP': 'Consumer Staples',
+    'XLE': 'Energy Sector',
+    'XLC': 'Communication Services',
+    'XLI': 'Industrial Sector',
+    'XLB': 'Materials Sector',
+    'XLRE': 'Real Estate Sector',
+}
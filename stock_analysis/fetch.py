@@ -0,0 +1,234 @@
+"""
+Yahoo Finance requests: batched daily history, single-symbol history and
+`.info` metadata. Used by YahooProvider (see providers.py).
+"""
+import time
+
+import pandas as pd
+
+from stock_analysis.config import EXCHANGE_TIMEZONE
+from stock_analysis.resilience import CircuitOpenError, TransientError, get_request_guard
+
+# Symbols per yf.download request. Yahoo starts dropping symbols from
+# very large batches, so big watchlists are split into several requests.
+BULK_CHUNK_SIZE = 50
+
+class EmptyResponseError(TransientError):
+    """
+    A batch request returned no data at all, which Yahoo does when it
+    throttles; retried like a network error
+    """
+
+
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+# `.info` keys for each metadata field, first present key wins
+INFO_KEYS = {
+    'sector': ['sector'],
+    'exchange': ['exchange'],
+    'market_cap': ['marketCap'],
+    'average_volume': ['averageVolume'],
+    'last_price': ['regularMarketPrice', 'currentPrice'],
+}
+
+
+# ========== Frame Normalization ==========
+def normalize_history(hist):
+    """
+    Return a history frame with a tz-naive date index and the standard
+    column order, so frames from different fetch paths align on date
+    """
+    if hist is None or hist.empty:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    hist = hist.copy()
+    if getattr(hist.index, 'tz', None) is not None:
+        hist.index = hist.index.tz_localize(None)
+    hist.index = pd.DatetimeIndex(hist.index).normalize()
+    hist.index.name = 'Date'
+
+    columns = [c for c in HISTORY_COLUMNS if c in hist.columns]
+    hist = hist[columns].dropna(subset=['Close'])
+    return hist[~hist.index.duplicated(keep='last')]
+
+
+def _split_download(data, symbols):
+    """
+    Split a multi-symbol yf.download frame into per-symbol frames.
+    Symbols with no usable rows are left out.
+    """
+    frames = {}
+    if data is None or data.empty:
+        return frames
+
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol not in available:
+                continue
+            frame = normalize_history(data[symbol].dropna(how='all'))
+            if not frame.empty:
+                frames[symbol] = frame
+    elif len(symbols) == 1:
+        frame = normalize_history(data)
+        if not frame.empty:
+            frames[symbols[0]] = frame
+
+    return frames
+
+
+# ========== Single Symbol ==========
+def fetch_history(symbol, period="1y", start=None, session=None):
+    """
+    Daily history for one symbol, normalized. Raises on request errors.
+    """
+    import yfinance as yf
+
+    range_kwargs = {'start': start} if start is not None else {'period': period}
+    raw = get_request_guard().call('history', yf.Ticker(symbol, session=session).history, **range_kwargs)
+    return normalize_history(raw)
+
+
+def fetch_info(symbol, session=None):
+    """
+    Metadata fields (see INFO_KEYS) from one `.info` call. Raises on
+    request errors.
+    """
+    import yfinance as yf
+
+    info = get_request_guard().call('info', lambda: yf.Ticker(symbol, session=session).info) or {}
+    return {field: next((info[key] for key in keys if key in info), None)
+            for field, keys in INFO_KEYS.items()}
+
+
+# ========== Bulk History Fetch ==========
+def fetch_histories(tickers, period="1y", start=None, chunk_size=BULK_CHUNK_SIZE, session=None):
+    """
+    Download daily history for many tickers with chunked batch requests.
+    Symbols missing from a batch are retried one at a time.
+
+    Returns (histories, timings). histories maps every requested symbol to
+    a frame (empty when Yahoo had no data). timings has one entry per
+    batch plus one for the per-ticker fallback, if any was needed.
+    """
+    symbols = list(dict.fromkeys(tickers))
+    histories = {}
+    timings = []
+    failed = []
+
+    if start is not None:
+        range_kwargs = {'start': start}
+    else:
+        range_kwargs = {'period': period}
+
+    # yfinance is slow to import and only needed once something is missing
+    # from the local store
+    import yfinance as yf
+
+    guard = get_request_guard()
+
+    def download(chunk):
+        data = yf.download(
+            chunk,
+            group_by='ticker',
+            auto_adjust=True,
+            actions=True,
+            threads=True,
+            progress=False,
+            session=session,
+            **range_kwargs
+        )
+        # yf.download reports errors per symbol instead of raising; nothing
+        # at all for several symbols means the request itself failed
+        if len(chunk) > 1 and (data is None or data.empty):
+            raise EmptyResponseError(f"No data for any of {len(chunk)} symbols")
+        return data
+
+    for chunk_no, offset in enumerate(range(0, len(symbols), chunk_size), start=1):
+        chunk = symbols[offset:offset + chunk_size]
+        started = time.perf_counter()
+        try:
+            data = guard.call('download', download, chunk)
+        except CircuitOpenError:
+            # Yahoo is paused: skip the per-ticker fallback as well
+            for symbol in chunk:
+                histories[symbol] = normalize_history(None)
+            timings.append({
+                'stage': f"batch {chunk_no} (circuit open)",
+                'symbols': len(chunk),
+                'fetched': 0,
+                'seconds': time.perf_counter() - started
+            })
+            continue
+        except Exception:
+            data = None
+
+        frames = _split_download(data, chunk)
+        histories.update(frames)
+        failed.extend(s for s in chunk if s not in frames)
+
+        timings.append({
+            'stage': f"batch {chunk_no}",
+            'symbols': len(chunk),
+            'fetched': len(frames),
+            'seconds': time.perf_counter() - started
+        })
+
+    if failed:
+        started = time.perf_counter()
+        recovered = 0
+        for symbol in failed:
+            try:
+                hist = fetch_history(symbol, period=period, start=start, session=session)
+            except Exception:
+                hist = normalize_history(None)
+            if not hist.empty:
+                recovered += 1
+            histories[symbol] = hist
+
+        timings.append({
+            'stage': 'per-ticker fallback',
+            'symbols': len(failed),
+            'fetched': recovered,
+            'seconds': time.perf_counter() - started
+        })
+
+    return histories, timings
+
+
+# ========== Intraday Quotes ==========
+def fetch_quotes(symbols, session=None):
+    """
+    Latest price of each symbol from today's 1-minute bars, in one
+    request. Returns {symbol: (timestamp, price)} with tz-naive exchange
+    timestamps; symbols without a quote are left out.
+    """
+    import yfinance as yf
+
+    symbols = list(dict.fromkeys(symbols))
+    data = get_request_guard().call(
+        'quotes', yf.download, symbols,
+        period='1d', interval='1m', group_by='ticker', auto_adjust=True,
+        threads=True, progress=False, session=session
+    )
+    quotes = {}
+    if data is None or data.empty:
+        return quotes
+
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in set(data.columns.get_level_values(0)):
+                continue
+            close = data[symbol]['Close']
+        elif len(symbols) == 1:
+            close = data['Close']
+        else:
+            continue
+        close = close.dropna()
+        if close.empty:
+            continue
+        timestamp = close.index[-1]
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert(EXCHANGE_TIMEZONE).tz_localize(None)
+        quotes[symbol] = (timestamp, float(close.iloc[-1]))
+    return quotes
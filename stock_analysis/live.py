@@ -0,0 +1,386 @@
+"""
+Live intraday mode.
+
+A LiveBoard starts from a finished screen (daily histories and each
+ticker's quality and relative strength) and then follows intraday
+prices. Every tick updates one ticker in O(1) amortized time:
+
+- the trailing 52-week high comes from a monotonic deque over the
+  settled daily closes, maxed with the live price, instead of
+  rolling(252).max() over the whole series;
+- the drawdown and the signal level are recomputed from that high and
+  the stored strength and quality inputs;
+- the price distribution is kept by a RollingDistribution.
+
+apply() returns the tickers whose displayed row changed, so a table can
+update just those rows on each refresh.
+
+Prices come from a tick source: QuotePoller asks the market data
+provider for the latest quotes; TickFile replays a recorded file for
+offline testing. A tick file is CSV (or JSON lines) with the columns
+timestamp, symbol, price, timestamps in exchange time:
+
+    python -m stock_analysis.live --ticks ticks.csv AAPL MSFT
+    python -m stock_analysis.live --record ticks.csv --every 60 AAPL MSFT
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+
+import pandas as pd
+
+from stock_analysis.analytics import get_buy_signal_improved, get_buy_signal_original
+from stock_analysis.config import CORE_STOCKS, EXCHANGE_TIMEZONE
+from stock_analysis.orderstats import RollingDistribution
+from stock_analysis.providers import get_provider
+
+LIVE_CONFIG = {
+    # Seconds between refreshes of the live table
+    'REFRESH_SECONDS': int(os.environ.get('STOCK_APP_LIVE_REFRESH', 15)),
+    # Recorded time a TickFile advances per poll
+    'REPLAY_STEP_SECONDS': 60,
+    # Replay this tick file instead of polling the provider (offline testing)
+    'TICK_FILE': os.environ.get('STOCK_APP_LIVE_TICKS'),
+}
+
+TRADING_DAYS = 252
+
+
+# ========== Rolling High ==========
+class RollingMax:
+    """
+    Maximum of the last `window` pushed values. A monotonic deque keeps
+    only values that can still become the maximum, so push() is O(1)
+    amortized and max is O(1).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._deque = deque()
+        self._pushed = 0
+
+    def push(self, value):
+        value = float(value)
+        if not math.isnan(value):
+            while self._deque and self._deque[-1][1] <= value:
+                self._deque.pop()
+            self._deque.append((self._pushed, value))
+        self._pushed += 1
+        while self._deque and self._deque[0][0] <= self._pushed - 1 - self.window:
+            self._deque.popleft()
+
+    @property
+    def max(self):
+        return self._deque[0][1] if self._deque else float('nan')
+
+
+def tick_timestamp(timestamp):
+    """
+    Tick time as a tz-naive exchange timestamp
+    """
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(EXCHANGE_TIMEZONE).tz_localize(None)
+    return timestamp
+
+
+# ========== Live Ticker ==========
+class LiveTicker:
+    """
+    One ticker's 52-week high, drawdown and distribution, updated per tick.
+    The last daily bar is the live bar: ticks on its date replace its
+    close, a tick on a later date settles it and opens a new one. The
+    52-week high is taken over closes, or over daily highs with
+    high_column='High'.
+    """
+
+    def __init__(self, symbol, hist, high_column='Close', window=TRADING_DAYS):
+        self.symbol = symbol
+        closes = hist['Close'].values
+        highs = hist[high_column].values
+        self.intraday_high = high_column != 'Close'
+        self.bar_date = hist.index[-1].normalize()
+        self.price = float(closes[-1])
+        # The live bar's contribution to the 52-week high
+        self.live_high = float(highs[-1])
+        self.updated_at = None
+        # Settled bars: every bar before the live one, at most window - 1
+        self._settled_high = RollingMax(window - 1)
+        for value in highs[:-1][-(window - 1):]:
+            self._settled_high.push(value)
+        self.distribution = RollingDistribution.from_prices(closes, window=len(closes))
+
+    def update(self, timestamp, price):
+        """
+        Apply one tick. Returns False for ticks older than the live bar.
+        """
+        timestamp = tick_timestamp(timestamp)
+        day = timestamp.normalize()
+        price = float(price)
+        if day < self.bar_date:
+            return False
+        if day > self.bar_date:
+            self._settled_high.push(self.live_high)
+            self.distribution.push(price)
+            self.bar_date = day
+            self.live_high = price
+        else:
+            self.distribution.replace_last(price)
+            self.live_high = max(self.live_high, price) if self.intraday_high else price
+        self.price = price
+        self.updated_at = timestamp
+        return True
+
+    @property
+    def high_52w(self):
+        settled = self._settled_high.max
+        return self.live_high if math.isnan(settled) else max(settled, self.live_high)
+
+    @property
+    def drawdown_pct(self):
+        high = self.high_52w
+        return (high - self.price) / high * 100 if high > 0 else 0
+
+
+# ========== Live Board ==========
+class LiveBoard:
+    """
+    Live rows for the tickers of a screen. Build it with from_screen();
+    feed it ticks with apply().
+    """
+
+    def __init__(self, use_improved=True):
+        self.tickers = {}
+        self.inputs = {}
+        self.benchmark = None
+        self.use_improved = use_improved
+        self.rows = {}
+        self.ticks = 0
+
+    @classmethod
+    def from_screen(cls, analyses, registry, benchmark_symbol=None, use_improved=True):
+        """
+        Board for the tickers of a screen() result that had data. The
+        benchmark, when given and loaded, is followed too, so the market
+        drawdown in the signals moves with it.
+        """
+        board = cls(use_improved=use_improved)
+        for analysis in analyses:
+            record = analysis['record']
+            if record['status'] != 'ok':
+                continue
+            ticker = record['ticker']
+            board.tickers[ticker] = LiveTicker(ticker, registry.get(ticker, "1y"))
+            board.inputs[ticker] = {
+                'quality': {
+                    'qualified': bool(record['qualified']),
+                    'is_core': ticker in CORE_STOCKS,
+                },
+                'strength_score': record['strength_score'] or 0,
+                'strength': record['strength'] or "",
+            }
+        if benchmark_symbol:
+            hist = registry.get(benchmark_symbol, "1y")
+            if not hist.empty:
+                # Index drawdowns are measured from the 52-week intraday high
+                board.benchmark = LiveTicker(benchmark_symbol, hist, high_column='High')
+        for ticker in board.tickers:
+            board.rows[ticker] = board._row(ticker)
+        return board
+
+    def symbols(self):
+        symbols = list(self.tickers)
+        if self.benchmark is not None and self.benchmark.symbol not in self.tickers:
+            symbols.append(self.benchmark.symbol)
+        return symbols
+
+    def _signal(self, ticker):
+        live = self.tickers[ticker]
+        if not self.use_improved:
+            return get_buy_signal_original(live.drawdown_pct / 100)
+        inputs = self.inputs[ticker]
+        return get_buy_signal_improved(
+            live.drawdown_pct,
+            self.benchmark.drawdown_pct if self.benchmark is not None else None,
+            inputs['quality'],
+            inputs['strength_score'],
+            inputs['strength']
+        )
+
+    def _row(self, ticker):
+        live = self.tickers[ticker]
+        signal_info = self._signal(ticker)
+        signal_display = f"{signal_info['stars']} {signal_info['action']}"
+        if signal_info.get('details'):
+            signal_display += f" ({'; '.join(signal_info['details'])})"
+        distribution = live.distribution.distribution(live.price)
+        return {
+            "Ticker": ticker,
+            "Current Price": f"${live.price:.2f}",
+            "52-Week High": f"${live.high_52w:.2f}",
+            "Drawdown": f"{live.drawdown_pct:.1f}%",
+            "Signal": signal_display,
+            "Z-Score": f"{distribution['z_score']:.2f}",
+            "Percentile": f"{distribution['percentile']:.0f}%",
+            "Updated": live.updated_at.strftime('%H:%M:%S') if live.updated_at is not None else "close",
+            "Level": signal_info['level'],
+        }
+
+    def apply(self, ticks):
+        """
+        Apply (timestamp, symbol, price) ticks. Returns the tickers whose
+        row changed, in board order.
+        """
+        touched = set()
+        benchmark_moved = False
+        for timestamp, symbol, price in ticks:
+            applied = False
+            if symbol in self.tickers:
+                applied = self.tickers[symbol].update(timestamp, price)
+                if applied:
+                    touched.add(symbol)
+            if self.benchmark is not None and symbol == self.benchmark.symbol:
+                applied = self.benchmark.update(timestamp, price) or applied
+                benchmark_moved = benchmark_moved or applied
+            self.ticks += applied
+
+        # The market drawdown is part of every improved signal
+        if benchmark_moved and self.use_improved:
+            touched = set(self.tickers)
+
+        changed = []
+        for ticker in self.tickers:
+            if ticker not in touched:
+                continue
+            row = self._row(ticker)
+            if row != self.rows[ticker]:
+                self.rows[ticker] = row
+                changed.append(ticker)
+        return changed
+
+    def table(self):
+        """
+        Current rows as a DataFrame indexed by ticker
+        """
+        return pd.DataFrame(list(self.rows.values())).set_index("Ticker", drop=False)
+
+
+# ========== Tick Sources ==========
+class QuotePoller:
+    """
+    Latest quotes from the market data provider, one request per poll
+    """
+
+    def __init__(self, symbols, provider=None):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.provider = provider
+        self.exhausted = False
+
+    def poll(self):
+        quotes = (self.provider or get_provider()).quotes(self.symbols)
+        return [(timestamp, symbol, price) for symbol, (timestamp, price) in quotes.items()]
+
+
+def read_ticks(path):
+    """
+    Ticks from a CSV or JSON lines file, sorted by time
+    """
+    if path.lower().endswith(('.jsonl', '.json')):
+        frame = pd.read_json(path, lines=True)
+    else:
+        frame = pd.read_csv(path)
+    frame['timestamp'] = [tick_timestamp(t) for t in frame['timestamp']]
+    frame['symbol'] = frame['symbol'].astype(str).str.upper()
+    frame = frame.dropna(subset=['price']).sort_values('timestamp', kind='stable')
+    return list(zip(frame['timestamp'], frame['symbol'], frame['price'].astype(float)))
+
+
+class TickFile:
+    """
+    Replays a recorded tick file. Each poll returns the ticks of the next
+    `step_seconds` of recorded time, so a replay runs at the refresh
+    cadence regardless of the wall clock.
+    """
+
+    def __init__(self, path, step_seconds=None):
+        self.path = path
+        self.step = pd.Timedelta(seconds=step_seconds or LIVE_CONFIG['REPLAY_STEP_SECONDS'])
+        self._ticks = read_ticks(path)
+        self._position = 0
+        self._clock = self._ticks[0][0] if self._ticks else None
+
+    @property
+    def exhausted(self):
+        return self._position >= len(self._ticks)
+
+    def poll(self):
+        if self.exhausted:
+            return []
+        self._clock += self.step
+        start = self._position
+        while self._position < len(self._ticks) and self._ticks[self._position][0] < self._clock:
+            self._position += 1
+        return self._ticks[start:self._position]
+
+
+def make_tick_source(symbols):
+    """
+    TickFile when LIVE_CONFIG['TICK_FILE'] is set, else a QuotePoller
+    """
+    if LIVE_CONFIG['TICK_FILE']:
+        return TickFile(LIVE_CONFIG['TICK_FILE'])
+    return QuotePoller(symbols)
+
+
+def append_ticks(path, ticks):
+    """
+    Append ticks to a CSV tick file, writing the header for a new file
+    """
+    frame = pd.DataFrame(ticks, columns=['timestamp', 'symbol', 'price'])
+    frame.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+
+def main(argv=None):
+    from stock_analysis.screener import screen
+
+    parser = argparse.ArgumentParser(
+        prog='python -m stock_analysis.live',
+        description="Follow intraday prices for a list of symbols and print the rows that change"
+    )
+    parser.add_argument('symbols', nargs='+')
+    parser.add_argument('--benchmark', default='^GSPC', help="Benchmark index symbol (default: ^GSPC)")
+    parser.add_argument('--ticks', help="Replay a recorded tick file instead of polling the provider")
+    parser.add_argument('--record', metavar='FILE', help="Append polled quotes to a CSV tick file")
+    parser.add_argument('--every', type=float,
+                        help=f"Seconds between polls (default: {LIVE_CONFIG['REFRESH_SECONDS']}, 0 with --ticks)")
+    parser.add_argument('--polls', type=int, help="Stop after this many polls")
+    args = parser.parse_args(argv)
+
+    symbols = [s.upper() for s in args.symbols]
+    analyses, registry = screen(symbols, benchmark_symbol=args.benchmark)
+    board = LiveBoard.from_screen(analyses, registry, args.benchmark)
+    source = TickFile(args.ticks) if args.ticks else QuotePoller(board.symbols())
+    every = args.every if args.every is not None else (0 if args.ticks else LIVE_CONFIG['REFRESH_SECONDS'])
+
+    polls = 0
+    while not source.exhausted and (args.polls is None or polls < args.polls):
+        ticks = source.poll()
+        polls += 1
+        if args.record and ticks:
+            append_ticks(args.record, ticks)
+        for ticker in board.apply(ticks):
+            row = board.rows[ticker]
+            print(json.dumps({k: v for k, v in row.items() if k != "Level"}, ensure_ascii=False))
+        if every:
+            time.sleep(every)
+
+    print(f"{board.ticks} ticks applied in {polls} polls", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
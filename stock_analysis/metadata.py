@@ -0,0 +1,222 @@
+"""
+Local symbol metadata store.
+
+Keeps the few fields the app needs from Yahoo's slow `.info` endpoint
+(sector, exchange, market cap, average volume, last price) in SQLite,
+each with its own time-to-live. Reads never touch the network except for
+a symbol that has never been fetched. Stale fields are renewed by
+refresh(), either from the analysis run or as a bulk job:
+
+    python -m stock_analysis.metadata [--force] [SYMBOL ...]
+"""
+import argparse
+import contextvars
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from stock_analysis.providers import get_provider
+from stock_analysis.singleflight import SingleFlight
+
+DEFAULT_DB_PATH = os.environ.get('STOCK_APP_METADATA_DB', 'symbol_metadata.db')
+
+# How long each field stays fresh, in seconds
+FIELD_TTL = {
+    'sector': 30 * 86400,
+    'exchange': 30 * 86400,
+    'market_cap': 86400,
+    'average_volume': 86400,
+    'last_price': 3600,
+}
+
+# A symbol whose `.info` call failed is not retried sooner than this
+FAILURE_RETRY_SECONDS = 3600
+
+REFRESH_WORKERS = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbol_metadata (
+    symbol TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (symbol, field)
+) WITHOUT ROWID;
+"""
+
+
+class MetadataStore:
+    """
+    Symbol metadata with per-field TTL, shared by all sessions
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, provider=None):
+        self.path = path
+        # None: the process-wide provider at refresh time
+        self.provider = provider
+        self._write_lock = threading.Lock()
+        self._flights = SingleFlight('metadata')
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _rows(self, symbol):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT field, value, fetched_at FROM symbol_metadata WHERE symbol = ?",
+                (symbol,)
+            ).fetchall()
+        return {field: (json.loads(value) if value is not None else None, fetched_at)
+                for field, value, fetched_at in rows}
+
+    def _write(self, symbol, fields):
+        now = time.time()
+        with self._write_lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO symbol_metadata (symbol, field, value, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(symbol, field, json.dumps(value) if value is not None else None, now)
+                 for field, value in fields.items()]
+            )
+
+    # ---------- Reads ----------
+    def get(self, symbol):
+        """
+        Stored fields for a symbol, stale or not. Missing fields are None.
+        Never calls Yahoo.
+        """
+        rows = self._rows(symbol)
+        return {field: rows[field][0] if field in rows else None for field in FIELD_TTL}
+
+    def stale_fields(self, symbol, now=None):
+        """
+        Fields that are missing or past their TTL
+        """
+        now = now or time.time()
+        rows = self._rows(symbol)
+        stale = []
+        for field, ttl in FIELD_TTL.items():
+            if field not in rows:
+                stale.append(field)
+                continue
+            value, fetched_at = rows[field]
+            if now - fetched_at > (ttl if value is not None else min(ttl, FAILURE_RETRY_SECONDS)):
+                stale.append(field)
+        return stale
+
+    def get_metadata(self, symbol):
+        """
+        Stored fields for a symbol. Only a symbol that has never been
+        fetched causes an `.info` call; stale values are served as they are.
+        """
+        if not self._rows(symbol):
+            self.refresh([symbol])
+        return self.get(symbol)
+
+    # ---------- Writes ----------
+    def update_last_prices(self, prices):
+        """
+        Record last prices that are already known, e.g. the latest close
+        from the price history, so they don't need an `.info` call
+        """
+        for symbol, price in prices.items():
+            if price is not None:
+                self._write(symbol, {'last_price': float(price)})
+
+    def _refresh_one(self, symbol):
+        # Sessions refreshing the same symbol at once share one .info call
+        return self._flights.do(symbol, self._fetch_and_store, symbol)
+
+    def _fetch_and_store(self, symbol):
+        try:
+            fields = (self.provider or get_provider()).metadata(symbol)
+        except Exception:
+            # Mark the gaps as failed so they wait FAILURE_RETRY_SECONDS,
+            # but keep good values that are already stored
+            stored = self._rows(symbol)
+            gaps = {field: None for field in FIELD_TTL if stored.get(field, (None,))[0] is None}
+            if gaps:
+                self._write(symbol, gaps)
+            return False
+        self._write(symbol, fields)
+        return True
+
+    def refresh(self, symbols, force=False, max_workers=REFRESH_WORKERS):
+        """
+        Fetch `.info` for every symbol with a stale field (all symbols when
+        force is set), in parallel. Returns a summary dict.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        due = symbols if force else [s for s in symbols if self.stale_fields(s)]
+
+        started = time.perf_counter()
+        if due:
+            # Workers run in copies of the caller's context, so requests are
+            # counted in the caller's run metrics
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(due))) as pool:
+                futures = [pool.submit(contextvars.copy_context().run, self._refresh_one, s) for s in due]
+                ok = [future.result() for future in futures]
+        else:
+            ok = []
+
+        return {
+            'symbols': len(symbols),
+            'refreshed': sum(ok),
+            'failed': len(ok) - sum(ok),
+            'seconds': time.perf_counter() - started
+        }
+
+    def symbols(self):
+        """
+        Every symbol with stored metadata
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT DISTINCT symbol FROM symbol_metadata ORDER BY symbol").fetchall()
+        return [row[0] for row in rows]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_metadata_store():
+    """
+    Process-wide store at DEFAULT_DB_PATH
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = MetadataStore()
+        return _default_store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh stale symbol metadata from Yahoo Finance")
+    parser.add_argument('symbols', nargs='*', help="Symbols to refresh (default: every stored symbol)")
+    parser.add_argument('--force', action='store_true', help="Refetch even fields that are still fresh")
+    args = parser.parse_args(argv)
+
+    store = get_metadata_store()
+    symbols = [s.upper() for s in args.symbols] or store.symbols()
+    summary = store.refresh(symbols, force=args.force)
+    print(f"Refreshed {summary['refreshed']}/{summary['symbols']} symbols "
+          f"({summary['failed']} failed) in {summary['seconds']:.1f}s")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
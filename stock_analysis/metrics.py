@@ -0,0 +1,288 @@
+"""
+Timing spans and counters for the analysis hot path.
+
+Stages record their durations with `span()`, caches and Yahoo requests
+increment counters. Everything recorded during an analysis run goes to
+that run's Metrics (for the debug panel and the per-run JSON log line)
+and to the process-wide Metrics (for Prometheus). The active run is held
+in a context variable, so worker threads started with a copied context
+record into the run that started them.
+
+    with run_metrics() as metrics:
+        with metrics.span('backtest'):
+            ...
+    print(get_metrics().prometheus())
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Samples kept per series for quantiles; older ones are dropped
+MAX_SAMPLES = 10000
+
+QUANTILES = [0.5, 0.9, 0.99]
+
+PROMETHEUS_PREFIX = 'stock_app'
+
+logger = logging.getLogger(__name__)
+
+_current_run = contextvars.ContextVar('stock_analysis_run_metrics', default=None)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_text(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class Metrics:
+    """
+    Thread-safe store of observations (durations) and counters, keyed by
+    name and labels. A parent, if given, receives everything as well.
+    """
+
+    def __init__(self, parent=None, max_samples=MAX_SAMPLES):
+        self.parent = parent
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=max_samples))
+        self._sums = Counter()
+        self._counts = Counter()
+        self._counters = Counter()
+
+    # ---------- Recording ----------
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._samples[key].append(value)
+            self._sums[key] += value
+            self._counts[key] += 1
+        if self.parent is not None:
+            self.parent.observe(name, value, **labels)
+
+    def increment(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += amount
+        if self.parent is not None:
+            self.parent.increment(name, amount, **labels)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def span(self, stage):
+        """
+        Time one named stage of the analysis
+        """
+        return self.timer('stage_seconds', stage=stage)
+
+    # ---------- Reading ----------
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def counters(self, name):
+        """
+        {labels: value} for one counter, labels as a tuple of (key, value)
+        """
+        with self._lock:
+            return {key: value for (n, key), value in self._counters.items() if n == name}
+
+    def series(self, name):
+        """
+        {labels: {'count', 'total', 'p50', 'p90', 'p99', 'max'}} for one
+        observed name
+        """
+        with self._lock:
+            keys = [key for (n, key) in self._samples if n == name]
+            snapshot = {
+                key: (np.array(self._samples[(name, key)]), self._sums[(name, key)], self._counts[(name, key)])
+                for key in keys
+            }
+        summary = {}
+        for key, (samples, total, count) in snapshot.items():
+            quantiles = np.quantile(samples, QUANTILES) if len(samples) else [np.nan] * len(QUANTILES)
+            summary[key] = dict(
+                {'count': int(count), 'total': float(total), 'max': float(samples.max()) if len(samples) else None},
+                **{f"p{int(q * 100)}": float(v) for q, v in zip(QUANTILES, quantiles)}
+            )
+        return summary
+
+    def stage_table(self):
+        """
+        One row per stage, for display
+        """
+        rows = []
+        for key, stats in self.series('stage_seconds').items():
+            stage = dict(key).get('stage', '')
+            rows.append({
+                'stage': stage,
+                'count': stats['count'],
+                'total_ms': stats['total'] * 1000,
+                'p50_ms': stats['p50'] * 1000,
+                'p99_ms': stats['p99'] * 1000,
+                'max_ms': stats['max'] * 1000,
+            })
+        return sorted(rows, key=lambda row: -row['total_ms'])
+
+    def summary(self):
+        """
+        JSON-serializable snapshot: per-stage timings, cache hit/miss
+        counts, Yahoo request counts and latencies, and fetches that
+        joined another caller's in-flight request
+        """
+        def flatten(stats_by_key, label):
+            return {dict(key).get(label, ''): stats for key, stats in stats_by_key.items()}
+
+        caches = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        for key, value in self.counters('cache_requests').items():
+            labels = dict(key)
+            caches[labels['cache']]['hits' if labels['result'] == 'hit' else 'misses'] += value
+
+        yahoo = defaultdict(lambda: {'ok': 0, 'error': 0})
+        for key, value in self.counters('yahoo_requests').items():
+            labels = dict(key)
+            yahoo[labels['kind']][labels['status']] += value
+
+        coalescing = defaultdict(lambda: {'leader': 0, 'coalesced': 0})
+        for key, value in self.counters('singleflight_requests').items():
+            labels = dict(key)
+            coalescing[labels['flight']][labels['result']] += value
+
+        return {
+            'run_id': self.run_id,
+            'started': self.started,
+            'seconds': time.time() - self.started,
+            'stages': flatten(self.series('stage_seconds'), 'stage'),
+            'caches': dict(caches),
+            'yahoo_requests': dict(yahoo),
+            'yahoo_latency': flatten(self.series('yahoo_request_seconds'), 'kind'),
+            'coalesced_requests': dict(coalescing),
+        }
+
+    def prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """
+        Everything recorded, in the Prometheus text exposition format:
+        observations as summaries, counters as counters
+        """
+        lines = []
+        with self._lock:
+            observed = sorted({name for name, _ in self._samples})
+            counted = sorted({name for name, _ in self._counters})
+
+        for name in observed:
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} summary")
+            for key, stats in sorted(self.series(name).items()):
+                for q in QUANTILES:
+                    lines.append(f"{metric}{_label_text(key, [('quantile', q)])} {stats[f'p{int(q * 100)}']:.6g}")
+                lines.append(f"{metric}_sum{_label_text(key)} {stats['total']:.6g}")
+                lines.append(f"{metric}_count{_label_text(key)} {stats['count']}")
+
+        for name in counted:
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in sorted(self.counters(name).items()):
+                lines.append(f"{metric}{_label_text(key)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+_default_metrics = Metrics()
+
+
+def get_metrics():
+    """
+    Process-wide metrics, shared by every run and session
+    """
+    return _default_metrics
+
+
+def active_metrics():
+    """
+    The current run's metrics, or the process-wide ones outside a run
+    """
+    return _current_run.get() or _default_metrics
+
+
+@contextmanager
+def run_metrics(log=True, **fields):
+    """
+    Collect metrics for one analysis run. Nested calls join the run that
+    is already active. When the outermost run ends, one JSON line with
+    its summary (plus `fields`) is logged, and the Prometheus text file
+    is rewritten if STOCK_APP_METRICS_FILE is set.
+    """
+    current = _current_run.get()
+    if current is not None:
+        yield current
+        return
+
+    metrics = Metrics(parent=_default_metrics)
+    token = _current_run.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_run.reset(token)
+        if log:
+            log_run(metrics, **fields)
+        metrics_file = os.environ.get('STOCK_APP_METRICS_FILE')
+        if metrics_file:
+            try:
+                write_prometheus(metrics_file)
+            except OSError as e:
+                logger.warning("Cannot write %s: %s", metrics_file, e)
+
+
+@contextmanager
+def yahoo_request(kind, metrics=None):
+    """
+    Count and time one Yahoo Finance request (download, history, info).
+    An exception escaping the block counts the request as an error.
+    """
+    metrics = metrics or active_metrics()
+    started = time.perf_counter()
+    status = 'error'
+    try:
+        yield
+        status = 'ok'
+    finally:
+        metrics.increment('yahoo_requests', kind=kind, status=status)
+        metrics.observe('yahoo_request_seconds', time.perf_counter() - started, kind=kind)
+
+
+def log_run(metrics, **fields):
+    """
+    Log a run's summary as a single JSON line
+    """
+    logger.info(json.dumps(dict(metrics.summary(), **fields), default=str))
+
+
+def write_prometheus(path, metrics=None):
+    """
+    Write Prometheus text to path atomically, e.g. for node_exporter's
+    textfile collector
+    """
+    text = (metrics or _default_metrics).prometheus()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,174 @@
+"""
+Incremental order statistics over a sliding window of prices.
+
+analyze_price_distribution() recomputes the mean, the standard deviation
+and a percentile scan over the whole array on every call. When bars
+arrive one at a time (intraday refreshes) or several lookback windows are
+queried, RollingDistribution keeps the same numbers up to date instead:
+
+- running sums, shifted by a reference price for numerical stability,
+  give the mean and the population variance in O(1);
+- a sorted copy of the window answers rank queries (percentile of a
+  score) with two binary searches, O(log n).
+
+push() adds the newest bar and evicts the oldest once the window is full;
+distribution() returns the same dict as analyze_price_distribution().
+
+    window = RollingDistribution.from_prices(hist['Close'].values, window=252)
+    window.push(latest_price)
+    window.distribution()['percentile']
+"""
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+import numpy as np
+
+
+class RollingDistribution:
+    """
+    Mean, standard deviation and percentile ranks of the last `window`
+    prices (all prices when window is None). NaN prices take a slot in
+    the window but are left out of the statistics.
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self._values = deque()
+        self._sorted = []
+        self._shift = None
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        # Evictions since the sums were last rebuilt; subtracting from
+        # running sums accumulates rounding error, so they are recomputed
+        # from the window once per window length
+        self._evictions = 0
+
+    @classmethod
+    def from_prices(cls, prices, window=None):
+        stats = cls(window)
+        for price in np.asarray(prices, dtype=float)[-window if window else 0:]:
+            stats.push(price)
+        return stats
+
+    def __len__(self):
+        return len(self._sorted)
+
+    # ---------- Updates ----------
+    def push(self, price):
+        """
+        Add the newest price, evicting the oldest when the window is full
+        """
+        price = float(price)
+        if self.window is not None and len(self._values) >= self.window:
+            self.evict()
+        self._values.append(price)
+        if math.isnan(price):
+            return
+        if self._shift is None:
+            self._shift = price
+        shifted = price - self._shift
+        self._sum += shifted
+        self._sum_sq += shifted * shifted
+        insort(self._sorted, price)
+
+    def evict(self):
+        """
+        Drop the oldest price; returns it
+        """
+        price = self._values.popleft()
+        if math.isnan(price):
+            return price
+        del self._sorted[bisect_left(self._sorted, price)]
+        shifted = price - self._shift
+        self._sum -= shifted
+        self._sum_sq -= shifted * shifted
+        self._evictions += 1
+        if self._evictions >= max(len(self._values), 1):
+            self._rebuild_sums()
+        return price
+
+    def replace_last(self, price):
+        """
+        Replace the newest price, e.g. when a live bar ticks
+        """
+        last = self._values.pop()
+        if not math.isnan(last):
+            del self._sorted[bisect_left(self._sorted, last)]
+            shifted = last - self._shift
+            self._sum -= shifted
+            self._sum_sq -= shifted * shifted
+        self.push(price)
+
+    def _rebuild_sums(self):
+        self._evictions = 0
+        if not self._sorted:
+            self._shift = None
+            self._sum = self._sum_sq = 0.0
+            return
+        self._shift = self._sorted[len(self._sorted) // 2]
+        shifted = np.asarray(self._sorted) - self._shift
+        self._sum = float(shifted.sum())
+        self._sum_sq = float((shifted * shifted).sum())
+
+    # ---------- Queries ----------
+    @property
+    def last(self):
+        return self._values[-1] if self._values else None
+
+    @property
+    def mean(self):
+        n = len(self._sorted)
+        return self._shift + self._sum / n if n else float('nan')
+
+    @property
+    def std(self):
+        """
+        Population standard deviation, like np.std
+        """
+        n = len(self._sorted)
+        if not n:
+            return float('nan')
+        variance = (self._sum_sq - self._sum * self._sum / n) / n
+        return math.sqrt(max(variance, 0.0))
+
+    def percentile(self, score):
+        """
+        Percentile rank of score in the window, as
+        analytics.percentile_of_score (scipy's kind='rank')
+        """
+        n = len(self._sorted)
+        if not n:
+            return float('nan')
+        below = bisect_left(self._sorted, score)
+        at_or_below = bisect_right(self._sorted, score)
+        return (below + at_or_below + (at_or_below > below)) * (50.0 / n)
+
+    def z_score(self, score):
+        std = self.std
+        return (score - self.mean) / std if std > 0 else 0
+
+    def distribution(self, current_price=None):
+        """
+        analyze_price_distribution() output for the window, with the
+        newest price (or current_price) as the current price
+        """
+        current_price = self.last if current_price is None else current_price
+        mean_price = self.mean
+        std_price = self.std
+        z_score = self.z_score(current_price)
+        return {
+            'z_score': z_score,
+            'percentile': float(self.percentile(current_price)),
+            'is_extreme_cheap': z_score < -2,
+            'is_extreme_expensive': z_score > 2,
+            'mean_price': mean_price,
+            'std_price': std_price,
+            'support_levels': {
+                '-2σ': mean_price - 2 * std_price,
+                '-1σ': mean_price - 1 * std_price,
+                'mean': mean_price,
+                '+1σ': mean_price + 1 * std_price,
+                '+2σ': mean_price + 2 * std_price
+            }
+        }
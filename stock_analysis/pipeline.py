@@ -0,0 +1,90 @@
+"""
+Bounded worker pools for the per-ticker analysis.
+
+Each ticker's stages run as one task on a thread pool, so the network
+and disk waits of different tickers overlap. The CPU-heavy backtest can
+go to a process pool as well, so it runs outside the GIL. Results come
+back in input order whatever order the tasks finish in.
+"""
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+PIPELINE_CONFIG = {
+    # Threads running per-ticker tasks
+    'IO_WORKERS': int(os.environ.get('STOCK_APP_IO_WORKERS', 8)),
+    # Processes for the backtest; 0 runs it on the calling thread
+    'BACKTEST_PROCESSES': int(os.environ.get('STOCK_APP_BACKTEST_PROCESSES', 0)),
+}
+
+# One pool per size: callers that ask for different sizes (the screen's
+# backtest, bootstrap, sweep) each keep theirs, and no pool another caller
+# holds is ever shut down
+_process_pools = {}
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool(processes):
+    """
+    Process pool of this size, shared by every run in this server process.
+    Workers are spawned rather than forked, since the parent has live
+    threads.
+    """
+    with _process_pool_lock:
+        pool = _process_pools.get(processes)
+        if pool is None:
+            pool = _process_pools[processes] = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return pool
+
+
+class TickerPipeline:
+    """
+    Runs one task per ticker on a bounded thread pool, with an optional
+    process pool for CPU-bound work inside those tasks
+    """
+
+    def __init__(self, io_workers=None, backtest_processes=None):
+        self.io_workers = max(1, io_workers or PIPELINE_CONFIG['IO_WORKERS'])
+        if backtest_processes is None:
+            backtest_processes = PIPELINE_CONFIG['BACKTEST_PROCESSES']
+        self.backtest_processes = max(0, backtest_processes)
+
+    def run_cpu(self, func, *args):
+        """
+        Run a picklable CPU-bound function, in the process pool when one is
+        configured, else on the calling thread
+        """
+        if self.backtest_processes:
+            return get_process_pool(self.backtest_processes).submit(func, *args).result()
+        return func(*args)
+
+    def map(self, task, tickers, progress=None):
+        """
+        Call task(ticker) for every ticker concurrently and return the
+        results in ticker order. progress(done, total, ticker) is called on
+        the calling thread as each task finishes.
+        """
+        tickers = list(tickers)
+        results = [None] * len(tickers)
+        if not tickers:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.io_workers, len(tickers))) as pool:
+            # Each task runs in a copy of the caller's context, so it
+            # records into the caller's run metrics
+            futures = {
+                pool.submit(contextvars.copy_context().run, task, ticker): i
+                for i, ticker in enumerate(tickers)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                results[i] = future.result()
+                if progress:
+                    progress(done, len(tickers), tickers[i])
+
+        return results
@@ -0,0 +1,367 @@
+"""
+Nightly precompute of every user's watchlist.
+
+After the market close the job collects the union of the tickers in all
+saved watchlists and, once per ticker, loads 5 years of history
+into the price store, refreshes metadata, and computes the quality
+check, the price distribution and the star-performance table. Results
+go into a snapshot for that market date:
+
+    precompute/snapshot_2026-10-16.db
+
+Interactive runs read each ticker's results from the snapshot when they
+were computed up to the same last bar, and only analyze the rest
+themselves. Both take the 1y window back from the last bar rather than
+from today, so a snapshot keeps matching over the next day or a weekend.
+Results are committed batch by batch, so an interrupted job picks up
+where it stopped when started again.
+
+    python -m stock_analysis.precompute              # once, for the latest market date
+    python -m stock_analysis.precompute --watch      # every business day after the close
+    python -m stock_analysis.precompute AAPL MSFT    # just these symbols
+"""
+import argparse
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+import pandas as pd
+
+from stock_analysis.analytics import analyze_price_distribution, check_stock_quality
+from stock_analysis.config import EXCHANGE_TIMEZONE
+from stock_analysis.metadata import get_metadata_store
+from stock_analysis.metrics import active_metrics
+from stock_analysis.pipeline import TickerPipeline
+from stock_analysis.price_store import get_price_store
+from stock_analysis.registry import HistoryRegistry
+from stock_analysis.watchlist_store import WatchlistStore, get_watchlist_store
+
+PRECOMPUTE_CONFIG = {
+    'DIR': os.environ.get('STOCK_APP_PRECOMPUTE_DIR', 'precompute'),
+    # The job runs on business days once the exchange clock passes this
+    'RUN_AFTER': os.environ.get('STOCK_APP_PRECOMPUTE_AFTER', '16:30'),
+    'TIMEZONE': EXCHANGE_TIMEZONE,
+    # Tickers per committed batch
+    'BATCH_SIZE': 50,
+    'HOLDING_PERIOD': 90,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    ticker TEXT PRIMARY KEY,
+    first_date TEXT NOT NULL,
+    last_date TEXT NOT NULL,
+    quality BLOB NOT NULL,
+    distribution BLOB NOT NULL,
+    star_table BLOB NOT NULL,
+    computed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+# ========== Market Calendar ==========
+def market_date(now=None):
+    """
+    Date of the latest session whose close has passed RUN_AFTER: today
+    after the close on a weekday, otherwise the previous business day
+    """
+    tz = PRECOMPUTE_CONFIG['TIMEZONE']
+    now = pd.Timestamp(now).tz_convert(tz) if now is not None else pd.Timestamp.now(tz=tz)
+    hour, minute = (int(part) for part in PRECOMPUTE_CONFIG['RUN_AFTER'].split(':'))
+    today = now.tz_localize(None).normalize()
+    if today.dayofweek < 5 and (now.hour, now.minute) >= (hour, minute):
+        return today
+    return today - pd.offsets.BDay(1)
+
+
+def next_run_time(now=None):
+    """
+    Next moment the job should run, as a tz-aware timestamp
+    """
+    tz = PRECOMPUTE_CONFIG['TIMEZONE']
+    now = pd.Timestamp(now).tz_convert(tz) if now is not None else pd.Timestamp.now(tz=tz)
+    hour, minute = (int(part) for part in PRECOMPUTE_CONFIG['RUN_AFTER'].split(':'))
+    run_at = now.normalize() + pd.Timedelta(hours=hour, minutes=minute)
+    while run_at <= now or run_at.dayofweek >= 5:
+        run_at += pd.Timedelta(days=1)
+    return run_at
+
+
+# ========== Watchlists ==========
+def collect_watchlist_tickers(watchlist_store=None):
+    """
+    Sorted union of the tickers in every user's watchlist
+    """
+    return (watchlist_store or get_watchlist_store()).all_tickers()
+
+
+# ========== Snapshot ==========
+def snapshot_path(date, directory=None):
+    directory = directory or PRECOMPUTE_CONFIG['DIR']
+    return os.path.join(directory, f"snapshot_{pd.Timestamp(date).strftime('%Y-%m-%d')}.db")
+
+
+class Snapshot:
+    """
+    Precomputed per-ticker results for one market date, in SQLite. Values
+    are pickled so they come back exactly as computed. A read-only
+    snapshot opens an existing file without touching its schema or taking
+    write locks, so readers never block the job writing it.
+    """
+
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self._write_lock = threading.Lock()
+        if read_only:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        if self.read_only:
+            conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(self.path))}?mode=ro", uri=True, timeout=30)
+        else:
+            conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def write(self, entries):
+        """
+        Store {ticker: entry} in one transaction
+        """
+        now = time.time()
+        rows = [
+            (ticker, entry['first_date'], entry['last_date'], pickle.dumps(entry['quality']),
+             pickle.dumps(entry['distribution']), pickle.dumps(entry['star_table']), now)
+            for ticker, entry in entries.items()
+        ]
+        with self._write_lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (ticker, first_date, last_date, quality, distribution, "
+                "star_table, computed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def load(self, tickers):
+        """
+        {ticker: entry} for the tickers present in the snapshot
+        """
+        tickers = list(dict.fromkeys(tickers))
+        entries = {}
+        with self._connect() as conn:
+            for offset in range(0, len(tickers), 500):
+                chunk = tickers[offset:offset + 500]
+                rows = conn.execute(
+                    f"SELECT ticker, first_date, last_date, quality, distribution, star_table FROM entries "
+                    f"WHERE ticker IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for ticker, first_date, last_date, quality, distribution, star_table in rows:
+                    entries[ticker] = {
+                        'first_date': first_date,
+                        'last_date': last_date,
+                        'quality': pickle.loads(quality),
+                        'distribution': pickle.loads(distribution),
+                        'star_table': pickle.loads(star_table),
+                    }
+        return entries
+
+    def tickers(self):
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute("SELECT ticker FROM entries")}
+
+    # ---------- Job Progress ----------
+    def set_status(self, **values):
+        with self._write_lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO job (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in values.items()]
+            )
+
+    def status(self):
+        """
+        Job progress: total, done, started_at, finished_at (None while
+        running)
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT key, value FROM job").fetchall()
+        status = {'total': 0, 'done': 0, 'started_at': None, 'finished_at': None}
+        status.update({key: json.loads(value) for key, value in rows})
+        return status
+
+
+_open_snapshots = {}
+_open_snapshots_lock = threading.Lock()
+
+
+def open_snapshot(date=None, directory=None):
+    """
+    Read-only snapshot for a market date (default: the latest), or None
+    when it has not been computed. Handles are reused across reruns; only
+    the latest date's are kept.
+    """
+    path = snapshot_path(date if date is not None else market_date(), directory)
+    with _open_snapshots_lock:
+        snapshot = _open_snapshots.get(path)
+        if snapshot is None:
+            if not os.path.exists(path):
+                return None
+            if date is None:
+                _open_snapshots.clear()
+            snapshot = _open_snapshots[path] = Snapshot(path, read_only=True)
+        return snapshot
+
+
+def window_dates(hist):
+    """
+    (first, last) bar dates of a history
+    """
+    return hist.index[0].strftime('%Y-%m-%d'), hist.index[-1].strftime('%Y-%m-%d')
+
+
+def matching_entry(entry, hist):
+    """
+    The entry when it was computed on bars up to the same last bar as
+    hist, else None. Both sides take their 1y window back from the last
+    bar, so the same bars give the same window on any later day.
+    """
+    if entry is None or hist.empty:
+        return None
+    if entry['last_date'] != window_dates(hist)[1]:
+        return None
+    return entry
+
+
+# ========== Job ==========
+def precompute_ticker(ticker, registry, metadata_store, pipeline, holding_period=None):
+    """
+    Snapshot entry for one ticker, None when it has no history
+    """
+    from stock_analysis.screener import star_performance_table_for
+
+    holding_period = holding_period or PRECOMPUTE_CONFIG['HOLDING_PERIOD']
+    hist = registry.get(ticker, "1y", anchored=True)
+    if hist.empty:
+        return None
+    first_date, last_date = window_dates(hist)
+    return {
+        'first_date': first_date,
+        'last_date': last_date,
+        'quality': check_stock_quality(ticker, hist['Close'].iloc[-1], metadata_store),
+        'distribution': analyze_price_distribution(hist),
+        'star_table': star_performance_table_for(ticker, registry.get(ticker, "5y"), holding_period,
+                                                 pipeline.run_cpu),
+    }
+
+
+def run_precompute(tickers=None, date=None, directory=None, store=None, metadata_store=None,
+                   pipeline=None, batch_size=None, progress=None):
+    """
+    Precompute tickers (default: every watchlist) into the snapshot for
+    date (default: the latest market date). Tickers already in the
+    snapshot are skipped, so a rerun resumes an interrupted job.
+    progress(done, total) is called after each committed batch.
+    Returns a summary dict.
+    """
+    tickers = list(dict.fromkeys(tickers if tickers is not None else collect_watchlist_tickers()))
+    date = market_date() if date is None else pd.Timestamp(date)
+    store = store or get_price_store()
+    metadata_store = metadata_store or get_metadata_store()
+    pipeline = pipeline or TickerPipeline()
+    batch_size = batch_size or PRECOMPUTE_CONFIG['BATCH_SIZE']
+    metrics = active_metrics()
+
+    snapshot = Snapshot(snapshot_path(date, directory))
+    already = snapshot.tickers()
+    todo = [t for t in tickers if t not in already]
+    done = len(tickers) - len(todo)
+    no_data = []
+    started = time.perf_counter()
+    snapshot.set_status(total=len(tickers), done=done, started_at=time.time(), finished_at=None)
+    if progress:
+        progress(done, len(tickers))
+
+    for offset in range(0, len(todo), batch_size):
+        batch = todo[offset:offset + batch_size]
+        registry = HistoryRegistry(store, period="5y")
+        with metrics.span('precompute_prefetch'):
+            registry.prefetch(batch)
+            metadata_store.update_last_prices({t: registry.latest_close(t) for t in batch})
+            metadata_store.refresh(batch)
+
+        with metrics.span('precompute_analysis'):
+            entries = pipeline.map(
+                lambda ticker: precompute_ticker(ticker, registry, metadata_store, pipeline), batch
+            )
+        snapshot.write({t: entry for t, entry in zip(batch, entries) if entry is not None})
+        no_data.extend(t for t, entry in zip(batch, entries) if entry is None)
+
+        done += len(batch)
+        snapshot.set_status(done=done)
+        if progress:
+            progress(done, len(tickers))
+
+    snapshot.set_status(finished_at=time.time())
+    return {
+        'date': date.strftime('%Y-%m-%d'),
+        'path': snapshot.path,
+        'tickers': len(tickers),
+        'computed': len(todo) - len(no_data),
+        'skipped': len(tickers) - len(todo),
+        'no_data': no_data,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m stock_analysis.precompute',
+        description="Precompute histories, quality checks, distributions and backtests for all watchlists"
+    )
+    parser.add_argument('symbols', nargs='*', help="Symbols to precompute (default: every saved watchlist)")
+    parser.add_argument('--watchlists', help="Watchlist database (default: the app's)")
+    parser.add_argument('--dir', default=PRECOMPUTE_CONFIG['DIR'], help="Snapshot directory (default: %(default)s)")
+    parser.add_argument('--date', help="Market date of the snapshot (default: latest close)")
+    parser.add_argument('--watch', action='store_true',
+                        help=f"Keep running, once every business day after {PRECOMPUTE_CONFIG['RUN_AFTER']} New York time")
+    args = parser.parse_args(argv)
+
+    def show_progress(done, total):
+        print(f"  {done}/{total} precomputed", file=sys.stderr)
+
+    while True:
+        if args.watch:
+            run_at = next_run_time()
+            print(f"Next run at {run_at:%Y-%m-%d %H:%M %Z}", file=sys.stderr)
+            time.sleep(max(0.0, (run_at - pd.Timestamp.now(tz=run_at.tz)).total_seconds()))
+
+        tickers = [s.upper() for s in args.symbols] or collect_watchlist_tickers(
+            WatchlistStore(args.watchlists) if args.watchlists else None
+        )
+        print(f"Precomputing {len(tickers)} symbols...", file=sys.stderr)
+        summary = run_precompute(tickers, date=args.date, directory=args.dir, progress=show_progress)
+        print(f"Snapshot {summary['path']}: {summary['computed']} computed, {summary['skipped']} already done, "
+              f"{len(summary['no_data'])} without data in {summary['seconds']:.1f}s", file=sys.stderr)
+
+        if not args.watch:
+            return 0 if not summary['no_data'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""
+On-disk daily OHLCV store backed by SQLite.
+
+Each symbol keeps the longest history ever requested for it. Later
+requests only download the bars after the last stored date and append
+them. If Yahoo has re-adjusted a symbol's past prices since it was stored
+(split or dividend), the whole symbol is rewritten from a fresh download.
+
+Concurrent updates from several sessions are coalesced per symbol and
+start date: the first caller downloads, the others wait for it and then
+read its bars from disk.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from stock_analysis.fetch import HISTORY_COLUMNS
+from stock_analysis.providers import get_provider
+from stock_analysis.resilience import CircuitBreaker, get_request_guard
+from stock_analysis.singleflight import SingleFlight
+
+DEFAULT_DB_PATH = os.environ.get('STOCK_APP_PRICE_DB', 'price_store.db')
+
+# Stored bars younger than this are served without asking Yahoo
+REFRESH_SECONDS = 3600
+
+# Incremental fetches start this many days before the last stored bar so
+# the overlap can be compared against what is on disk
+OVERLAP_DAYS = 10
+
+# Relative close difference on overlapping bars that counts as a re-adjustment
+ADJUSTMENT_TOLERANCE = 1e-4
+
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+_DB_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'dividends', 'splits']
+_COLUMN_MAP = dict(zip(_DB_COLUMNS, HISTORY_COLUMNS))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL,
+    volume REAL, dividends REAL, splits REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    last_date TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def period_start(period, today=None):
+    """
+    First calendar date covered by a yfinance-style period string
+    """
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+    today = pd.Timestamp(today or datetime.now().date())
+    return (today - PERIOD_OFFSETS[period]).normalize()
+
+
+class PriceStore:
+    """
+    Daily bar store. Safe to share between Streamlit sessions: every call
+    opens its own connection and writes are serialized.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, refresh_seconds=REFRESH_SECONDS, provider=None):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        # None: the process-wide provider at fetch time
+        self.provider = provider
+        self._write_lock = threading.Lock()
+        self._flights = SingleFlight('history')
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---------- Reads ----------
+    def _read_meta(self, conn, symbols):
+        meta = {}
+        for offset in range(0, len(symbols), 500):
+            chunk = symbols[offset:offset + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT symbol, covered_from, last_date, updated_at FROM symbols "
+                f"WHERE symbol IN ({placeholders})", chunk
+            ).fetchall()
+            for symbol, covered_from, last_date, updated_at in rows:
+                meta[symbol] = {
+                    'covered_from': pd.Timestamp(covered_from),
+                    'last_date': pd.Timestamp(last_date) if last_date else None,
+                    'updated_at': updated_at
+                }
+        return meta
+
+    def _read_bars(self, conn, symbol, start=None):
+        query = f"SELECT date, {', '.join(_DB_COLUMNS)} FROM bars WHERE symbol = ?"
+        params = [symbol]
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(start.strftime('%Y-%m-%d'))
+        query += " ORDER BY date"
+
+        hist = pd.read_sql_query(query, conn, params=params, parse_dates=['date'], index_col='date')
+        hist = hist.rename(columns=_COLUMN_MAP)
+        hist.index.name = 'Date'
+        return hist
+
+    # ---------- Writes ----------
+    def _write_bars(self, conn, symbol, hist, covered_from, replace=False):
+        if replace:
+            conn.execute("DELETE FROM bars WHERE symbol = ?", (symbol,))
+
+        frame = hist.reindex(columns=HISTORY_COLUMNS).fillna({'Dividends': 0.0, 'Stock Splits': 0.0})
+        rows = [
+            (symbol, date.strftime('%Y-%m-%d'), *[None if pd.isna(v) else float(v) for v in values])
+            for date, values in zip(frame.index, frame.itertuples(index=False, name=None))
+        ]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO bars (symbol, date, {', '.join(_DB_COLUMNS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(_DB_COLUMNS))})",
+            rows
+        )
+
+        last_date = conn.execute(
+            "SELECT MAX(date) FROM bars WHERE symbol = ?", (symbol,)
+        ).fetchone()[0]
+        conn.execute(
+            "INSERT OR REPLACE INTO symbols (symbol, covered_from, last_date, updated_at) VALUES (?, ?, ?, ?)",
+            (symbol, covered_from.strftime('%Y-%m-%d'), last_date, time.time())
+        )
+
+    def _write_missing(self, conn, symbol, covered_from):
+        # Negative result: no bars from covered_from on, as of now
+        conn.execute(
+            "INSERT OR REPLACE INTO symbols (symbol, covered_from, last_date, updated_at) VALUES (?, ?, NULL, ?)",
+            (symbol, covered_from.strftime('%Y-%m-%d'), time.time())
+        )
+
+    def _is_readjusted(self, stored, fresh, last_date):
+        """
+        True when the downloaded overlap disagrees with the stored closes, or
+        the new bars carry a split or dividend that rewrites older prices
+        """
+        new_bars = fresh[fresh.index > last_date]
+        for column in ('Dividends', 'Stock Splits'):
+            if column in new_bars and (new_bars[column].fillna(0) != 0).any():
+                return True
+
+        # The last stored bar may have been a live intraday bar, so only
+        # fully settled days are compared
+        overlap = stored['Close'][stored.index < last_date].align(
+            fresh['Close'][fresh.index < last_date], join='inner'
+        )
+        if overlap[0].empty:
+            return False
+        relative = ((overlap[0] - overlap[1]).abs() / overlap[0].abs()).max()
+        return bool(relative > ADJUSTMENT_TOLERANCE)
+
+    def _claim(self, groups, led, waiting):
+        """
+        Start a flight for every (symbol, start date) in groups. Returns
+        the groups reduced to the symbols this call leads; keys it leads
+        are added to led, other callers' flights to waiting.
+        """
+        claimed = {}
+        for start, group in groups.items():
+            for symbol in group:
+                key = (symbol, start.strftime('%Y-%m-%d'))
+                flight, leader = self._flights.begin(key)
+                if leader:
+                    led.append(key)
+                    claimed.setdefault(start, []).append(symbol)
+                else:
+                    waiting.append(flight)
+        return claimed
+
+    # ---------- Public API ----------
+    def get_history(self, symbol, period="1y"):
+        """
+        Daily history for one symbol over the given period
+        """
+        histories, _ = self.get_histories([symbol], period=period)
+        return histories[symbol]
+
+    def update(self, symbols, period="1y"):
+        """
+        Download whatever the store is missing for these symbols over the
+        given period: full history for new or too-short symbols, recent
+        bars for stale ones. A symbol the provider had no data for is not
+        asked for again within refresh_seconds. Returns the fetch timings.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        wanted_from = period_start(period)
+        provider = self.provider or get_provider()
+        now = time.time()
+        timings = []
+
+        with self._connect() as conn:
+            meta = self._read_meta(conn, symbols)
+
+        full_groups = {}
+        update_groups = {}
+        for symbol in symbols:
+            info = meta.get(symbol)
+            if (info is not None and info['last_date'] is None and info['covered_from'] <= wanted_from
+                    and now - info['updated_at'] <= self.refresh_seconds):
+                # The provider had nothing for this range recently; do not ask again yet
+                continue
+            if info is None or info['last_date'] is None or info['covered_from'] > wanted_from:
+                covered_from = wanted_from if info is None else min(info['covered_from'], wanted_from)
+                full_groups.setdefault(covered_from, []).append(symbol)
+            elif now - info['updated_at'] > self.refresh_seconds:
+                update_from = info['last_date'] - pd.Timedelta(days=OVERLAP_DAYS)
+                update_groups.setdefault(update_from, []).append(symbol)
+
+        # Symbols another caller is already downloading from the same date
+        # are left to it; this call waits for them after its own downloads
+        led = []
+        waiting = []
+        full_groups = self._claim(full_groups, led, waiting)
+        update_groups = self._claim(update_groups, led, waiting)
+
+        try:
+            rewrites = {}
+            for update_from, group in update_groups.items():
+                fetched, fetch_timings = provider.bulk_history(group, start=update_from.strftime('%Y-%m-%d'))
+                timings.extend(dict(t, stage=f"update: {t['stage']}") for t in fetch_timings)
+
+                with self._write_lock, self._connect() as conn:
+                    for symbol in group:
+                        fresh = fetched.get(symbol)
+                        if fresh is None or fresh.empty:
+                            # Keep serving what is on disk until the provider answers again
+                            continue
+                        info = meta[symbol]
+                        stored = self._read_bars(conn, symbol, start=update_from)
+                        if self._is_readjusted(stored, fresh, info['last_date']):
+                            rewrites.setdefault(info['covered_from'], []).append(symbol)
+                        else:
+                            self._write_bars(conn, symbol, fresh, info['covered_from'])
+
+            for covered_from, group in rewrites.items():
+                full_groups.setdefault(covered_from, []).extend(group)
+
+            for covered_from, group in full_groups.items():
+                fetched, fetch_timings = provider.bulk_history(group, start=covered_from.strftime('%Y-%m-%d'))
+                timings.extend(dict(t, stage=f"full: {t['stage']}") for t in fetch_timings)
+
+                # While Yahoo is paused, empty results say nothing about the symbols
+                record_missing = get_request_guard().breaker.state == CircuitBreaker.CLOSED
+                with self._write_lock, self._connect() as conn:
+                    for symbol in group:
+                        fresh = fetched.get(symbol)
+                        if fresh is not None and not fresh.empty:
+                            self._write_bars(conn, symbol, fresh, covered_from, replace=True)
+                        elif record_missing and meta.get(symbol, {}).get('last_date') is None:
+                            self._write_missing(conn, symbol, covered_from)
+        finally:
+            for key in led:
+                self._flights.finish(key)
+
+        if waiting:
+            started = time.perf_counter()
+            for flight in waiting:
+                flight.wait()
+            timings.append({
+                'stage': 'coalesced wait',
+                'symbols': len(waiting),
+                'fetched': 0,
+                'seconds': time.perf_counter() - started
+            })
+
+        return timings
+
+    def stale_symbols(self, symbols):
+        """
+        Symbols whose stored bars are older than refresh_seconds, i.e. the
+        last refresh attempt got nothing from the provider (for instance
+        while the Yahoo circuit breaker is open). Symbols with no stored
+        bars are not stale, just missing.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        now = time.time()
+        with self._connect() as conn:
+            meta = self._read_meta(conn, symbols)
+        return {
+            symbol for symbol, info in meta.items()
+            if info['last_date'] is not None and now - info['updated_at'] > self.refresh_seconds
+        }
+
+    def get_histories(self, symbols, period="1y"):
+        """
+        Daily history for many symbols over the given period, downloading
+        only what the store is missing.
+
+        Returns (histories, timings) like MarketDataProvider.bulk_history.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        wanted_from = period_start(period)
+        timings = self.update(symbols, period)
+
+        started = time.perf_counter()
+        histories = {}
+        with self._connect() as conn:
+            for symbol in symbols:
+                histories[symbol] = self._read_bars(conn, symbol, start=wanted_from)
+        timings.append({
+            'stage': 'store read',
+            'symbols': len(symbols),
+            'fetched': sum(not h.empty for h in histories.values()),
+            'seconds': time.perf_counter() - started
+        })
+
+        return histories, timings
+
+    def get_close_matrix(self, symbols, period="1y"):
+        """
+        Closes for many symbols as one date x symbol frame, read with a
+        single query per 500 symbols. Dates are the union over all symbols;
+        a symbol with no bar on a date has NaN there.
+
+        Returns (closes, timings).
+        """
+        symbols = list(dict.fromkeys(symbols))
+        wanted_from = period_start(period)
+        if not symbols:
+            return pd.DataFrame(columns=symbols, index=pd.DatetimeIndex([], name='Date'), dtype=float), []
+        timings = self.update(symbols, period)
+
+        started = time.perf_counter()
+        parts = []
+        with self._connect() as conn:
+            for offset in range(0, len(symbols), 500):
+                chunk = symbols[offset:offset + 500]
+                parts.append(pd.read_sql_query(
+                    f"SELECT date, symbol, close FROM bars WHERE date >= ? "
+                    f"AND symbol IN ({','.join('?' * len(chunk))})",
+                    conn, params=[wanted_from.strftime('%Y-%m-%d')] + chunk
+                ))
+        long_frame = pd.concat(parts, ignore_index=True)
+        closes = long_frame.pivot(index='date', columns='symbol', values='close')
+        closes.index = pd.to_datetime(closes.index)
+        closes.index.name = 'Date'
+        closes = closes.reindex(columns=symbols).sort_index()
+        timings.append({
+            'stage': 'store read',
+            'symbols': len(symbols),
+            'fetched': int(closes.notna().any().sum()),
+            'seconds': time.perf_counter() - started
+        })
+
+        return closes, timings
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """
+    Process-wide store at DEFAULT_DB_PATH
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PriceStore()
+        return _default_store
@@ -0,0 +1,338 @@
+"""
+Market data providers.
+
+Everything that leaves the process for prices or metadata goes through
+a MarketDataProvider: history for one symbol, bulk history for many and
+metadata fields. The price store and the metadata store call the
+process-wide provider from get_provider(), chosen by environment:
+
+    STOCK_APP_PROVIDER=yahoo    (default) live Yahoo Finance, one pooled
+                                HTTP session for every request
+    STOCK_APP_PROVIDER=replay   recorded Parquet/CSV files under
+                                STOCK_APP_REPLAY_DIR, fully offline
+
+Record a replay set from Yahoo:
+
+    python -m stock_analysis.providers record --out replay_data --period 5y AAPL MSFT ^GSPC
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from stock_analysis.fetch import (
+    BULK_CHUNK_SIZE, INFO_KEYS, fetch_history, fetch_histories, fetch_info, fetch_quotes, normalize_history
+)
+
+PROVIDER_CONFIG = {
+    'PROVIDER': os.environ.get('STOCK_APP_PROVIDER', 'yahoo'),
+    'REPLAY_DIR': os.environ.get('STOCK_APP_REPLAY_DIR', 'replay_data'),
+    # Move recorded dates forward so the last bar falls on the latest
+    # business day; lets an old recording serve "today's" periods
+    'REPLAY_SHIFT': os.environ.get('STOCK_APP_REPLAY_SHIFT', '1') not in ('', '0'),
+}
+
+HISTORY_FORMATS = ['parquet', 'csv']
+
+
+class MarketDataProvider:
+    """
+    Source of daily history and symbol metadata. Subclasses implement
+    history() and metadata(); bulk_history() defaults to one history()
+    call per symbol.
+    """
+
+    name = 'base'
+
+    def history(self, symbol, period="1y", start=None):
+        """
+        Normalized daily history (see fetch.normalize_history) from start,
+        or over period when start is None. Empty frame when there is none.
+        """
+        raise NotImplementedError
+
+    def bulk_history(self, symbols, period="1y", start=None):
+        """
+        History for many symbols. Returns (histories, timings) with a frame
+        for every symbol, like fetch.fetch_histories.
+        """
+        started = time.perf_counter()
+        histories = {}
+        for symbol in dict.fromkeys(symbols):
+            try:
+                histories[symbol] = self.history(symbol, period=period, start=start)
+            except Exception:
+                histories[symbol] = normalize_history(None)
+        timings = [{
+            'stage': self.name,
+            'symbols': len(histories),
+            'fetched': sum(not hist.empty for hist in histories.values()),
+            'seconds': time.perf_counter() - started
+        }]
+        return histories, timings
+
+    def metadata(self, symbol):
+        """
+        {field: value} for the fields in fetch.INFO_KEYS. Raises when the
+        symbol's metadata cannot be fetched.
+        """
+        raise NotImplementedError
+
+    def quotes(self, symbols):
+        """
+        {symbol: (timestamp, price)} with the latest intraday price of each
+        symbol that has one
+        """
+        raise NotImplementedError
+
+
+# ========== Yahoo Finance ==========
+def make_session():
+    """
+    HTTP session shared by every Yahoo request, so connections and cookies
+    are reused. yfinance needs a curl_cffi session; without curl_cffi,
+    None lets yfinance manage its own.
+    """
+    try:
+        from curl_cffi import requests as curl_requests
+    except ImportError:
+        return None
+    return curl_requests.Session(impersonate="chrome")
+
+
+class YahooProvider(MarketDataProvider):
+    """
+    Live Yahoo Finance data over one pooled session
+    """
+
+    name = 'yahoo'
+
+    def __init__(self, session=None, chunk_size=BULK_CHUNK_SIZE):
+        self._session = session
+        self._session_lock = threading.Lock()
+        self.chunk_size = chunk_size
+
+    @property
+    def session(self):
+        # Created on first request, so merely choosing the provider does
+        # not import curl_cffi
+        with self._session_lock:
+            if self._session is None:
+                self._session = make_session()
+            return self._session
+
+    def history(self, symbol, period="1y", start=None):
+        return fetch_history(symbol, period=period, start=start, session=self.session)
+
+    def bulk_history(self, symbols, period="1y", start=None):
+        return fetch_histories(symbols, period=period, start=start,
+                               chunk_size=self.chunk_size, session=self.session)
+
+    def metadata(self, symbol):
+        return fetch_info(symbol, session=self.session)
+
+    def quotes(self, symbols):
+        return fetch_quotes(symbols, session=self.session)
+
+
+# ========== Local Replay ==========
+def _file_stem(symbol):
+    return symbol.replace('/', '_')
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded data from a directory, without any network access:
+
+        <root>/history/<SYMBOL>.parquet (or .csv)   daily OHLCV, Date index
+        <root>/metadata.json                        {symbol: {field: value}}
+
+    Symbols without a file have no data. Files are read once and kept in
+    memory until they change on disk.
+    """
+
+    name = 'replay'
+
+    def __init__(self, root=None, shift_to_today=None):
+        self.root = root or PROVIDER_CONFIG['REPLAY_DIR']
+        self.shift_to_today = PROVIDER_CONFIG['REPLAY_SHIFT'] if shift_to_today is None else shift_to_today
+        self._frames = {}
+        self._metadata = None
+        self._lock = threading.Lock()
+
+    def _history_path(self, symbol):
+        for fmt in HISTORY_FORMATS:
+            path = os.path.join(self.root, 'history', f"{_file_stem(symbol)}.{fmt}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _read(self, path):
+        if path.endswith('.parquet'):
+            hist = pd.read_parquet(path)
+        else:
+            hist = pd.read_csv(path, index_col=0, parse_dates=True)
+        hist = normalize_history(hist)
+        if self.shift_to_today and not hist.empty:
+            latest = pd.Timestamp.today().normalize()
+            if latest.dayofweek >= 5:
+                latest -= pd.offsets.BDay(1)
+            lag = len(pd.bdate_range(hist.index[-1], latest)) - 1
+            if lag > 0:
+                hist.index = hist.index + pd.offsets.BDay(lag)
+        return hist
+
+    def _load(self, symbol):
+        path = self._history_path(symbol)
+        if path is None:
+            return normalize_history(None)
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._frames.get(symbol)
+            if cached is not None and cached[0] == (path, mtime):
+                return cached[1]
+        hist = self._read(path)
+        with self._lock:
+            self._frames[symbol] = ((path, mtime), hist)
+        return hist
+
+    def history(self, symbol, period="1y", start=None):
+        from stock_analysis.price_store import period_start
+
+        hist = self._load(symbol)
+        wanted_from = pd.Timestamp(start) if start is not None else period_start(period)
+        return hist[hist.index >= wanted_from]
+
+    def metadata(self, symbol):
+        with self._lock:
+            if self._metadata is None:
+                path = os.path.join(self.root, 'metadata.json')
+                self._metadata = {}
+                if os.path.exists(path):
+                    with open(path, 'r') as f:
+                        self._metadata = json.load(f)
+            fields = self._metadata.get(symbol)
+        if fields is None:
+            raise LookupError(f"No recorded metadata for {symbol}")
+        return {field: fields.get(field) for field in INFO_KEYS}
+
+    def quotes(self, symbols):
+        # The last recorded close, stamped at the close; recorded ticks
+        # are replayed with live.TickFile instead
+        quotes = {}
+        for symbol in dict.fromkeys(symbols):
+            hist = self._load(symbol)
+            if not hist.empty:
+                quotes[symbol] = (hist.index[-1] + pd.Timedelta(hours=16), float(hist['Close'].iloc[-1]))
+        return quotes
+
+
+def record(symbols, root, period="5y", fmt='parquet', source=None, with_metadata=True):
+    """
+    Save history (and metadata) for symbols from source (default: Yahoo)
+    in the ReplayProvider layout. Returns a summary dict.
+    """
+    source = source or YahooProvider()
+    symbols = list(dict.fromkeys(symbols))
+    os.makedirs(os.path.join(root, 'history'), exist_ok=True)
+
+    histories, _ = source.bulk_history(symbols, period=period)
+    saved = []
+    for symbol, hist in histories.items():
+        if hist.empty:
+            continue
+        path = os.path.join(root, 'history', f"{_file_stem(symbol)}.{fmt}")
+        if fmt == 'parquet':
+            hist.to_parquet(path)
+        else:
+            hist.to_csv(path)
+        saved.append(symbol)
+
+    recorded_metadata = 0
+    if with_metadata:
+        path = os.path.join(root, 'metadata.json')
+        metadata = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                metadata = json.load(f)
+        for symbol in saved:
+            try:
+                metadata[symbol] = source.metadata(symbol)
+                recorded_metadata += 1
+            except Exception:
+                pass
+        with open(path, 'w') as f:
+            json.dump(metadata, f, indent=2, default=float)
+
+    return {
+        'symbols': len(symbols),
+        'history': len(saved),
+        'metadata': recorded_metadata,
+        'missing': [s for s in symbols if s not in saved],
+    }
+
+
+# ========== Process-wide Provider ==========
+PROVIDERS = {
+    'yahoo': YahooProvider,
+    'replay': ReplayProvider,
+}
+
+_default_provider = None
+_default_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """
+    Process-wide provider chosen by PROVIDER_CONFIG['PROVIDER']
+    """
+    global _default_provider
+    with _default_provider_lock:
+        if _default_provider is None:
+            name = PROVIDER_CONFIG['PROVIDER']
+            if name not in PROVIDERS:
+                raise ValueError(f"Unknown provider {name!r}; expected one of {', '.join(PROVIDERS)}")
+            _default_provider = PROVIDERS[name]()
+        return _default_provider
+
+
+def set_provider(provider):
+    """
+    Replace the process-wide provider (e.g. a ReplayProvider in a load test)
+    """
+    global _default_provider
+    with _default_provider_lock:
+        _default_provider = provider
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m stock_analysis.providers',
+        description="Record Yahoo Finance data for the offline replay provider"
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="Download history and metadata into a replay directory")
+    record_parser.add_argument('symbols', nargs='+')
+    record_parser.add_argument('--out', default=PROVIDER_CONFIG['REPLAY_DIR'],
+                               help="Replay directory (default: %(default)s)")
+    record_parser.add_argument('--period', default='5y', help="History period (default: 5y)")
+    record_parser.add_argument('--format', choices=HISTORY_FORMATS, default='parquet')
+    record_parser.add_argument('--no-metadata', action='store_true', help="Skip the .info calls")
+    args = parser.parse_args(argv)
+
+    summary = record([s.upper() for s in args.symbols], args.out, period=args.period,
+                     fmt=args.format, with_metadata=not args.no_metadata)
+    print(f"Recorded {summary['history']}/{summary['symbols']} histories and "
+          f"{summary['metadata']} metadata entries in {args.out}")
+    if summary['missing']:
+        print(f"No data: {', '.join(summary['missing'])}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
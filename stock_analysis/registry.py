@@ -0,0 +1,132 @@
+"""
+Per-run registry of daily history frames.
+
+An analysis run loads one frame per symbol, covering the longest period
+any stage needs. Every stage (analysis, backtest, quality check, charts)
+takes its slice from that frame instead of asking the store again. The
+counters make duplicate fetches visible.
+
+Symbols the store could not refresh are remembered as stale, so results
+built on them can say so.
+"""
+import threading
+from collections import Counter
+
+from stock_analysis.cache import sizeof
+from stock_analysis.metrics import active_metrics
+from stock_analysis.price_store import period_start
+
+
+class HistoryRegistry:
+    """
+    History frames for one analysis run, backed by a PriceStore
+    """
+
+    def __init__(self, store, period="1y"):
+        self.store = store
+        self.period = period
+        self.timings = []
+        self._frames = {}
+        self._fetches = Counter()
+        self._stale = set()
+        # Pipeline workers read the registry concurrently
+        self._lock = threading.RLock()
+        self.counters = {
+            'requests': 0,
+            'hits': 0,
+            'store_calls': 0,
+        }
+
+    def _load(self, symbols, period):
+        histories, timings = self.store.get_histories(symbols, period=period)
+        self.counters['store_calls'] += 1
+        self.timings.extend(timings)
+        for symbol, hist in histories.items():
+            self._frames[symbol] = (period_start(period), hist)
+            self._fetches[symbol] += 1
+        stale = self.store.stale_symbols(list(histories))
+        self._stale.difference_update(histories)
+        self._stale.update(stale)
+
+    def prefetch(self, symbols):
+        """
+        Load every symbol not yet in the registry with one store call
+        """
+        with self._lock:
+            missing = [s for s in dict.fromkeys(symbols) if s not in self._frames]
+            if missing:
+                self._load(missing, self.period)
+
+    def get(self, symbol, period=None, anchored=False):
+        """
+        History for a symbol over `period` (default: the registry period),
+        sliced from the registry frame. The period ends today, or with
+        anchored=True at the symbol's last bar, so the same bars always
+        give the same window (as far back as the frame reaches).
+        """
+        period = period or self.period
+        wanted_from = period_start(period)
+
+        with self._lock:
+            self.counters['requests'] += 1
+            entry = self._frames.get(symbol)
+            if entry is None or entry[0] > wanted_from:
+                self._load([symbol], min([period, self.period], key=period_start))
+                entry = self._frames[symbol]
+                active_metrics().increment('cache_requests', cache='history_registry', result='miss')
+            else:
+                self.counters['hits'] += 1
+                active_metrics().increment('cache_requests', cache='history_registry', result='hit')
+
+        hist = entry[1]
+        if anchored and not hist.empty:
+            wanted_from = period_start(period, today=hist.index[-1])
+        return hist[hist.index >= wanted_from]
+
+    def latest_close(self, symbol):
+        """
+        Last close in the registry frame, None when there is no data
+        """
+        entry = self._frames.get(symbol)
+        if entry is None or entry[1].empty:
+            return None
+        return entry[1]['Close'].iloc[-1]
+
+    def is_stale(self, symbol):
+        """
+        True when the symbol's history was served from the store after a
+        failed refresh
+        """
+        return symbol in self._stale
+
+    def stale_symbols(self):
+        return sorted(self._stale)
+
+    def fetch_counts(self):
+        """
+        Number of times each symbol was loaded from the store
+        """
+        return dict(self._fetches)
+
+    def duplicate_fetches(self):
+        """
+        Symbols loaded more than once in this run
+        """
+        return sorted(s for s, count in self._fetches.items() if count > 1)
+
+    def __sizeof__(self):
+        # Counted by cache.sizeof when a run's results are cached
+        with self._lock:
+            return object.__sizeof__(self) + sizeof(self._frames)
+
+    def stats(self):
+        """
+        Counters plus symbol totals, for display
+        """
+        return dict(
+            self.counters,
+            symbols=len(self._fetches),
+            symbol_fetches=sum(self._fetches.values()),
+            duplicates=len(self.duplicate_fetches()),
+            stale=len(self._stale)
+        )
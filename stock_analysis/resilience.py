@@ -0,0 +1,281 @@
+"""
+Guard rails for Yahoo Finance requests, shared by every session in the
+server process:
+
+- a token bucket that caps the request rate,
+- retries with jittered exponential backoff,
+- a circuit breaker that stops calling Yahoo after repeated failures and
+  lets one probe through after a cool-down.
+
+Only transient failures (network errors, timeouts, HTTP 429 and 5xx, a
+batch that came back empty) are retried and count against the breaker.
+Other errors, such as a bad or delisted symbol, are raised at once.
+
+While the breaker is open, requests fail at once with CircuitOpenError;
+the price and metadata stores then keep serving what they already have,
+marked stale.
+"""
+import concurrent.futures
+import os
+import random
+import threading
+import time
+
+from stock_analysis.metrics import active_metrics, yahoo_request
+
+RESILIENCE_CONFIG = {
+    # Sustained requests per second and burst size, process-wide
+    'RATE_PER_SECOND': float(os.environ.get('STOCK_APP_YAHOO_RATE', 5.0)),
+    'BURST': int(os.environ.get('STOCK_APP_YAHOO_BURST', 10)),
+    # Longest a request waits for a token before giving up
+    'MAX_WAIT_SECONDS': 30.0,
+    # Retries after the first attempt, and the backoff bounds
+    'RETRIES': int(os.environ.get('STOCK_APP_YAHOO_RETRIES', 3)),
+    'BACKOFF_BASE_SECONDS': 0.5,
+    'BACKOFF_MAX_SECONDS': 8.0,
+    # Consecutive failed requests that open the breaker, and how long it
+    # stays open before a probe request is allowed
+    'FAILURE_THRESHOLD': 5,
+    'RESET_SECONDS': 60.0,
+}
+
+
+class RateLimitTimeout(Exception):
+    """
+    No request token became available within the allowed wait
+    """
+
+
+class CircuitOpenError(Exception):
+    """
+    The circuit breaker is open; the request was not sent
+    """
+
+
+class TransientError(Exception):
+    """
+    A request failure worth retrying, raised by request functions that
+    detect one themselves
+    """
+
+
+# ========== Token Bucket ==========
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `capacity`
+    saved up for bursts
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens if available now. Returns 0 on success, otherwise the
+        seconds until enough tokens will have accumulated.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Block until tokens are available. Returns the seconds waited;
+        raises RateLimitTimeout if that would exceed timeout.
+        """
+        started = self._clock()
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return self._clock() - started
+            if timeout is not None and self._clock() - started + wait > timeout:
+                raise RateLimitTimeout(f"No request token within {timeout:.0f}s")
+            time.sleep(wait)
+
+
+# ========== Retry ==========
+def backoff_delay(attempt, base=None, cap=None, rng=random):
+    """
+    "Full jitter" exponential backoff: uniform in [0, min(cap, base * 2^attempt)]
+    """
+    base = RESILIENCE_CONFIG['BACKOFF_BASE_SECONDS'] if base is None else base
+    cap = RESILIENCE_CONFIG['BACKOFF_MAX_SECONDS'] if cap is None else cap
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def is_transient(exc):
+    """
+    Whether a request error is likely to go away on retry: network errors
+    and timeouts, HTTP 429 and 5xx, and Yahoo's rate-limit error. An HTTP
+    error with any other status, or a non-network exception, is not.
+    """
+    if isinstance(exc, TransientError):
+        return True
+    # yfinance's own rate-limit error, matched by name so yfinance is not
+    # imported here
+    if type(exc).__name__ == 'YFRateLimitError':
+        return True
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # requests' and curl_cffi's connection and timeout errors are OSErrors
+    return isinstance(exc, (OSError, concurrent.futures.TimeoutError))
+
+
+# ========== Circuit Breaker ==========
+class CircuitBreaker:
+    """
+    Closed: requests flow, consecutive failures are counted. Open: requests
+    are refused until reset_seconds have passed. Half-open: one probe is
+    let through; its success closes the breaker, its failure reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_seconds, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        Whether a request may be sent now
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._clock() - self._opened_at < self.reset_seconds:
+                return False
+            # Cool-down over: let exactly one probe through
+            if self._probe_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """
+        Give back a half-open probe slot that was not used
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def seconds_until_retry(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return 0.0
+            return max(0.0, self.reset_seconds - (self._clock() - self._opened_at))
+
+
+# ========== Guarded Requests ==========
+class RequestGuard:
+    """
+    Rate limiter, retries and circuit breaker around request functions
+    """
+
+    def __init__(self, limiter=None, breaker=None, retries=None, max_wait=None, sleep=time.sleep):
+        self.limiter = limiter or TokenBucket(RESILIENCE_CONFIG['RATE_PER_SECOND'], RESILIENCE_CONFIG['BURST'])
+        self.breaker = breaker or CircuitBreaker(
+            RESILIENCE_CONFIG['FAILURE_THRESHOLD'], RESILIENCE_CONFIG['RESET_SECONDS']
+        )
+        self.retries = RESILIENCE_CONFIG['RETRIES'] if retries is None else retries
+        self.max_wait = RESILIENCE_CONFIG['MAX_WAIT_SECONDS'] if max_wait is None else max_wait
+        self._sleep = sleep
+
+    def call(self, kind, func, *args, **kwargs):
+        """
+        Call func(*args, **kwargs) as one `kind` request: wait for a token,
+        retry transient failures with backoff, and keep the breaker
+        informed. Other errors are raised at once and, since Yahoo did
+        answer, count as a success for the breaker. Raises
+        CircuitOpenError without calling func while the breaker is open.
+        """
+        metrics = active_metrics()
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                metrics.increment('yahoo_rejected', kind=kind)
+                raise CircuitOpenError(
+                    f"Yahoo requests paused for {self.breaker.seconds_until_retry():.0f}s after repeated failures"
+                )
+
+            try:
+                waited = self.limiter.acquire(timeout=self.max_wait)
+            except RateLimitTimeout:
+                # Not Yahoo's fault, so not a failure; free the probe slot
+                self.breaker.release_probe()
+                raise
+            if waited:
+                metrics.observe('rate_limit_wait_seconds', waited, kind=kind)
+
+            try:
+                with yahoo_request(kind, metrics):
+                    result = func(*args, **kwargs)
+            except Exception as exc:
+                if not is_transient(exc):
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+                metrics.increment('yahoo_retries', kind=kind)
+                self._sleep(backoff_delay(attempt))
+                continue
+
+            self.breaker.record_success()
+            return result
+
+
+_default_guard = None
+_default_guard_lock = threading.Lock()
+
+
+def get_request_guard():
+    """
+    Process-wide guard for Yahoo requests, shared by every session
+    """
+    global _default_guard
+    with _default_guard_lock:
+        if _default_guard is None:
+            _default_guard = RequestGuard()
+        return _default_guard
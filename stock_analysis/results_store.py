@@ -0,0 +1,319 @@
+"""
+Append-only store of analysis results, backed by SQLite.
+
+Each saved run is one row in `runs` (user, time, benchmark, mode) plus
+one typed row per ticker in `results`, holding the numbers of the flat
+screener record rather than display strings. A run whose results are
+identical to one the same user already saved (a rerun caused by a
+display widget, for instance) is not stored again.
+
+    store = get_results_store()
+    run_id, created = store.append('alice', records, benchmark='^GSPC', mode='quant')
+    store.signal_history('NVDA', days=90)
+    store.compact(retention_days=365)
+
+Compact from cron with `python -m stock_analysis.results_store compact`.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+DEFAULT_DB_PATH = os.environ.get('STOCK_APP_RESULTS_DB', 'results_store.db')
+
+RESULTS_CONFIG = {
+    # compact(): runs older than this are deleted
+    'RETENTION_DAYS': int(os.environ.get('STOCK_APP_RESULTS_RETENTION_DAYS', 365)),
+    # compact(): runs older than this are thinned to the last one per
+    # user and market date
+    'THIN_AFTER_DAYS': 7,
+}
+
+# Record field -> SQLite type, in column order
+RESULT_COLUMNS = {
+    'status': 'TEXT',
+    'market_date': 'TEXT',
+    'current_price': 'REAL',
+    'high_52w': 'REAL',
+    'drawdown_pct': 'REAL',
+    'level': 'REAL',
+    'stars': 'TEXT',
+    'action': 'TEXT',
+    'signal': 'TEXT',
+    'qualified': 'INTEGER',
+    'quality_issues': 'TEXT',
+    'z_score': 'REAL',
+    'percentile': 'REAL',
+    'strength_score': 'REAL',
+    'strength': 'TEXT',
+    'win_rate': 'REAL',
+    'win_rate_low': 'REAL',
+    'win_rate_high': 'REAL',
+    'avg_win': 'REAL',
+    'avg_loss': 'REAL',
+    'var_95': 'REAL',
+    'var_95_low': 'REAL',
+    'var_95_high': 'REAL',
+    'profit_loss_ratio': 'REAL',
+    'profit_loss_ratio_low': 'REAL',
+    'profit_loss_ratio_high': 'REAL',
+    'sample_size': 'INTEGER',
+    'data_status': 'TEXT',
+    'error': 'TEXT',
+}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    benchmark TEXT,
+    mode TEXT,
+    tickers INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_user ON runs (user, created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS runs_by_fingerprint ON runs (user, fingerprint);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    {', '.join(f'{name} {sql_type}' for name, sql_type in RESULT_COLUMNS.items())},
+    PRIMARY KEY (run_id, ticker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_ticker ON results (ticker, market_date);
+"""
+
+
+def _value(value, sql_type):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if sql_type == 'REAL':
+        return float(value)
+    if sql_type == 'INTEGER':
+        return int(value)
+    return str(value)
+
+
+def fingerprint(user, records, benchmark=None, mode=None):
+    """
+    Hash of everything a run stores, so identical reruns can be detected
+    """
+    payload = json.dumps(
+        [user, benchmark, mode, sorted((r['ticker'], [r.get(c) for c in RESULT_COLUMNS]) for r in records)],
+        default=str
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class ResultsStore:
+    """
+    Saved analysis runs. Safe to share between Streamlit sessions: every
+    call opens its own connection and writes are serialized.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn):
+        # Databases created before a column was added to RESULT_COLUMNS
+        # get it as NULL for their existing rows
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+        for name, sql_type in RESULT_COLUMNS.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE results ADD COLUMN {name} {sql_type}")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---------- Writes ----------
+    def append(self, user, records, benchmark=None, mode=None):
+        """
+        Save one run's screener records. Returns (run_id, created); when
+        the user already saved identical results, that run's id and False.
+        """
+        key = fingerprint(user, records, benchmark, mode)
+        with self._write_lock, self._connect() as conn:
+            existing = conn.execute(
+                "SELECT run_id FROM runs WHERE user = ? AND fingerprint = ?", (user, key)
+            ).fetchone()
+            if existing:
+                return existing[0], False
+
+            run_id = uuid.uuid4().hex[:12]
+            conn.execute(
+                "INSERT INTO runs (run_id, user, created_at, benchmark, mode, tickers, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, user, time.time(), benchmark, mode, len(records), key)
+            )
+            conn.executemany(
+                f"INSERT INTO results (run_id, ticker, {', '.join(RESULT_COLUMNS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(RESULT_COLUMNS))})",
+                [
+                    (run_id, r['ticker'], *[_value(r.get(c), t) for c, t in RESULT_COLUMNS.items()])
+                    for r in records
+                ]
+            )
+        return run_id, True
+
+    def compact(self, retention_days=None, thin_after_days=None, vacuum=False):
+        """
+        Delete runs older than retention_days, and of the runs older than
+        thin_after_days keep only each user's last run per market date.
+        Returns the number of runs deleted.
+        """
+        retention_days = RESULTS_CONFIG['RETENTION_DAYS'] if retention_days is None else retention_days
+        thin_after_days = RESULTS_CONFIG['THIN_AFTER_DAYS'] if thin_after_days is None else thin_after_days
+        now = time.time()
+
+        with self._write_lock, self._connect() as conn:
+            expired = [row[0] for row in conn.execute(
+                "SELECT run_id FROM runs WHERE created_at < ?", (now - retention_days * 86400,)
+            )]
+            # A run's market date is the latest bar date among its results
+            superseded = [row[0] for row in conn.execute(
+                """
+                WITH dated AS (
+                    SELECT runs.run_id, runs.user, runs.created_at, MAX(results.market_date) AS market_date
+                    FROM runs JOIN results ON results.run_id = runs.run_id
+                    WHERE runs.created_at < ?
+                    GROUP BY runs.run_id
+                )
+                SELECT run_id FROM dated
+                WHERE created_at < (
+                    SELECT MAX(later.created_at) FROM dated AS later
+                    WHERE later.user = dated.user AND later.market_date IS dated.market_date
+                )
+                """, (now - thin_after_days * 86400,)
+            )]
+            deleted = list(dict.fromkeys(expired + superseded))
+            for offset in range(0, len(deleted), 500):
+                chunk = deleted[offset:offset + 500]
+                placeholders = ','.join('?' * len(chunk))
+                conn.execute(f"DELETE FROM results WHERE run_id IN ({placeholders})", chunk)
+                conn.execute(f"DELETE FROM runs WHERE run_id IN ({placeholders})", chunk)
+
+        if vacuum and deleted:
+            with self._write_lock, self._connect() as conn:
+                conn.execute("VACUUM")
+        return len(deleted)
+
+    # ---------- Queries ----------
+    def runs(self, user=None, limit=50):
+        """
+        Most recent runs first, optionally for one user
+        """
+        query = "SELECT run_id, user, created_at, benchmark, mode, tickers FROM runs"
+        params = []
+        if user is not None:
+            query += " WHERE user = ?"
+            params.append(user)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            frame = pd.read_sql_query(query, conn, params=params)
+        frame['created_at'] = pd.to_datetime(frame['created_at'], unit='s')
+        return frame
+
+    def run_results(self, run_id):
+        """
+        Every result row of one run
+        """
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT * FROM results WHERE run_id = ? ORDER BY ticker", conn, params=[run_id]
+            )
+
+    def signal_history(self, ticker, days=90, user=None):
+        """
+        One row per market date over the last `days` days with the
+        ticker's price, drawdown, signal and win rate with its confidence
+        interval from the latest run of that date (optionally only one
+        user's runs)
+        """
+        since = (pd.Timestamp.today().normalize() - pd.Timedelta(days=days)).strftime('%Y-%m-%d')
+        query = """
+            SELECT results.market_date, MAX(runs.created_at) AS created_at, results.current_price,
+                   results.drawdown_pct, results.level, results.action, results.z_score,
+                   results.percentile, results.win_rate, results.win_rate_low,
+                   results.win_rate_high, results.data_status
+            FROM results JOIN runs ON runs.run_id = results.run_id
+            WHERE results.ticker = ? AND results.status = 'ok' AND results.market_date >= ?
+        """
+        params = [ticker, since]
+        if user is not None:
+            query += " AND runs.user = ?"
+            params.append(user)
+        # SQLite takes the bare columns from the row holding MAX(created_at)
+        query += " GROUP BY results.market_date ORDER BY results.market_date"
+        with self._connect() as conn:
+            frame = pd.read_sql_query(query, conn, params=params)
+        frame['market_date'] = pd.to_datetime(frame['market_date'])
+        frame['created_at'] = pd.to_datetime(frame['created_at'], unit='s')
+        return frame
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_results_store():
+    """
+    Process-wide store at DEFAULT_DB_PATH
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ResultsStore()
+        return _default_store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m stock_analysis.results_store',
+        description="Query and compact saved analysis runs"
+    )
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Results database (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    history_parser = commands.add_parser('history', help="Signal history of one ticker")
+    history_parser.add_argument('ticker')
+    history_parser.add_argument('--days', type=int, default=90)
+    history_parser.add_argument('--user')
+
+    compact_parser = commands.add_parser('compact', help="Delete old runs and thin superseded ones")
+    compact_parser.add_argument('--retention-days', type=int, default=RESULTS_CONFIG['RETENTION_DAYS'])
+    compact_parser.add_argument('--thin-after-days', type=int, default=RESULTS_CONFIG['THIN_AFTER_DAYS'])
+    compact_parser.add_argument('--vacuum', action='store_true', help="Reclaim the freed disk space")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    if args.command == 'history':
+        print(store.signal_history(args.ticker.upper(), days=args.days, user=args.user).to_string(index=False))
+    else:
+        deleted = store.compact(args.retention_days, args.thin_after_days, vacuum=args.vacuum)
+        print(f"Deleted {deleted} run(s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+Per-ticker analysis and the batch screen built on it.
+
+Used by the Streamlit app and by the command line screener alike.
+"""
+from stock_analysis.analytics import (
+    check_stock_quality,
+    analyze_price_distribution,
+    calculate_relative_strength_score,
+    get_buy_signal_improved,
+    get_buy_signal_original,
+    generate_quant_report,
+    summarize_market,
+)
+from stock_analysis.backtest import star_performance_table, lookup_star_performance
+from stock_analysis.bootstrap import INTERVAL_STATS, level_intervals
+from stock_analysis.fetch import normalize_history
+from stock_analysis.metadata import get_metadata_store
+from stock_analysis.metrics import active_metrics, run_metrics
+from stock_analysis.pipeline import TickerPipeline
+from stock_analysis.precompute import matching_entry
+from stock_analysis.price_store import get_price_store
+from stock_analysis.registry import HistoryRegistry
+
+
+# ========== Star Rating Historical Performance ==========
+def star_performance_table_for(ticker, hist, holding_period=90, runner=None):
+    """
+    Backtest every star level on a ticker's history. runner, if given,
+    runs the backtest elsewhere (e.g. TickerPipeline.run_cpu).
+    """
+    close = hist['Close'].values
+    if runner is not None:
+        return runner(star_performance_table, close, holding_period)
+    return star_performance_table(close, holding_period)
+
+
+def calculate_star_performance(ticker, star_level, holding_period=90, hist=None, runner=None, store=None):
+    """
+    Calculate historical performance for a given star rating
+    Returns win rate, average profit/loss, VaR
+    """
+    try:
+        if hist is None:
+            hist = (store or get_price_store()).get_history(ticker, "5y")
+        table = star_performance_table_for(ticker, hist, holding_period, runner)
+        return lookup_star_performance(table, star_level)
+    except Exception as e:
+        return None
+
+
+# ========== Per-Ticker Analysis ==========
+# Freshness of the history behind a result row: refreshed within the
+# store's refresh window, or served from disk after a failed refresh
+DATA_STATUS_LABELS = {
+    'fresh': "🟢 Fresh",
+    'stale': "🟠 Stale",
+    'missing': "⚪ None",
+}
+
+
+def _record(ticker, status, **values):
+    """
+    Flat, typed result record for export
+    """
+    record = {
+        'ticker': ticker,
+        'status': status,
+        'market_date': None,
+        'current_price': None,
+        'high_52w': None,
+        'drawdown_pct': None,
+        'level': None,
+        'stars': None,
+        'action': None,
+        'signal': None,
+        'qualified': None,
+        'quality_issues': None,
+        'z_score': None,
+        'percentile': None,
+        'strength_score': None,
+        'strength': None,
+        'win_rate': None,
+        'avg_win': None,
+        'avg_loss': None,
+        'var_95': None,
+        'profit_loss_ratio': None,
+        'sample_size': None,
+        'win_rate_low': None,
+        'win_rate_high': None,
+        'profit_loss_ratio_low': None,
+        'profit_loss_ratio_high': None,
+        'var_95_low': None,
+        'var_95_high': None,
+        'data_status': None,
+        'error': None,
+    }
+    record.update(values)
+    return record
+
+
+def _interval_items(intervals):
+    if not intervals:
+        return []
+    return [(key, intervals[key]) for key in INTERVAL_STATS]
+
+
+def analyze_ticker(ticker, registry, benchmark_hist, market_data, use_improved, pipeline,
+                   star_table=None, metadata_store=None, metrics=None, precomputed=None):
+    """
+    Run every analysis stage for one ticker. Safe to call from a worker
+    thread. star_table(ticker, hist, holding_period, runner) supplies the
+    backtest table, so callers can cache it. precomputed, a snapshot's
+    {ticker: entry}, supplies the quality check, distribution and
+    backtest table when its entry was computed on the same bars. Each
+    stage is timed as a span in metrics (default: the active run).
+
+    Returns the display row, the quality row, the quant report and a flat
+    record with the raw numbers.
+    """
+    star_table = star_table or star_performance_table_for
+    metrics = metrics or active_metrics()
+    quality_row = None
+    quant_report = None
+
+    try:
+        with metrics.span('history'):
+            hist = registry.get(ticker, "1y", anchored=True)
+
+        if not hist.empty:
+            data_status = 'stale' if registry.is_stale(ticker) else 'fresh'
+            current_price = hist["Close"].iloc[-1]
+            high_52w = hist["Close"].rolling(252, min_periods=1).max().iloc[-1]
+            drawdown_pct = (high_52w - current_price) / high_52w * 100 if high_52w > 0 else 0
+
+            entry = None
+            if precomputed is not None:
+                entry = matching_entry(precomputed.get(ticker), hist)
+                metrics.increment('cache_requests', cache='snapshot', result='hit' if entry else 'miss')
+
+            with metrics.span('quality'):
+                quality_info = entry['quality'] if entry else check_stock_quality(ticker, current_price, metadata_store)
+            quality_row = {
+                'Ticker': ticker,
+                'Qualified': quality_info['qualified'],
+                'Issues': ', '.join(quality_info['issues']) if quality_info['issues'] else 'Pass',
+                'IsCore': '✓' if quality_info['is_core'] else ''
+            }
+            extra = {}
+
+            if use_improved:
+                with metrics.span('distribution'):
+                    price_dist = entry['distribution'] if entry else analyze_price_distribution(hist)
+
+                with metrics.span('relative_strength'):
+                    if benchmark_hist is not None and not benchmark_hist.empty:
+                        strength_score, strength_desc = calculate_relative_strength_score(hist, benchmark_hist)
+                    else:
+                        strength_score, strength_desc = 0, "No market data"
+
+                signal_info = get_buy_signal_improved(
+                    drawdown_pct,
+                    market_data['drawdown'] if market_data else None,
+                    quality_info,
+                    strength_score,
+                    strength_desc
+                )
+
+                try:
+                    with metrics.span('backtest'):
+                        if entry:
+                            table = entry['star_table']
+                        else:
+                            table = star_table(ticker, registry.get(ticker, "5y"), 90, pipeline.run_cpu)
+                    star_performance = lookup_star_performance(table, signal_info['level'])
+                    if star_performance:
+                        with metrics.span('bootstrap'):
+                            intervals = pipeline.run_cpu(
+                                level_intervals, ticker, round(signal_info['level']), star_performance['results']
+                            )
+                        star_performance = dict(star_performance, intervals=intervals)
+                except Exception as e:
+                    star_performance = None
+
+                with metrics.span('report'):
+                    quant_report = generate_quant_report(
+                        ticker, current_price, drawdown_pct,
+                        price_dist, strength_desc, signal_info['level'],
+                        star_performance, quality_info
+                    )
+
+                signal_display = f"{signal_info['stars']} {signal_info['action']}"
+                if signal_info['details']:
+                    signal_display += f" ({'; '.join(signal_info['details'])})"
+
+                extra = {
+                    'z_score': float(price_dist['z_score']),
+                    'percentile': float(price_dist['percentile']),
+                    'strength_score': float(strength_score),
+                    'strength': strength_desc,
+                }
+                if star_performance:
+                    extra.update({
+                        key: float(star_performance[key])
+                        for key in ('win_rate', 'avg_win', 'avg_loss', 'var_95', 'profit_loss_ratio')
+                    })
+                    extra['sample_size'] = int(star_performance['sample_size'])
+                    for key, (low, high) in _interval_items(star_performance['intervals']):
+                        extra[f'{key}_low'] = low
+                        extra[f'{key}_high'] = high
+
+            else:
+                signal_info = get_buy_signal_original(drawdown_pct / 100)
+                signal_display = f"{signal_info['stars']} {signal_info['action']}"
+
+            row = {
+                "Ticker": ticker,
+                "Current Price": f"${current_price:.2f}",
+                "52-Week High": f"${high_52w:.2f}",
+                "Drawdown": f"{drawdown_pct:.1f}%",
+                "Signal": signal_display,
+                "Data": DATA_STATUS_LABELS[data_status],
+                "Level": signal_info['level']
+            }
+            record = _record(
+                ticker, 'ok',
+                market_date=hist.index[-1].strftime('%Y-%m-%d'),
+                data_status=data_status,
+                current_price=float(current_price),
+                high_52w=float(high_52w),
+                drawdown_pct=float(drawdown_pct),
+                level=float(signal_info['level']),
+                stars=signal_info['stars'],
+                action=signal_info['action'],
+                signal=signal_display,
+                qualified=bool(quality_info['qualified']),
+                quality_issues='; '.join(quality_info['issues']),
+                **extra
+            )
+        else:
+            row = {
+                "Ticker": ticker,
+                "Current Price": "No data",
+                "52-Week High": "No data",
+                "Drawdown": "N/A",
+                "Signal": "NO DATA",
+                "Data": DATA_STATUS_LABELS['missing'],
+                "Level": -2
+            }
+            record = _record(ticker, 'no_data', level=-2.0, data_status='missing')
+
+    except Exception as e:
+        row = {
+            "Ticker": ticker,
+            "Current Price": "Error",
+            "52-Week High": "Error",
+            "Drawdown": "Error",
+            "Signal": f"ERROR",
+            "Data": "",
+            "Level": -2
+        }
+        record = _record(ticker, 'error', level=-2.0, error=str(e)[:200])
+
+    return {'row': row, 'quality': quality_row, 'report': quant_report, 'record': record}
+
+
+# ========== Batch Screen ==========
+def screen(tickers, benchmark_symbol='^GSPC', use_improved=True, market_data=None,
+           store=None, metadata_store=None, pipeline=None, refresh_metadata=True,
+           star_table=None, progress=None, snapshot=None):
+    """
+    Analyze many tickers against one benchmark.
+
+    Loads every history through one HistoryRegistry, refreshes expired
+    metadata, then runs analyze_ticker for each ticker on the pipeline.
+    With a precompute Snapshot, tickers it covers skip their quality
+    check, distribution and backtest.
+    Stages are timed in the active run metrics, or in a new run that
+    logs its summary when the screen ends.
+    Returns (analyses, registry); analyses are in ticker order.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    store = store or get_price_store()
+    metadata_store = metadata_store or get_metadata_store()
+    pipeline = pipeline or TickerPipeline()
+
+    with run_metrics(tickers=len(tickers), benchmark=benchmark_symbol,
+                     mode='quant' if use_improved else 'original') as metrics:
+        # One store lookup for every ticker plus the benchmark; only bars
+        # missing from the local store are downloaded, in batches. Every
+        # later stage slices its history from this registry.
+        registry = HistoryRegistry(store, period="5y" if use_improved else "1y")
+        with metrics.span('prefetch'):
+            registry.prefetch(tickers + [benchmark_symbol])
+
+        # Latest closes double as last prices, so the metadata refresh only
+        # calls .info for symbols whose slower-moving fields have expired
+        with metrics.span('metadata_refresh'):
+            metadata_store.update_last_prices({t: registry.latest_close(t) for t in tickers})
+            if refresh_metadata:
+                metadata_store.refresh(tickers)
+
+        precomputed = snapshot.load(tickers) if snapshot is not None else None
+
+        benchmark_hist = registry.get(benchmark_symbol, "1y")
+        if market_data is None:
+            market_data = summarize_market(benchmark_symbol, benchmark_hist)
+        if benchmark_hist.empty and market_data:
+            benchmark_hist = normalize_history(market_data['hist'])
+
+        def task(ticker):
+            with metrics.span('ticker'):
+                return analyze_ticker(
+                    ticker, registry, benchmark_hist, market_data, use_improved, pipeline,
+                    star_table=star_table, metadata_store=metadata_store, metrics=metrics,
+                    precomputed=precomputed
+                )
+
+        with metrics.span('analysis'):
+            analyses = pipeline.map(task, tickers, progress=progress)
+
+    return analyses, registry
@@ -0,0 +1,110 @@
+"""
+Single-flight coalescing of identical in-flight fetches.
+
+When several sessions ask for the same thing at the same moment (the
+benchmark index and the megacaps right after the close), only the first
+caller, the leader, does the fetch. Callers that arrive while it is in
+flight wait for it and share its result or its exception instead of
+going to the network themselves.
+
+    flights = SingleFlight('history')
+    result = flights.do(('AAPL', '2021-10-18'), fetch)
+
+Every request is counted in the run metrics as
+singleflight_requests{flight=..., result="leader"|"coalesced"}.
+"""
+import threading
+
+from stock_analysis.metrics import active_metrics
+
+
+class Flight:
+    """
+    One in-flight fetch; waiters block until the leader settles it
+    """
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def resolve(self, result):
+        self._result = result
+        self._done.set()
+
+    def fail(self, error):
+        self._error = error
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """
+        The leader's result; re-raises the leader's exception
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("In-flight fetch did not finish in time")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class SingleFlight:
+    """
+    Thread-safe table of in-flight fetches, keyed by anything hashable
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """
+        Join or start the flight for key. Returns (flight, leader): the
+        leader must settle the flight with finish() or abandon(); other
+        callers wait on it.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+        active_metrics().increment(
+            'singleflight_requests', flight=self.name, result='leader' if leader else 'coalesced'
+        )
+        return flight, leader
+
+    def finish(self, key, result=None):
+        """
+        Settle the flight for key with a result; later callers start anew
+        """
+        with self._lock:
+            flight = self._flights.pop(key)
+        flight.resolve(result)
+
+    def abandon(self, key, error):
+        """
+        Settle the flight for key with an exception
+        """
+        with self._lock:
+            flight = self._flights.pop(key)
+        flight.fail(error)
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        func(*args, **kwargs), unless the same key is already in flight, in
+        which case its result is shared
+        """
+        flight, leader = self.begin(key)
+        if not leader:
+            return flight.wait()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.abandon(key, e)
+            raise
+        self.finish(key, result)
+        return result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,188 @@
+"""
+Parameter sweep of the drawdown signal over a universe.
+
+For every cell of a grid of drawdown thresholds, holding periods and
+sampling steps, the sweep backtests "buy when the stock is at least
+`threshold`% below its 52-week high" on every symbol, with the sampling
+rules of signal_samples(). It reports the number of signals, the win rate
+and the expectancy (mean forward return) per cell.
+
+Each symbol's drawdown series and its forward returns for each holding
+period are computed once. A grid point is then a masked sum: one matrix
+product of the (thresholds x bars) signal mask with the (bars x cells)
+sample weights of every holding period and step gives all the cells'
+sums together. Chunks of symbols run on the shared process pool.
+
+    table = sweep_universe(symbols, thresholds=[10, 20, 30], holding_periods=[60, 90])
+    heatmap(table, 'win_rate', step=20)       # thresholds x holding periods
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from stock_analysis.backtest import (
+    FORWARD_BUFFER, MIN_FORWARD_BARS, MIN_WINDOW, SAMPLE_STEP, TRADING_DAYS,
+    drawdown_from_high, trailing_max,
+)
+from stock_analysis.pipeline import get_process_pool
+from stock_analysis.price_store import get_price_store
+
+SWEEP_CONFIG = {
+    'THRESHOLDS': [5, 10, 15, 20, 25, 30],
+    'HOLDING_PERIODS': [30, 60, 90, 120],
+    'STEPS': [SAMPLE_STEP],
+    # Symbols per process-pool task
+    'CHUNK_SIZE': 50,
+    # Processes for the sweep; 0 or 1 runs on the calling thread
+    'PROCESSES': int(os.environ.get('STOCK_APP_SWEEP_PROCESSES', os.cpu_count() or 1)),
+}
+
+# Sums kept per (threshold, holding period, step) cell
+_SUMS = ['signals', 'wins', 'losses', 'return_sum', 'win_sum', 'loss_sum']
+
+
+# ========== Per-Symbol Arrays ==========
+def forward_returns(close, holding_period):
+    """
+    Forward return in % from every bar over up to holding_period bars, as
+    in signal_samples(); NaN where fewer than MIN_FORWARD_BARS remain
+    """
+    n = len(close)
+    index = np.arange(n)
+    forward_len = np.minimum(holding_period, n - 1 - index)
+    returns = np.full(n, np.nan)
+    keep = forward_len > MIN_FORWARD_BARS
+    returns[keep] = (close[index[keep] + forward_len[keep]] / close[keep] - 1) * 100
+    return returns
+
+
+def sample_mask(n, step):
+    """
+    Bars checked for a signal at this step, as in signal_samples()
+    """
+    index = np.arange(n)
+    return (index % step == 0) & (index < n - FORWARD_BUFFER) & (index + 1 >= MIN_WINDOW)
+
+
+def symbol_sums(close, thresholds, holding_periods, steps):
+    """
+    (len(_SUMS) x thresholds x holding periods x steps) sums for one close
+    series without gaps
+    """
+    close = np.asarray(close, dtype=float)
+    shape = (len(_SUMS), len(thresholds), len(holding_periods), len(steps))
+    n = len(close)
+    if n < TRADING_DAYS:
+        return np.zeros(shape)
+
+    drawdown = drawdown_from_high(close, trailing_max(close, TRADING_DAYS))
+    fires = (drawdown[None, :] >= np.asarray(thresholds, dtype=float)[:, None]).astype(float)
+
+    # One column per (sum, holding period, step): the weight of every bar
+    columns = []
+    for holding_period in holding_periods:
+        returns = forward_returns(close, holding_period)
+        valid = ~np.isnan(returns)
+        returns = np.where(valid, returns, 0.0)
+        wins = returns > 0
+        losses = returns < 0
+        for step in steps:
+            sampled = sample_mask(n, step) & valid
+            columns.append(np.stack([
+                sampled,
+                sampled & wins,
+                sampled & losses,
+                np.where(sampled, returns, 0.0),
+                np.where(sampled & wins, returns, 0.0),
+                np.where(sampled & losses, returns, 0.0),
+            ], axis=1))
+    weights = np.concatenate(columns, axis=1).astype(float)
+
+    sums = fires @ weights
+    return sums.reshape(len(thresholds), len(holding_periods), len(steps), len(_SUMS)).transpose(3, 0, 1, 2)
+
+
+def _chunk_sums(args):
+    closes, thresholds, holding_periods, steps = args
+    total = np.zeros((len(_SUMS), len(thresholds), len(holding_periods), len(steps)))
+    symbols = np.zeros((len(thresholds), len(holding_periods), len(steps)))
+    for close in closes:
+        sums = symbol_sums(close, thresholds, holding_periods, steps)
+        total += sums
+        symbols += sums[0] > 0
+    return total, symbols
+
+
+# ========== Sweep ==========
+def sweep_closes(closes, thresholds=None, holding_periods=None, steps=None, processes=None, chunk_size=None):
+    """
+    Sweep a (dates x symbols) close frame. Each column runs from its first
+    to its last bar; gaps in between are forward-filled. Returns one row per
+    (threshold, holding_period, step) with the number of signals and of
+    symbols that had one, win rate, expectancy, average win and loss.
+    """
+    thresholds = list(thresholds or SWEEP_CONFIG['THRESHOLDS'])
+    holding_periods = list(holding_periods or SWEEP_CONFIG['HOLDING_PERIODS'])
+    steps = list(steps or SWEEP_CONFIG['STEPS'])
+    processes = SWEEP_CONFIG['PROCESSES'] if processes is None else processes
+    chunk_size = chunk_size or SWEEP_CONFIG['CHUNK_SIZE']
+
+    series = []
+    for column in closes.columns:
+        # Between the first and last bar only: filling past the last bar
+        # would add flat bars with 0% forward returns
+        close = closes[column]
+        close = close.loc[close.first_valid_index():close.last_valid_index()].ffill()
+        if close.notna().any():
+            series.append(close.to_numpy(dtype=float))
+
+    tasks = [
+        (series[offset:offset + chunk_size], thresholds, holding_periods, steps)
+        for offset in range(0, len(series), chunk_size)
+    ]
+    if processes > 1 and len(tasks) > 1:
+        results = list(get_process_pool(processes).map(_chunk_sums, tasks))
+    else:
+        results = [_chunk_sums(task) for task in tasks]
+
+    totals = np.zeros((len(_SUMS), len(thresholds), len(holding_periods), len(steps)))
+    symbols = np.zeros(totals.shape[1:])
+    for chunk_total, chunk_symbols in results:
+        totals += chunk_total
+        symbols += chunk_symbols
+
+    grid = pd.MultiIndex.from_product(
+        [thresholds, holding_periods, steps], names=['threshold', 'holding_period', 'step']
+    )
+    sums = {name: totals[i].ravel() for i, name in enumerate(_SUMS)}
+    signals = sums['signals']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table = pd.DataFrame({
+            'signals': signals.astype(int),
+            'symbols': symbols.ravel().astype(int),
+            'win_rate': np.where(signals > 0, sums['wins'] / signals, np.nan),
+            'expectancy': np.where(signals > 0, sums['return_sum'] / signals, np.nan),
+            'avg_win': np.where(sums['wins'] > 0, sums['win_sum'] / sums['wins'], 0.0),
+            'avg_loss': np.where(sums['losses'] > 0, sums['loss_sum'] / sums['losses'], 0.0),
+        }, index=grid)
+    return table.reset_index()
+
+
+def sweep_universe(symbols, thresholds=None, holding_periods=None, steps=None,
+                   period="5y", store=None, processes=None):
+    """
+    Load closes for a universe from the price store and sweep them.
+    Returns (table, timings).
+    """
+    closes, timings = (store or get_price_store()).get_close_matrix(symbols, period=period)
+    return sweep_closes(closes, thresholds, holding_periods, steps, processes), timings
+
+
+def heatmap(table, value='win_rate', step=None):
+    """
+    thresholds x holding periods pivot of one column for one step
+    (default: the first step in the table), ready for a heatmap
+    """
+    step = table['step'].iloc[0] if step is None else step
+    return table[table['step'] == step].pivot(index='threshold', columns='holding_period', values=value)
@@ -0,0 +1,137 @@
+"""
+Universe-scale drawdown screen over an aligned close matrix.
+
+Closes for N symbols are held in one (dates x symbols) NumPy array and
+every statistic is computed for all columns at once: 52-week high,
+drawdown, z-score, percentile and the original signal level.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from stock_analysis.analytics import get_buy_signal_original, percentile_of_score
+from stock_analysis.backtest import (
+    SIGNAL_THRESHOLDS, TRADING_DAYS, drawdown_from_high, drawdown_levels
+)
+from stock_analysis.price_store import get_price_store
+
+# get_buy_signal_original compares decimal drawdowns (0.30, 0.25, ...)
+ORIGINAL_THRESHOLDS = [(threshold / 100, level) for threshold, level in SIGNAL_THRESHOLDS]
+
+# Level -> get_buy_signal_original labels
+SIGNAL_LABELS = {
+    get_buy_signal_original(threshold)['level']: get_buy_signal_original(threshold)
+    for threshold, _ in ORIGINAL_THRESHOLDS + [(0.0, -1)]
+}
+
+# Levels of symbols that cannot be ranked: no data at all, or no bar on
+# the matrix's last date (delisted or halted)
+NO_DATA_LEVEL = -2
+STALE_LEVEL = -3
+
+SORT_COLUMNS = {
+    'drawdown': ('drawdown_pct', False),
+    'level': ('level', False),
+    'z_score': ('z_score', True),
+    'ticker': ('ticker', True),
+}
+
+
+# ========== Matrix Helpers ==========
+def last_valid_rows(matrix):
+    """
+    Row of each column's last valid value; -1 for all-NaN columns
+    """
+    valid = ~np.isnan(np.asarray(matrix, dtype=float))
+    last = valid.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+    return np.where(valid.any(axis=0), last, -1)
+
+
+def forward_fill(matrix):
+    """
+    Carry the last valid value of each column down over interior NaN
+    gaps. Leading NaN (before a symbol's first bar) and trailing NaN
+    (after its last bar) stay NaN, so a symbol that stopped trading does
+    not look current.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    rows = np.arange(matrix.shape[0])[:, None]
+    last_valid = np.where(np.isnan(matrix), 0, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    filled = matrix[last_valid, np.arange(matrix.shape[1])]
+    filled[rows > last_valid_rows(matrix)] = np.nan
+    return filled
+
+
+# ========== Universe Screen ==========
+def screen_matrix(closes, symbols=None, window=TRADING_DAYS, sort_by='drawdown'):
+    """
+    Rank every column of a (dates x symbols) close matrix.
+
+    The 52-week high is the max of the last `window` rows. Z-score and
+    percentile use every row, like analyze_price_distribution on the same
+    history. Levels follow get_buy_signal_original. Symbols without any
+    data get level NO_DATA_LEVEL, and symbols whose last bar is older
+    than the matrix's last row level STALE_LEVEL; neither is ranked as a
+    signal, and both sort last.
+
+    closes may be a DataFrame (columns are the symbols) or an ndarray
+    with `symbols` given separately. Returns a ranked DataFrame.
+    """
+    if isinstance(closes, pd.DataFrame):
+        symbols = list(closes.columns) if symbols is None else list(symbols)
+        closes = closes.to_numpy(dtype=float)
+    closes = np.asarray(closes, dtype=float)
+    if closes.shape[0] == 0:
+        # No bars at all: every symbol is ranked as having no data
+        closes = np.full((1, closes.shape[1]), np.nan)
+    matrix = forward_fill(closes)
+    last_rows = last_valid_rows(closes)
+    symbols = list(symbols) if symbols is not None else list(range(matrix.shape[1]))
+
+    # All-NaN columns (symbols without data) warn in nanmax/nanmean
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        current = matrix[-1]
+        high_52w = np.nanmax(matrix[-window:], axis=0)
+        mean = np.nanmean(matrix, axis=0)
+        std = np.nanstd(matrix, axis=0)
+        z_score = np.where(std > 0, (current - mean) / std, 0.0)
+
+    drawdown_pct = drawdown_from_high(current, high_52w)
+    percentile = percentile_of_score(matrix, current)
+    has_data = ~np.isnan(current)
+    stale = (last_rows >= 0) & (last_rows < matrix.shape[0] - 1)
+
+    levels = drawdown_levels(drawdown_pct / 100, ORIGINAL_THRESHOLDS).astype(int)
+    levels = np.where(has_data, levels, np.where(stale, STALE_LEVEL, NO_DATA_LEVEL))
+    labels = {STALE_LEVEL: 'STALE', NO_DATA_LEVEL: 'NO DATA'}
+
+    table = pd.DataFrame({
+        'ticker': symbols,
+        'current_price': current,
+        'high_52w': high_52w,
+        'drawdown_pct': np.where(has_data, drawdown_pct, np.nan),
+        'z_score': np.where(has_data, z_score, np.nan),
+        'percentile': np.where(has_data, percentile, np.nan),
+        'level': levels,
+        'stars': [SIGNAL_LABELS.get(level, {}).get('stars', '') for level in levels],
+        'action': [SIGNAL_LABELS.get(level, {}).get('action', labels.get(level)) for level in levels],
+        'bars': np.sum(~np.isnan(closes), axis=0),
+        'stale': stale,
+    })
+
+    column, ascending = SORT_COLUMNS[sort_by]
+    table = table.sort_values(column, ascending=ascending, na_position='last', kind='stable')
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+
+def screen_universe(symbols, period="1y", store=None, sort_by='drawdown'):
+    """
+    Load closes for a whole universe from the price store and rank them.
+    Returns (table, timings).
+    """
+    closes, timings = (store or get_price_store()).get_close_matrix(symbols, period=period)
+    return screen_matrix(closes, sort_by=sort_by), timings
@@ -0,0 +1,200 @@
+"""
+Per-user watchlists in one SQLite database.
+
+Adding and removing tickers are single transactions, so two browser tabs
+of the same user no longer overwrite each other's changes. Lookups by
+user and by ticker use indexes, and the per-user counts come from one
+aggregate query.
+
+The watchlist_{username}.json files written by earlier versions are
+imported the first time a store is opened; the files are left in place
+and are not read again.
+
+    store = get_watchlist_store()
+    store.add('alice', ['NVDA', 'AMD'])
+    store.get('alice')        # ['NVDA', 'AMD'], in the order added
+    store.users()             # [('alice', 2), ...]
+"""
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_DB_PATH = os.environ.get('STOCK_APP_WATCHLIST_DB', 'watchlists.db')
+
+# Where the legacy watchlist_*.json files are looked for
+JSON_DIR = os.environ.get('STOCK_APP_WATCHLIST_DIR', '.')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watchlists (
+    username TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    added_at REAL NOT NULL,
+    PRIMARY KEY (username, ticker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS watchlists_by_ticker ON watchlists (ticker);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Appends after the user's last position in the same statement, so
+# concurrent adds cannot hand out one position twice
+_INSERT = """
+INSERT OR IGNORE INTO watchlists (username, ticker, position, added_at)
+VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM watchlists WHERE username = ?), ?)
+"""
+
+
+def normalize_tickers(tickers):
+    """
+    Upper-cased, stripped tickers without blanks or repeats, in order
+    """
+    return list(dict.fromkeys(str(t).strip().upper() for t in tickers if str(t).strip()))
+
+
+class WatchlistStore:
+    """
+    Watchlists of every user. Safe to share between Streamlit sessions
+    and processes: every call opens its own connection and each write is
+    one transaction.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---------- Writes ----------
+    def add(self, username, tickers):
+        """
+        Append tickers to the user's watchlist; returns the ones that
+        were not on it yet
+        """
+        tickers = normalize_tickers(tickers)
+        now = time.time()
+        with self._write_lock, self._connect() as conn:
+            added = []
+            for ticker in tickers:
+                if conn.execute(_INSERT, (username, ticker, username, now)).rowcount:
+                    added.append(ticker)
+        return added
+
+    def remove(self, username, tickers):
+        """
+        Remove tickers from the user's watchlist; returns how many were on it
+        """
+        tickers = normalize_tickers(tickers)
+        with self._write_lock, self._connect() as conn:
+            return conn.executemany(
+                "DELETE FROM watchlists WHERE username = ? AND ticker = ?",
+                [(username, ticker) for ticker in tickers]
+            ).rowcount
+
+    def clear(self, username):
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM watchlists WHERE username = ?", (username,))
+
+    def migrate_json(self, directory=None):
+        """
+        Import every watchlist_*.json in directory, once per database.
+        Users that already have a stored watchlist keep it. Returns
+        {username: tickers imported}; unreadable files map to None.
+        """
+        directory = directory or JSON_DIR
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return {}
+
+        imported = {}
+        for path in sorted(glob.glob(os.path.join(directory, 'watchlist_*.json'))):
+            username = os.path.basename(path)[len('watchlist_'):-len('.json')]
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                imported[username] = None
+                continue
+            if not isinstance(data, list):
+                imported[username] = None
+                continue
+            imported[username] = 0 if self.get(username) else len(self.add(username, data))
+
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (json.dumps({'at': time.time(), 'directory': os.path.abspath(directory)}),)
+            )
+        return imported
+
+    # ---------- Queries ----------
+    def get(self, username):
+        """
+        The user's tickers in the order they were added ([] when none)
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ticker FROM watchlists WHERE username = ? ORDER BY position", (username,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def users(self):
+        """
+        (username, number of tickers) for every user with a watchlist
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT username, COUNT(*) FROM watchlists GROUP BY username ORDER BY username"
+            ).fetchall()
+
+    def users_watching(self, ticker):
+        """
+        Users whose watchlist contains ticker
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT username FROM watchlists WHERE ticker = ? ORDER BY username",
+                (str(ticker).strip().upper(),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def all_tickers(self):
+        """
+        Sorted union of every user's tickers
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT DISTINCT ticker FROM watchlists ORDER BY ticker").fetchall()
+        return [row[0] for row in rows]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_watchlist_store():
+    """
+    Process-wide store at DEFAULT_DB_PATH, with the legacy JSON files
+    imported on first use
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = WatchlistStore()
+            _default_store.migrate_json()
+        return _default_store
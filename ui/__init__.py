@@ -0,0 +1,5 @@
+"""
+Streamlit user interface for app.py, split by page section. Heavy
+modules (matplotlib, the analysis pipeline) are only imported by the
+sections that need them.
+"""
@@ -0,0 +1,212 @@
+"""
+Analysis page: runs the screen for the selected stocks and shows the
+results table, quant reports, charts and downloads
+"""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from stock_analysis.charts import get_chart_cache
+from stock_analysis.metrics import run_metrics
+from stock_analysis.precompute import open_snapshot
+from stock_analysis.resilience import get_request_guard
+from ui.charts import render_price_charts
+from ui.data import results_store, cached_screen
+from ui.debug import render_debug_panel
+from ui.live import render_live_board
+
+
+def render_analysis():
+    """
+    Analyze st.session_state.selected_stocks and render the results, with
+    the run's metrics in the debug panel when it is enabled
+    """
+    with run_metrics(
+        tickers=len(st.session_state.selected_stocks),
+        user=st.session_state.username,
+        mode='quant' if st.session_state.get('use_improved', True) else 'original'
+    ) as metrics:
+        _render_results()
+
+    if st.session_state.get('debug_panel', False):
+        render_debug_panel(metrics)
+
+
+def _render_results():
+    st.header(f"📊 Analyzing {len(st.session_state.selected_stocks)} Stocks")
+
+    market_data = st.session_state.get('market_data', None)
+
+    if market_data:
+        st.caption(f"📊 Benchmark Index: **{market_data['name']}** (52W Drawdown: {market_data['drawdown']:.1f}%)")
+
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+
+    results = []
+    quality_results = []
+
+    use_improved = st.session_state.get('use_improved', True)
+    benchmark_symbol = st.session_state.get('selected_index', '^GSPC')
+    status_text.text(f"Fetching data for {len(st.session_state.selected_stocks)} stocks...")
+
+    # Tonight's precomputed results, if the nightly job has run
+    snapshot = open_snapshot()
+
+    def show_progress(done, total, ticker):
+        progress_bar.progress(done / total)
+        status_text.text(f"Analyzed {ticker} ({done}/{total})")
+
+    # Sorting, expanders and downloads rerun the page; the screen itself
+    # only runs again when its inputs or the market date change
+    analyses, registry, reused = cached_screen(
+        st.session_state.selected_stocks,
+        benchmark_symbol,
+        use_improved,
+        market_data=market_data,
+        progress=show_progress,
+        snapshot=snapshot
+    )
+
+    for ticker, analysis in zip(st.session_state.selected_stocks, analyses):
+        results.append(analysis['row'])
+        if analysis['quality']:
+            quality_results.append(analysis['quality'])
+        if analysis['report']:
+            st.session_state[f"report_{ticker}"] = analysis['report']
+
+    progress_bar.empty()
+    status_text.empty()
+
+    if st.session_state.get('use_improved', True) and quality_results:
+        with st.expander("🔍 Stock Quality Check Details", expanded=False):
+            quality_df = pd.DataFrame(quality_results)
+
+            def color_qualified(val):
+                if val == True:
+                    return 'background-color: #90EE90'
+                elif val == False:
+                    return 'background-color: #FFB6C1'
+                return ''
+
+            styled_df = quality_df.style.map(color_qualified, subset=['Qualified'])
+            st.dataframe(styled_df, use_container_width=True)
+
+    stale = registry.stale_symbols()
+    if stale:
+        breaker = get_request_guard().breaker
+        reason = (
+            f"Yahoo Finance requests are paused for {breaker.seconds_until_retry():.0f}s after repeated failures"
+            if breaker.state != breaker.CLOSED else "Yahoo Finance did not answer"
+        )
+        st.warning(f"⚠️ {reason}; showing stored data for {', '.join(stale)} (marked 🟠 Stale).")
+
+    if results:
+        st.subheader("Analysis Results")
+        df = pd.DataFrame(results)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            sort_by = st.selectbox(
+                "Sort by:",
+                ["Drawdown (Desc)", "Level (Desc)", "Ticker (Asc)"]
+            )
+
+        if sort_by == "Drawdown (Desc)":
+            def get_drawdown_value(val):
+                if val == "N/A" or val == "Error":
+                    return -999
+                try:
+                    return float(val.rstrip('%'))
+                except:
+                    return -999
+
+            df['drawdown_num'] = df['Drawdown'].apply(get_drawdown_value)
+            df = df.sort_values('drawdown_num', ascending=False)
+            df = df.drop('drawdown_num', axis=1)
+        elif sort_by == "Level (Desc)":
+            df = df.sort_values('Level', ascending=False)
+        else:
+            df = df.sort_values('Ticker')
+
+        st.dataframe(df[["Ticker", "Current Price", "52-Week High", "Drawdown", "Signal", "Data"]], 
+                    use_container_width=True)
+
+        if st.session_state.get('use_improved', True):
+            st.subheader("📈 Quantitative Decision Reports")
+
+            for ticker in st.session_state.selected_stocks:
+                report_key = f"report_{ticker}"
+                if report_key in st.session_state:
+                    with st.expander(f"📊 {ticker} - Quantitative Analysis", expanded=True):
+                        st.markdown(f"```\n{st.session_state[report_key]}\n```")
+
+        if st.session_state.get('live_mode', False):
+            render_live_board(analyses, registry, benchmark_symbol, use_improved)
+
+        render_price_charts(st.session_state.selected_stocks, registry)
+
+        with st.expander("⏱️ Data Fetch Timings", expanded=False):
+            if reused:
+                st.caption("Results reused from an earlier run with the same stocks, benchmark, strategy and market date")
+            st.dataframe(pd.DataFrame(registry.timings), use_container_width=True)
+            registry_stats = registry.stats()
+            st.caption(
+                f"History registry: {registry_stats['symbols']} symbols, "
+                f"{registry_stats['symbol_fetches']} symbol fetches in {registry_stats['store_calls']} store call(s), "
+                f"{registry_stats['hits']}/{registry_stats['requests']} slices served from memory, "
+                f"duplicate fetches: {', '.join(registry.duplicate_fetches()) or 'none'}"
+            )
+            if snapshot is not None:
+                snapshot_status = snapshot.status()
+                st.caption(
+                    f"Precomputed snapshot `{snapshot.path}`: {snapshot_status['done']}/{snapshot_status['total']} "
+                    f"tickers{'' if snapshot_status['finished_at'] else ' (job still running)'}"
+                )
+            chart_stats = get_chart_cache().stats()
+            st.caption(
+                f"Chart cache: {chart_stats['entries']} images ({chart_stats['bytes'] / 1024:.0f} KB), "
+                f"{chart_stats['hits']} hits, {chart_stats['misses']} misses, {chart_stats['evictions']} evictions"
+            )
+
+        st.subheader("💾 Download Results")
+        display_df = df[["Ticker", "Current Price", "52-Week High", "Drawdown", "Signal", "Data"]].copy()
+
+        download_df = df[["Ticker", "Current Price", "52-Week High", "Drawdown"]].copy()
+        download_df["Signal"] = df["Signal"].str.replace(r'[⭐★⚪⚫]', '', regex=True).str.strip()
+        download_df["Data"] = df["Data"].str.replace(r'[🟢🟠⚪]', '', regex=True).str.strip()
+
+        csv = download_df.to_csv(index=False).encode("utf-8-sig")
+
+        run_id, created = results_store.append(
+            st.session_state.username,
+            [analysis['record'] for analysis in analyses],
+            benchmark=benchmark_symbol,
+            mode='quant' if use_improved else 'original'
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Download CSV",
+                data=csv,
+                file_name=f"stock_analysis_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+        with col2:
+            if created:
+                st.info(f"Results saved as run `{run_id}`")
+            else:
+                st.info(f"Results unchanged since run `{run_id}`")
+
+        with st.expander("📜 Signal History", expanded=False):
+            history_ticker = st.selectbox("Ticker:", st.session_state.selected_stocks, key="history_ticker")
+            history_df = results_store.signal_history(history_ticker, days=90)
+            if history_df.empty:
+                st.caption(f"No saved results for {history_ticker} in the last 90 days")
+            else:
+                st.dataframe(history_df, use_container_width=True)
+
+        st.subheader("Current Analysis")
+        st.dataframe(display_df, use_container_width=True)
@@ -0,0 +1,39 @@
+"""
+Price charts for the analyzed stocks. Images come from the process-wide
+chart cache, so a rerun only redraws charts whose data changed.
+"""
+import streamlit as st
+
+from stock_analysis.charts import get_chart_cache
+
+
+def render_price_charts(tickers, registry):
+    """
+    6-month price charts with statistical bands for every ticker, sliced
+    from the run's history registry
+    """
+    st.subheader("Price Charts")
+    chart_cache = get_chart_cache()
+
+    charts = []
+    for ticker in tickers:
+        try:
+            hist = registry.get(ticker, "6mo")
+            if not hist.empty:
+                charts.append((ticker, hist))
+        except:
+            pass
+
+    layout = 'detailed' if len(charts) == 1 else 'compact'
+    cols = st.columns(2) if len(charts) > 1 else None
+    for i, (ticker, hist) in enumerate(charts):
+        try:
+            image = chart_cache.chart(ticker, hist, layout=layout)
+        except:
+            continue
+        if cols is None:
+            st.subheader(f"{ticker}")
+            st.image(image)
+        else:
+            with cols[i % 2]:
+                st.image(image)
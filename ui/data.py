@@ -0,0 +1,113 @@
+"""
+Stores and cached data loaders shared by the pages
+"""
+import logging
+
+import streamlit as st
+
+from stock_analysis.analytics import summarize_market
+from stock_analysis.benchmark_fit import fit_benchmarks
+from stock_analysis.cache import get_cache
+from stock_analysis.metadata import get_metadata_store
+from stock_analysis.precompute import market_date
+from stock_analysis.price_store import get_price_store, REFRESH_SECONDS
+from stock_analysis.registry import HistoryRegistry
+from stock_analysis.results_store import get_results_store
+from stock_analysis.screener import screen, star_performance_table_for
+
+price_store = get_price_store()
+metadata_store = get_metadata_store()
+results_store = get_results_store()
+
+# One JSON line per analysis run in the server log
+_metrics_logger = logging.getLogger('stock_analysis.metrics')
+if not _metrics_logger.handlers:
+    _metrics_logger.addHandler(logging.StreamHandler())
+    _metrics_logger.setLevel(logging.INFO)
+    _metrics_logger.propagate = False
+
+
+# Results shared by every session. Keys hold only what a result depends
+# on: the benchmark summary is refreshed hourly, a backtest table depends
+# on the ticker, its last bar and the holding period, and a whole screen
+# on its inputs and the market date. Screens and benchmark fits also
+# expire when the price store would refresh their bars.
+market_data_cache = get_cache('market_data', max_entries=64, ttl=3600)
+star_performance_cache = get_cache('star_performance', ttl=86400)
+analysis_cache = get_cache('analysis', max_entries=32, ttl=REFRESH_SECONDS)
+benchmark_fit_cache = get_cache('benchmark_fit', max_entries=64, ttl=REFRESH_SECONDS)
+
+
+# ========== Get Market Data ==========
+def get_market_data(index_symbol):
+    """
+    Get 52-week data for specified index
+    """
+    def load():
+        hist = price_store.get_history(index_symbol, "1y")
+        return summarize_market(index_symbol, hist)
+
+    try:
+        return market_data_cache.get_or_compute(index_symbol, load)
+    except Exception as e:
+        st.sidebar.warning(f"Unable to get {index_symbol} data: {str(e)}")
+        return None
+
+
+# ========== Benchmark Fit ==========
+def get_benchmark_fits(tickers):
+    """
+    Beta, correlation, R² and relative strength of tickers against every
+    index, from one batched load of all their histories
+    """
+    def load():
+        return fit_benchmarks(tickers, HistoryRegistry(price_store, period="1y"))
+
+    try:
+        key = (tuple(sorted(tickers)), market_date().strftime('%Y-%m-%d'))
+        return benchmark_fit_cache.get_or_compute(key, load)
+    except Exception as e:
+        st.sidebar.warning(f"Unable to compare with all indices: {str(e)}")
+        return None
+
+
+# ========== Star Rating Historical Performance ==========
+def cached_star_performance_table(ticker, hist, holding_period=90, runner=None):
+    """
+    star_table hook for screen(): backtests every star level once per
+    ticker, last bar date and holding period, shared by all sessions
+    """
+    last_date = hist.index[-1].strftime('%Y-%m-%d') if not hist.empty else None
+    return star_performance_cache.get_or_compute(
+        (ticker, last_date, holding_period),
+        star_performance_table_for, ticker, hist, holding_period, runner
+    )
+
+
+# ========== Screen Results ==========
+def cached_screen(tickers, benchmark_symbol, use_improved, market_data=None, progress=None, snapshot=None):
+    """
+    screen() with the stores above, memoized on (tickers, benchmark,
+    strategy mode, market date), so reruns caused by sorting, expanders
+    or downloads reuse the results. progress is only called when the
+    screen actually runs. Returns (analyses, registry, reused).
+    """
+    key = (tuple(tickers), benchmark_symbol, bool(use_improved), market_date().strftime('%Y-%m-%d'))
+    ran = []
+
+    def run():
+        ran.append(True)
+        return screen(
+            list(tickers),
+            benchmark_symbol=benchmark_symbol,
+            use_improved=use_improved,
+            market_data=market_data,
+            store=price_store,
+            metadata_store=metadata_store,
+            star_table=cached_star_performance_table,
+            progress=progress,
+            snapshot=snapshot
+        )
+
+    analyses, registry = analysis_cache.get_or_compute(key, run)
+    return analyses, registry, not ran
@@ -0,0 +1,94 @@
+"""
+Debug panel: where the time of an analysis run went
+"""
+import json
+
+import pandas as pd
+import streamlit as st
+
+from stock_analysis.cache import budget_stats, cache_stats
+from stock_analysis.metrics import get_metrics
+
+
+def render_debug_panel(metrics):
+    """
+    Stage timings, cache hit rates and Yahoo requests of one run, the
+    memory held by the shared caches, and the process-wide metrics in
+    Prometheus text format
+    """
+    summary = metrics.summary()
+
+    with st.expander("🐞 Debug: Run Metrics", expanded=True):
+        st.caption(f"Run {summary['run_id']}: {summary['seconds']:.2f}s")
+
+        stages = pd.DataFrame(metrics.stage_table())
+        if not stages.empty:
+            st.dataframe(stages.round(2), use_container_width=True, hide_index=True)
+
+        cache_rows = [
+            {
+                'cache': cache,
+                'hits': counts['hits'],
+                'misses': counts['misses'],
+                'hit rate': f"{counts['hits'] / (counts['hits'] + counts['misses']):.0%}"
+                            if counts['hits'] + counts['misses'] else "-"
+            }
+            for cache, counts in sorted(summary['caches'].items())
+        ]
+        if cache_rows:
+            st.dataframe(pd.DataFrame(cache_rows), use_container_width=True, hide_index=True)
+
+        memory_rows = [
+            {
+                'shared cache': stats['cache'],
+                'entries': f"{stats['entries']}/{stats['max_entries']}",
+                'memory MB': stats['bytes'] / 1024 / 1024,
+                'limit MB': stats['max_bytes'] / 1024 / 1024 if stats['max_bytes'] else None,
+                'evictions': stats['evictions'],
+                'expirations': stats['expirations'],
+            }
+            for stats in cache_stats()
+        ]
+        if memory_rows:
+            budget = budget_stats()
+            st.caption(
+                f"Shared caches: {budget['bytes'] / 1024 / 1024:.1f} of "
+                f"{budget['total_bytes'] / 1024 / 1024:.0f} MB"
+            )
+            st.dataframe(pd.DataFrame(memory_rows).round(2), use_container_width=True, hide_index=True)
+
+        yahoo_rows = [
+            {
+                'request': kind,
+                'ok': counts['ok'],
+                'errors': counts['error'],
+                'p50 ms': summary['yahoo_latency'].get(kind, {}).get('p50', 0) * 1000,
+                'p99 ms': summary['yahoo_latency'].get(kind, {}).get('p99', 0) * 1000,
+            }
+            for kind, counts in sorted(summary['yahoo_requests'].items())
+        ]
+        if yahoo_rows:
+            st.dataframe(pd.DataFrame(yahoo_rows).round(1), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No Yahoo Finance requests in this run")
+
+        coalesced = {
+            flight: counts['coalesced']
+            for flight, counts in sorted(summary['coalesced_requests'].items()) if counts['coalesced']
+        }
+        if coalesced:
+            st.caption("Fetches shared with other sessions: " +
+                       ", ".join(f"{flight} {count}" for flight, count in coalesced.items()))
+
+        st.caption("JSON log line")
+        st.code(json.dumps(summary, default=str), language='json')
+
+        prometheus_text = get_metrics().prometheus()
+        st.caption("Process metrics (Prometheus text format)")
+        st.code(prometheus_text, language='text')
+        st.download_button(
+            label="📥 Download metrics",
+            data=prometheus_text,
+            file_name="stock_app_metrics.prom",
+            mime="text/plain"
+        )
@@ -0,0 +1,72 @@
+"""
+Live intraday table: follows quotes for the analyzed stocks and updates
+only the rows that changed, on a fixed cadence
+"""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from stock_analysis.live import LIVE_CONFIG, LiveBoard, make_tick_source
+
+# st.fragment reruns just the live table on a timer (Streamlit 1.37+);
+# with older versions the table refreshes along with the page
+_fragment = getattr(st, 'fragment', None)
+
+
+def _every(seconds):
+    if _fragment is None:
+        return lambda func: func
+    return _fragment(run_every=seconds)
+
+
+def render_live_board(analyses, registry, benchmark_symbol, use_improved):
+    """
+    Live table for a finished screen. The board, its tick source and the
+    displayed table live in the session and are rebuilt only when the
+    analyzed stocks, benchmark or signal system change.
+    """
+    key = (tuple(a['record']['ticker'] for a in analyses), benchmark_symbol, use_improved)
+    if st.session_state.get('live_key') != key:
+        board = LiveBoard.from_screen(analyses, registry, benchmark_symbol, use_improved)
+        st.session_state.live_board = board
+        st.session_state.live_source = make_tick_source(board.symbols())
+        st.session_state.live_table = board.table()
+        st.session_state.live_key = key
+
+    st.subheader("📡 Live Quotes")
+    _render_live_table()
+
+
+@_every(LIVE_CONFIG['REFRESH_SECONDS'])
+def _render_live_table():
+    board = st.session_state.live_board
+    source = st.session_state.live_source
+    table = st.session_state.live_table
+
+    try:
+        ticks = source.poll()
+    except Exception as e:
+        st.caption(f"⚠️ Quotes unavailable: {str(e)[:100]}")
+        ticks = []
+
+    changed = board.apply(ticks)
+    for ticker in changed:
+        table.loc[ticker] = pd.Series(board.rows[ticker])
+
+    def highlight_changed(row):
+        return ['background-color: #FFF3B0' if row.name in changed else ''] * len(row)
+
+    if table.empty:
+        st.info("No stocks with data to follow")
+        return
+
+    st.dataframe(
+        table.drop(columns=["Level"]).style.apply(highlight_changed, axis=1),
+        use_container_width=True, hide_index=True
+    )
+    st.caption(
+        f"{len(ticks)} quote(s), {len(changed)} row(s) changed at {datetime.now().strftime('%H:%M:%S')}; "
+        f"refreshes every {LIVE_CONFIG['REFRESH_SECONDS']}s"
+        + (" (tick replay finished)" if source.exhausted else "")
+    )
@@ -0,0 +1,216 @@
+"""
+Sidebar: user profile, watchlist, benchmark index and strategy selection
+"""
+import os
+import time
+
+import streamlit as st
+
+from stock_analysis.analytics import get_recommended_index, get_index_name
+from stock_analysis.benchmark_fit import recommend_benchmark
+from stock_analysis.config import SECTOR_INDICES
+from ui.data import get_market_data, get_benchmark_fits
+from ui.state import load_watchlist, add_to_watchlist, remove_from_watchlist, delete_watchlist
+
+DEBUG_DEFAULT = os.environ.get('STOCK_APP_DEBUG', '') not in ('', '0')
+
+
+def render_sidebar():
+    """
+    Draw the control panel and store the user's choices in session state
+    """
+    with st.sidebar:
+        st.header("⚙️ Control Panel")
+    
+        st.subheader("👤 User Profile")
+        username = st.text_input(
+            "Username:",
+            value=st.session_state.username,
+            key="username_input"
+        )
+    
+        if st.button("Switch User", type="secondary"):
+            st.session_state.username = username
+            st.session_state.watchlist = load_watchlist(username)
+            st.session_state.selected_stocks = []
+            st.rerun()
+    
+        st.divider()
+    
+        st.subheader("Add Stocks")
+        new_stocks = st.text_input(
+            "Enter stock symbols (comma separated)",
+            placeholder="Example: MSFT, AMZN, META"
+        )
+    
+        if st.button("Add to Watchlist", type="primary"):
+            if new_stocks:
+                stocks = [s.strip().upper() for s in new_stocks.split(",") if s.strip()]
+                added, st.session_state.watchlist = add_to_watchlist(
+                    st.session_state.username, stocks, unsaved=st.session_state.watchlist
+                )
+                added_count = len(added)
+            
+                if added_count > 0:
+                    st.success(f"✅ Successfully added {added_count} stock(s)! Total: {len(st.session_state.watchlist)} stocks")
+                    time.sleep(0.5)
+                    st.rerun()
+                else:
+                    st.info("These stocks are already in your watchlist")
+    
+        st.divider()
+    
+        st.subheader("📋 Your Watchlist")
+        if st.session_state.watchlist:
+            selected = st.multiselect(
+                "Select stocks to analyze",
+                st.session_state.watchlist
+            )
+            st.session_state.selected_stocks = selected
+        
+            if st.button("🚀 Start Analysis", type="primary"):
+                st.rerun()
+        
+            if selected and st.button("Remove Selected"):
+                st.session_state.watchlist = remove_from_watchlist(
+                    st.session_state.username, selected, unsaved=st.session_state.watchlist
+                )
+                st.session_state.selected_stocks = []
+                st.rerun()
+        
+            if st.button("Clear Watchlist"):
+                st.session_state.watchlist = []
+                delete_watchlist(st.session_state.username)
+                st.success("Watchlist cleared!")
+                time.sleep(0.5)
+                st.rerun()
+        else:
+            st.info("Your watchlist is empty. Add stocks above.")
+    
+        st.divider()
+    
+        # ========== Market Index Selection ==========
+        st.subheader("📊 Market Index Selection")
+    
+        fits = get_benchmark_fits(st.session_state.selected_stocks) if st.session_state.selected_stocks else None
+        recommended = None
+        if st.session_state.selected_stocks:
+            current_ticker = st.session_state.selected_stocks[0]
+            if fits is not None:
+                recommended = recommend_benchmark(current_ticker, fits)
+            else:
+                recommended = get_recommended_index(current_ticker)
+            recommended_name = get_index_name(recommended)
+            st.info(f"Based on {current_ticker}, recommended: **{recommended_name}**")
+    
+        selected_index = st.selectbox(
+            "Choose benchmark index:",
+            options=list(SECTOR_INDICES.keys()),
+            index=0,
+            help="Select the index for market comparison. System auto-recommends based on stock, but you can override."
+        )
+    
+        index_symbol = SECTOR_INDICES[selected_index]
+    
+        market_data = get_market_data(index_symbol)
+        if market_data:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric(
+                    "Index",
+                    market_data['name']
+                )
+            with col2:
+                st.metric(
+                    "52W Drawdown",
+                    f"{market_data['drawdown']:.1f}%",
+                    delta=f"{market_data['current_price']:.0f}"
+                )
+        
+            if recommended:
+                if index_symbol != recommended:
+                    recommended_name = get_index_name(recommended)
+                    st.caption(f"⚠️ Current selection differs from system recommendation ({recommended_name})")
+        else:
+            st.info("Selected index data unavailable")
+    
+        st.session_state.selected_index = index_symbol
+        st.session_state.market_data = market_data
+
+        if fits is not None and not fits.empty:
+            with st.expander("📐 Relative Strength vs All Indices", expanded=False):
+                fit_table = fits.sort_values(['ticker', 'r_squared'], ascending=[True, False])
+                st.dataframe(
+                    fit_table[['ticker', 'name', 'r_squared', 'beta', 'correlation', 'excess_z', 'significance']]
+                    .rename(columns={'ticker': 'Ticker', 'name': 'Index', 'r_squared': 'R²', 'beta': 'Beta',
+                                     'correlation': 'Corr', 'excess_z': 'Excess Z', 'significance': 'Strength'})
+                    .round(2),
+                    use_container_width=True, hide_index=True
+                )
+                st.caption("1-year daily returns; the recommended index has the highest R²")
+    
+        st.divider()
+    
+        # ========== Index Guide ==========
+        with st.expander("📚 Sector Index Guide", expanded=False):
+            st.markdown("""
+            **Major Indices:**
+            - ^GSPC: S&P 500 (Broad Market)
+            - ^NDX: NASDAQ 100 (Tech Heavy)
+            - ^DJI: Dow Jones (Blue Chip)
+        
+            **Sector ETFs:**
+            - XLK: Technology
+            - SOXX: Semiconductors
+            - XLF: Financials
+            - XLV: Healthcare
+            - XLE: Energy
+            - XLP: Consumer Staples
+            - XLC: Communication
+            - XLI: Industrials
+            - XLB: Materials
+            - XLRE: Real Estate
+        
+            **Auto-Recommendation Logic:**
+            - The index whose daily returns explain the stock best (highest R²)
+            - Without enough history: Tech Giants → NASDAQ 100,
+              Semiconductors → SOXX, Financials → XLF, Energy → XLE,
+              Healthcare → XLV, Default → S&P 500
+            """)
+    
+        st.divider()
+    
+        # ========== Strategy Selection ==========
+        st.subheader("📖 Investment Strategy")
+        use_improved = st.checkbox("✨ Use Quantitative Decision System", value=True, 
+                                   help="Enable probability statistics, VaR, and confidence interval analysis")
+    
+        if use_improved:
+            st.markdown("""
+            **Quantitative Framework:**
+            - 📊 **Price Distribution**: Z-score, percentile
+            - 📈 **Win Rate**: Historical probability
+            - 🛡️ **Risk Metrics**: 95% VaR
+            - ⚖️ **Risk-Reward**: P/L ratio
+            """)
+        else:
+            st.markdown("""
+            **Original Signals:**
+            - ⭐⭐⭐⭐⭐ 30%+ = STRONG BUY
+            - ⭐⭐⭐⭐ 25%+ = AGGRESSIVE BUY  
+            - ⭐⭐⭐ 20%+ = BUY
+            - ⭐⭐ 15%+ = CONSIDER
+            - ⭐ 10%+ = WATCH
+            """)
+    
+        st.session_state.use_improved = use_improved
+
+        st.divider()
+        st.session_state.live_mode = st.checkbox(
+            "📡 Live intraday mode", value=st.session_state.get('live_mode', False),
+            help="Follow intraday quotes for the analyzed stocks and update the changed rows"
+        )
+        st.session_state.debug_panel = st.checkbox(
+            "🐞 Show debug panel", value=st.session_state.get('debug_panel', DEBUG_DEFAULT),
+            help="Per-stage timings, cache hit rates and Yahoo requests for each run"
+        )
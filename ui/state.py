@@ -0,0 +1,65 @@
+"""
+Session state setup and the per-user watchlists
+"""
+import streamlit as st
+
+from stock_analysis.watchlist_store import get_watchlist_store
+
+DEFAULT_WATCHLIST = ["AAPL", "TSLA", "NVDA", "GOOGL"]
+
+watchlist_store = get_watchlist_store()
+
+
+def load_watchlist(username, default=None):
+    """
+    A user's saved watchlist, or a copy of default when there is none
+    """
+    return watchlist_store.get(username) or list(default or [])
+
+
+def add_to_watchlist(username, stocks, unsaved=None):
+    """
+    Add stocks to the user's saved watchlist; unsaved, the list shown
+    before anything was saved (the defaults), is saved first. Returns
+    the stocks that were added and the saved watchlist.
+    """
+    if unsaved and not watchlist_store.get(username):
+        watchlist_store.add(username, unsaved)
+    added = watchlist_store.add(username, stocks)
+    return added, watchlist_store.get(username)
+
+
+def remove_from_watchlist(username, stocks, unsaved=None):
+    """
+    Remove stocks from the user's saved watchlist (saving unsaved first,
+    as add_to_watchlist does); returns what is left
+    """
+    if unsaved and not watchlist_store.get(username):
+        watchlist_store.add(username, unsaved)
+    watchlist_store.remove(username, stocks)
+    return watchlist_store.get(username)
+
+
+def delete_watchlist(username):
+    watchlist_store.clear(username)
+
+
+def list_user_watchlists():
+    """
+    (username, number of stocks) for every saved watchlist
+    """
+    return watchlist_store.users()
+
+
+def init_session_state():
+    """
+    Defaults for a new browser session
+    """
+    if "username" not in st.session_state:
+        st.session_state.username = "default_user"
+
+    if "watchlist" not in st.session_state:
+        st.session_state.watchlist = load_watchlist(st.session_state.username, DEFAULT_WATCHLIST)
+
+    if "selected_stocks" not in st.session_state:
+        st.session_state.selected_stocks = []
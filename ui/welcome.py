@@ -0,0 +1,46 @@
+"""
+Welcome page shown before any stock is selected
+"""
+import streamlit as st
+
+from ui.state import list_user_watchlists
+
+
+def render_welcome():
+    """
+    Usage notes, saved users and the quick start button
+    """
+    st.markdown("""
+    ## 🎯 Welcome to Quantitative Stock Drawdown Analysis
+
+    **How to use:**
+    1. **Enter your username** in the sidebar
+    2. **Add stocks** (e.g., AAPL, TSLA, NVDA)
+    3. **Select stocks** from your watchlist
+    4. **Click "Start Analysis"** to see results
+
+    **Quantitative Features:**
+    - 📊 **Price Distribution**: Z-score, percentile ranking
+    - 📈 **Historical Win Rate**: Probability of rebound
+    - 🛡️ **Risk Metrics**: 95% VaR, max drawdown
+    - ⚖️ **Risk-Reward**: Profit/Loss ratio analysis
+    - 📝 **Decision Report**: Natural language trading recommendations
+
+    **Example stocks:**
+    - AAPL, MSFT, GOOGL, NVDA, TSLA, TSM
+    """)
+
+    st.divider()
+    st.subheader("📂 Available User Data")
+    user_watchlists = list_user_watchlists()
+    if user_watchlists:
+        st.write("Found watchlists for:")
+        for username, count in user_watchlists:
+            st.write(f"- **{username}**: {count} stocks")
+    else:
+        st.info("No user data found. Start by adding stocks!")
+
+    st.divider()
+    if st.button("🚀 Quick Start with Default Stocks"):
+        st.session_state.selected_stocks = ["AAPL", "MSFT", "GOOGL"]
+        st.rerun()